@@ -17,7 +17,7 @@ class Animation(object):
          Initializes an animation instance.
 
          Args:
-            frames (list): List of frames in the animation.
+            frames (list): List of frames in the animation, usually pre-sliced surfaces.
             speed (int): Number of frames per second.
             loop (bool): Whether the animation should repeat when finished.
         """
@@ -25,7 +25,7 @@ class Animation(object):
         self.current_frame = 0
         self.speed = speed
         self.loop = loop  # repeat animation
-        self.d_time = 0
+        self.elapsed = 0.0
         self.is_finished = False
 
     def reset(self):
@@ -33,12 +33,16 @@ class Animation(object):
          Resets the animation to the first frame.
         """
         self.current_frame = 0
+        self.elapsed = 0.0
         self.is_finished = False
 
     def update(self, dt):
         """
         Updates the animation state based on elapsed time.
 
+        The frame is the elapsed time times the speed, rounded down, so the frame
+        shown at a given time does not depend on how the time was split into updates.
+
         Args:
             dt (float): Time elapsed since the last update.
 
@@ -46,24 +50,15 @@ class Animation(object):
             object: The current frame of the animation.
         """
         if not self.is_finished:
-            self.next_frame(dt)
-        if self.current_frame == len(self.frames):  # якщо досягається останнього кадру
-            if self.loop:
-                self.current_frame = 0  # починаємо спочтку
-            else:
-                self.is_finished = True
-                self.current_frame -= 1
+            self.elapsed += dt
+            frame = int(self.elapsed * self.speed)
+            count = len(self.frames)
+            if frame >= count:
+                if self.loop:
+                    frame %= count  # починаємо спочтку
+                else:
+                    self.is_finished = True
+                    frame = count - 1
+            self.current_frame = frame
 
         return self.frames[self.current_frame]
-
-    def next_frame(self, d_time):
-        """
-        Advances the animation to the next frame based on elapsed time.
-
-        Args:
-            d_time (float): Time elapsed since the last frame update.
-        """
-        self.d_time += d_time
-        if self.d_time >= (1.0 / self.speed):
-            self.current_frame += 1
-            self.d_time = 0
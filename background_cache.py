@@ -0,0 +1,103 @@
+import os
+import hashlib
+import pygame
+from constants import *
+from sprites import SHEET_PATH
+
+
+class BackgroundCache(object):
+    """
+    Stores composed level backgrounds as images on disk, keyed by a content hash
+    of everything that affects how they look.
+
+    Attributes:
+        directory (str): Folder where the background images are written.
+        surfaces (dict): Backgrounds already loaded in this process, keyed by hash.
+        hits (int): Number of lookups answered from memory or disk.
+        misses (int): Number of lookups that required building the background.
+    """
+
+    VERSION = 1
+
+    def __init__(self, directory=".cache/backgrounds"):
+        """
+        Initializes the cache.
+
+        Args:
+            directory (str): Folder where the background images are written.
+        """
+        self.directory = directory
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, mazefile, rot_file, bg_color, row):
+        """
+        Builds the hash identifying one background.
+
+        Args:
+            mazefile (str): Path to the maze layout file.
+            rot_file (str): Path to the maze rotation file.
+            bg_color: Background fill color.
+            row (int): Color row of the sprite sheet used for the walls.
+
+        Returns:
+            str: Hex digest covering the maze, rotation and sheet contents,
+            the fill color, the color row and the tile size.
+        """
+        digest = hashlib.sha1()
+        for path in (mazefile, rot_file, SHEET_PATH):
+            with open(path, "rb") as file:
+                digest.update(file.read())
+        digest.update(repr((self.VERSION, bg_color, row, TILEWIDTH, TILEHEIGHT)).encode())
+        return digest.hexdigest()
+
+    def get_path(self, key):
+        """
+        Returns the image path for a key.
+        """
+        return os.path.join(self.directory, key + ".png")
+
+    def load(self, key):
+        """
+        Returns the stored background for the key or None if it was never saved.
+
+        Args:
+            key (str): Hash returned by make_key.
+
+        Returns:
+            pygame.Surface or None: The background surface.
+        """
+        surface = self.surfaces.get(key)
+        if surface is None:
+            path = self.get_path(key)
+            if not os.path.exists(path):
+                self.misses += 1
+                return None
+            try:
+                surface = pygame.image.load(path).convert()
+            except pygame.error:
+                self.misses += 1
+                return None
+            self.surfaces[key] = surface
+        self.hits += 1
+        return surface
+
+    def save(self, key, surface):
+        """
+        Keeps the background in memory and writes it to disk.
+        A failed write only costs a rebuild on the next run.
+
+        Args:
+            key (str): Hash returned by make_key.
+            surface (pygame.Surface): The composed background.
+        """
+        self.surfaces[key] = surface
+        path = self.get_path(key)
+        temp_path = path[:-len(".png")] + ".tmp.png"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            pygame.image.save(surface, temp_path)
+            os.replace(temp_path, path)
+        except (OSError, pygame.error):
+            pass
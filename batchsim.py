@@ -0,0 +1,784 @@
+import time
+import numpy as np
+from constants import *
+from mazedata import MazeData
+from fruit import Fruit
+from nodes import access_bit
+from simulation import GameSimulation, RunStats
+
+# Direction codes run from RIGHT (-2) to LEFT (2), so code + 2 indexes these tables.
+DIRECTION_X = np.array([1, 0, 0, 0, -1], dtype=np.float64)
+DIRECTION_Y = np.array([0, 1, 0, -1, 0], dtype=np.float64)
+# Column of a direction in the neighbor and access tables, -1 for STOP.
+DIRECTION_COLUMN = np.array([3, 1, -1, 0, 2])
+
+MOVE_DIRECTIONS = np.array([UP, DOWN, LEFT, RIGHT], dtype=np.int8)
+PORTAL_COLUMN = 4
+NO_NODE = -1
+
+# Ghost modes as indices into MODES, with the mode rules of constants as tables.
+M_SCATTER, M_CHASE, M_WAIT, M_RANDOM, M_FREIGHT, M_SPAWN = range(len(MODES))
+NEXT_MODE = np.array([MODE_INDEX[NEXT_MODES[mode]] for mode in MODES], dtype=np.int8)
+MODE_TIME = np.array([MODE_TIMES[mode] for mode in MODES], dtype=np.float64)
+MODE_SPEED = np.array([MODE_SPEEDS[mode] for mode in MODES]) * TILEWIDTH / 16
+
+# Ghost move methods.
+MOVE_GOAL, MOVE_RANDOM, MOVE_WAIT = range(3)
+MOVE_METHODS = {"goal_movement": MOVE_GOAL, "scatter_movement": MOVE_GOAL, "spawn_movement": MOVE_GOAL,
+                "random_movement": MOVE_RANDOM, "freight_movement": MOVE_RANDOM, "wait_movement": MOVE_WAIT}
+MODE_MOVE = np.array([MOVE_METHODS[MODE_MOVE_METHODS[mode]] for mode in MODES], dtype=np.int8)
+
+GHOST_NAMES = (BLINKY, PINKY, INKY, CLYDE)
+BLINKY_INDEX, PINKY_INDEX, INKY_INDEX, CLYDE_INDEX = range(4)
+SCATTER_GOAL = tuple(SCATTER_GOALS[name] for name in GHOST_NAMES)
+
+# Speeds of the rules in constants, in pixels per second.
+PACMAN_SPEED = ENTITY_SPEED * TILEWIDTH / 16
+GHOST_RESET_SPEED = ENTITY_SPEED * TILEWIDTH / 16
+GHOST_SPAWN_SPEED = SPAWN_SPEED * TILEWIDTH / 16
+
+
+def node_index(node):
+    """
+    Returns the index of a node in its node group, NO_NODE for None.
+    """
+    return NO_NODE if node is None else node.index
+
+
+class LevelTemplate(object):
+    """
+    Start state of one maze, read from a GameSimulation right after startGame().
+
+    Node indices are local to the maze; BatchSimulation adds an offset so that
+    the nodes of all mazes share one table.
+
+    Attributes:
+        positions (ndarray): (x, y) of every node.
+        neighbors (ndarray): UP, DOWN, LEFT, RIGHT and PORTAL neighbor of every node, -1 if none.
+        access (ndarray): Bitmask of the entities allowed to leave every node UP, DOWN, LEFT and RIGHT.
+        home_node (int): Node whose DOWN access is opened for eaten ghosts.
+        fruit_position (tuple): Where a fruit appears.
+        pellets (ndarray): (x, y, points, power) of every pellet.
+        pellet_grid (ndarray): Pellet index of every tile, -1 if none.
+        pacman (dict): Node, target, position and direction of Pac-Man.
+        ghosts (dict): Per-ghost arrays of the same, plus speed, move method, goal and mode state.
+    """
+
+    def __init__(self, level):
+        sim = GameSimulation(headless=True)
+        sim.level = level
+        sim.startGame()
+
+        self.positions = sim.nodes.positions.copy()
+        self.neighbors = sim.nodes.neighbors.copy()
+        self.access = sim.nodes.access.copy()
+        self.home_node = node_index(sim.nodes.nodesLUT[sim.nodes.homekey])
+        fruit = Fruit(sim.nodes.getNodeFromTiles(9, 20), headless=True)
+        self.fruit_position = (fruit.position.x, fruit.position.y)
+
+        slots = sim.pelletGroup.slots
+        self.pellets = np.array([(p.position.x, p.position.y, p.points, p.name == POWERPELLET) for p in slots],
+                                dtype=np.float64).reshape(-1, 4)
+        self.pellet_grid = np.array(sim.pelletGroup.grid, dtype=np.int32)
+
+        pacman = sim.pacman
+        self.pacman = {"node": node_index(pacman.node), "target": node_index(pacman.target),
+                       "x": pacman.position.x, "y": pacman.position.y, "direction": pacman.direction,
+                       "spawn": node_index(pacman.spawn_node)}
+
+        ghosts = list(sim.ghosts)
+        self.ghosts = {
+            "node": [node_index(g.node) for g in ghosts],
+            "target": [node_index(g.target) for g in ghosts],
+            "x": [g.position.x for g in ghosts],
+            "y": [g.position.y for g in ghosts],
+            "direction": [g.direction for g in ghosts],
+            "speed": [g.speed for g in ghosts],
+            "move": [MOVE_METHODS[g.move_method.__name__] for g in ghosts],
+            "goal_x": [g.goal.x for g in ghosts],
+            "goal_y": [g.goal.y for g in ghosts],
+            "points": [g.points for g in ghosts],
+            "spawn": [node_index(g.spawn_node) for g in ghosts],
+            "main_mode": [MODE_INDEX[g.mode.main_mode.mode] for g in ghosts],
+            "main_deadline": [g.mode.main_mode.deadline - sim.play_timers.now for g in ghosts],
+            "current": [MODE_INDEX[g.mode.current_mode] for g in ghosts],
+            "ctrl_deadline": [np.nan if g.mode.deadline is None else g.mode.deadline - sim.play_timers.now
+                              for g in ghosts],
+        }
+
+
+class BatchSimulation(object):
+    """
+    Runs N independent games of Pac-Man at once with the state held in NumPy arrays.
+
+    Every step advances all games with the rules of GameSimulation: Pac-Man and the
+    four ghosts move along the node graph, ghost modes and goals, pellets, fruit,
+    collisions, lives, timed pauses and level changes. The node graphs of all mazes
+    are read from NodeGroup once and shared as index arrays; only the access masks,
+    which change while a game runs, are kept per game.
+
+    Ghosts in freight mode pick random directions through random_choice(), which
+    draws from a NumPy generator, so only games without random moves follow the
+    scalar game step by step, unless random_choice() is overridden.
+
+    Timed events are deadlines, like the schedulers of GameSimulation: pauses end
+    at a time of clock, which advances every step, and ghost modes and fruit at a
+    time of play_time, which only advances in games that are not paused.
+
+    Attributes:
+        n (int): Number of games.
+        rng (numpy.random.Generator): Source of the random ghost moves.
+        stats (RunStats): Steps taken and simulated and wall-clock time of one game.
+        level, lives, score (ndarray): Per-game counters.
+        clock (float): Time of all steps, like GameSimulation.timers.
+        play_time (ndarray): Time of the unpaused steps of every game, like GameSimulation.play_timers.
+        paused, pause_deadline, pause_time, pause_after (ndarray): Pause state; pause_time and
+            pause_deadline are NaN for a pause that waits for the player.
+        pacman_* (ndarray): Pac-Man state, shape (n,).
+        ghost_* (ndarray): Ghost state, shape (n, 4) in the order Blinky, Pinky, Inky, Clyde.
+        access (ndarray): Access masks of every node, shape (n, nodes, 4).
+        pellet_alive (ndarray): Pellet bitmap, shape (n, pellets).
+    """
+
+    def __init__(self, n, seed=None):
+        """
+        Creates n games and starts them on the first level, paused until resumed.
+
+        Args:
+            n (int): Number of games.
+            seed (int or None): Seed of the random ghost moves.
+        """
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.stats = RunStats()
+        self.build_tables()
+
+        self.maze = np.zeros(n, dtype=np.int32)
+        self.level = np.zeros(n, dtype=np.int32)
+        self.lives = np.full(n, START_LIVES, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.clock = 0.0
+        self.play_time = np.zeros(n)
+        self.paused = np.ones(n, dtype=bool)
+        self.pause_deadline = np.full(n, np.nan)
+        self.pause_time = np.full(n, np.nan)
+        self.pause_after = np.zeros(n, dtype=np.int8)
+
+        self.pacman_node = np.zeros(n, dtype=np.int32)
+        self.pacman_target = np.zeros(n, dtype=np.int32)
+        self.pacman_spawn = np.zeros(n, dtype=np.int32)
+        self.pacman_x = np.zeros(n)
+        self.pacman_y = np.zeros(n)
+        self.pacman_direction = np.zeros(n, dtype=np.int8)
+        self.pacman_alive = np.ones(n, dtype=bool)
+
+        shape = (n, len(GHOST_NAMES))
+        self.ghost_node = np.zeros(shape, dtype=np.int32)
+        self.ghost_target = np.zeros(shape, dtype=np.int32)
+        self.ghost_spawn = np.zeros(shape, dtype=np.int32)
+        self.ghost_x = np.zeros(shape)
+        self.ghost_y = np.zeros(shape)
+        self.ghost_direction = np.zeros(shape, dtype=np.int8)
+        self.ghost_speed = np.zeros(shape)
+        self.ghost_move = np.zeros(shape, dtype=np.int8)
+        self.ghost_goal_x = np.zeros(shape)
+        self.ghost_goal_y = np.zeros(shape)
+        self.ghost_points = np.zeros(shape, dtype=np.int64)
+        self.main_mode = np.zeros(shape, dtype=np.int8)
+        self.main_deadline = np.zeros(shape)
+        self.current_mode = np.zeros(shape, dtype=np.int8)
+        self.mode_deadline = np.full(shape, np.nan)
+
+        self.access = np.zeros((n,) + self.start_access.shape, dtype=np.uint16)
+        self.pellet_alive = np.zeros((n, self.pellet_count.max()), dtype=bool)
+        self.remaining = np.zeros(n, dtype=np.int32)
+        self.num_eaten = np.zeros(n, dtype=np.int32)
+
+        self.fruit = np.zeros(n, dtype=bool)
+        self.fruit_x = np.zeros(n)
+        self.fruit_y = np.zeros(n)
+        self.fruit_deadline = np.zeros(n)
+        self.fruit_destroy = np.zeros(n, dtype=bool)
+
+        self.start_game(np.arange(n))
+
+    def build_tables(self):
+        """
+        Reads every maze into shared node, access and pellet tables.
+        """
+        templates = [LevelTemplate(level) for level in range(len(MazeData().maze_dict))]
+        offsets = np.cumsum([0] + [len(t.positions) for t in templates])[:-1]
+        self.templates = templates
+
+        self.node_x = np.concatenate([t.positions[:, 0] for t in templates])
+        self.node_y = np.concatenate([t.positions[:, 1] for t in templates])
+        self.neighbors = np.concatenate([np.where(t.neighbors >= 0, t.neighbors + offset, NO_NODE)
+                                         for t, offset in zip(templates, offsets)])
+        self.start_access = np.concatenate([t.access for t in templates])
+        self.home_node = np.array([t.home_node + offset for t, offset in zip(templates, offsets)])
+        self.fruit_start = np.array([t.fruit_position for t in templates], dtype=np.float64)
+
+        self.pellet_count = np.array([len(t.pellets) for t in templates])
+        pellets = np.zeros((len(templates), self.pellet_count.max(), 4))
+        rows = max(t.pellet_grid.shape[0] for t in templates)
+        cols = max(t.pellet_grid.shape[1] for t in templates)
+        self.pellet_grid = np.full((len(templates), rows, cols), -1, dtype=np.int32)
+        for m, t in enumerate(templates):
+            pellets[m, :len(t.pellets)] = t.pellets
+            self.pellet_grid[m, :t.pellet_grid.shape[0], :t.pellet_grid.shape[1]] = t.pellet_grid
+        self.pellet_x = pellets[:, :, 0]
+        self.pellet_y = pellets[:, :, 1]
+        self.pellet_points = pellets[:, :, 2].astype(np.int64)
+        self.pellet_power = pellets[:, :, 3].astype(bool)
+
+        def stack(values, offset=None):
+            array = np.array(values)
+            if offset is not None:
+                array = array + offset.reshape((-1,) + (1,) * (array.ndim - 1))
+            return array
+
+        self.start_pacman = {key: stack([t.pacman[key] for t in templates],
+                                        offsets if key in ("node", "target", "spawn") else None)
+                             for key in templates[0].pacman}
+        self.start_ghosts = {key: stack([t.ghosts[key] for t in templates],
+                                        offsets if key in ("node", "target", "spawn") else None)
+                             for key in templates[0].ghosts}
+
+    def start_game(self, games):
+        """
+        Loads the maze of the current level in the given games, like GameSimulation.startGame().
+        """
+        maze = self.level[games] % len(self.templates)
+        self.maze[games] = maze
+        self.access[games] = self.start_access
+
+        p = self.start_pacman
+        self.pacman_node[games] = p["node"][maze]
+        self.pacman_target[games] = p["target"][maze]
+        self.pacman_spawn[games] = p["spawn"][maze]
+        self.pacman_x[games] = p["x"][maze]
+        self.pacman_y[games] = p["y"][maze]
+        self.pacman_direction[games] = p["direction"][maze]
+        self.pacman_alive[games] = True
+
+        g = self.start_ghosts
+        self.ghost_node[games] = g["node"][maze]
+        self.ghost_target[games] = g["target"][maze]
+        self.ghost_spawn[games] = g["spawn"][maze]
+        self.ghost_x[games] = g["x"][maze]
+        self.ghost_y[games] = g["y"][maze]
+        self.ghost_direction[games] = g["direction"][maze]
+        self.ghost_speed[games] = g["speed"][maze]
+        self.ghost_move[games] = g["move"][maze]
+        self.ghost_goal_x[games] = g["goal_x"][maze]
+        self.ghost_goal_y[games] = g["goal_y"][maze]
+        self.ghost_points[games] = g["points"][maze]
+        self.main_mode[games] = g["main_mode"][maze]
+        self.main_deadline[games] = self.play_time[games, None] + g["main_deadline"][maze]
+        self.current_mode[games] = g["current"][maze]
+        self.mode_deadline[games] = self.play_time[games, None] + g["ctrl_deadline"][maze]
+
+        self.pellet_alive[games] = np.arange(self.pellet_alive.shape[1]) < self.pellet_count[maze][:, None]
+        self.remaining[games] = self.pellet_count[maze]
+        self.num_eaten[games] = 0
+
+    def step(self, dt, actions=STOP):
+        """
+        Advances every game by one tick, like GameSimulation.step().
+
+        Args:
+            dt (float): Simulated time of the tick in seconds.
+            actions (int or array): Direction Pac-Man is steered in, for all games or per game.
+        """
+        actions = np.broadcast_to(np.asarray(actions, dtype=np.int8), (self.n,))
+        active = np.flatnonzero(~self.paused)
+        if active.size:
+            self.play_time[active] += dt
+            for j in range(len(GHOST_NAMES)):
+                self.update_ghost(active, j, dt)
+            self.update_fruit(active)
+            self.check_pellets(active)
+            self.check_fruit(active)
+            self.check_ghosts(active)
+        moving = np.flatnonzero(~self.pacman_alive | ~self.paused)
+        if moving.size:
+            self.update_pacman(moving, actions[moving], dt)
+        self.update_pause(dt)
+        self.stats.steps += 1
+        self.stats.simulated_time += dt
+
+    def run(self, steps, actions=STOP, dt=FIXED_DT, auto_resume=True):
+        """
+        Steps all games with a fixed dt as fast as possible, like GameSimulation.run().
+
+        The stats count one game; the throughput of the batch in game seconds per
+        wall-clock second is stats.speed * n.
+
+        Args:
+            steps (int): Number of steps to take.
+            actions (int, array or callable): Directions for every step, or a function
+                that gets the batch and returns them.
+            dt (float): Simulated time of every step in seconds.
+            auto_resume (bool): Resume games that wait for the player, as if space was pressed.
+
+        Returns:
+            RunStats: The stats of the batch, including this run.
+        """
+        start = time.perf_counter()
+        for _ in range(steps):
+            if auto_resume:
+                self.toggle_pause(self.paused & np.isnan(self.pause_time))
+            if callable(actions):
+                self.step(dt, actions(self))
+            else:
+                self.step(dt, actions)
+        self.stats.wall_time += time.perf_counter() - start
+        return self.stats
+
+    def toggle_pause(self, mask=None):
+        """
+        Pauses or resumes games on the player's request, like GameSimulation.toggle_pause().
+
+        Args:
+            mask (ndarray or None): Games to toggle, all games if None.
+
+        Returns:
+            ndarray: Which games changed their pause state.
+        """
+        toggled = self.pacman_alive.copy()
+        if mask is not None:
+            toggled &= mask
+        self.set_pause(np.flatnonzero(toggled), np.nan, AFTER_NONE)
+        return toggled
+
+    def set_pause(self, games, pause_time, after):
+        """
+        Flips the pause state of the given games, like Pause.set_pause().
+        """
+        self.pause_deadline[games] = self.clock + pause_time
+        self.pause_after[games] = after
+        self.pause_time[games] = pause_time
+        self.paused[games] = ~self.paused[games]
+
+    def update_pause(self, dt):
+        """
+        Advances the clock, ends the timed pauses that are due and runs what comes after them.
+        """
+        self.clock += dt
+        done = np.flatnonzero(self.clock >= np.nan_to_num(self.pause_deadline, nan=np.inf))
+        if done.size == 0:
+            return
+        self.pause_deadline[done] = np.nan
+        self.pause_time[done] = np.nan
+        self.paused[done] = False
+        after = self.pause_after[done]
+        self.reset_level(done[after == AFTER_RESET])
+        self.restart_game(done[after == AFTER_RESTART])
+        self.next_level(done[after == AFTER_NEXT])
+
+    def reset_level(self, games):
+        """
+        Puts Pac-Man and the ghosts back on their spawn nodes after a lost life.
+        """
+        if games.size == 0:
+            return
+        self.paused[games] = True
+        self.reset_pacman(games)
+        for j in range(len(GHOST_NAMES)):
+            self.reset_ghost(games, j)
+        self.fruit[games] = False
+
+    def restart_game(self, games):
+        """
+        Starts the given games again from the first level.
+        """
+        if games.size == 0:
+            return
+        self.lives[games] = START_LIVES
+        self.level[games] = 0
+        self.score[games] = 0
+        self.paused[games] = True
+        self.fruit[games] = False
+        self.start_game(games)
+
+    def next_level(self, games):
+        """
+        Moves the given games to the next level.
+        """
+        if games.size == 0:
+            return
+        self.level[games] += 1
+        self.paused[games] = True
+        self.start_game(games)
+
+    def reset_pacman(self, games):
+        """
+        Puts Pac-Man halfway to the node left of its spawn node, like Pacman.reset().
+        """
+        node = self.pacman_spawn[games]
+        left = self.neighbors[node, DIRECTION_COLUMN[LEFT + 2]]
+        has_left = left >= 0
+        self.pacman_node[games] = node
+        self.pacman_target[games] = np.where(has_left, left, node)
+        self.pacman_x[games] = np.where(has_left, (self.node_x[node] + self.node_x[left]) / 2.0, self.node_x[node])
+        self.pacman_y[games] = np.where(has_left, (self.node_y[node] + self.node_y[left]) / 2.0, self.node_y[node])
+        self.pacman_direction[games] = LEFT
+        self.pacman_alive[games] = True
+
+    def reset_ghost(self, games, j):
+        """
+        Puts a ghost back on its spawn node, like Ghost.reset(). Its mode is kept.
+        """
+        node = self.ghost_spawn[games, j]
+        self.ghost_node[games, j] = node
+        self.ghost_target[games, j] = node
+        self.ghost_x[games, j] = self.node_x[node]
+        self.ghost_y[games, j] = self.node_y[node]
+        self.ghost_direction[games, j] = STOP
+        self.ghost_speed[games, j] = GHOST_RESET_SPEED
+        self.ghost_points[games, j] = GHOST_POINTS
+        self.ghost_move[games, j] = MOVE_GOAL
+
+    def new_target(self, games, node, direction, bit):
+        """
+        Returns the neighbor of node in direction if the entity may go there, else node itself.
+        """
+        column = DIRECTION_COLUMN[direction + 2]
+        safe = np.maximum(column, 0)
+        neighbor = self.neighbors[node, safe]
+        allowed = (self.access[games, node, safe] & bit) != 0
+        return np.where((direction != STOP) & (neighbor >= 0) & allowed, neighbor, node)
+
+    def overshot(self, x, y, node, target):
+        """
+        Checks which entities have reached or passed their target node.
+        """
+        dx1 = self.node_x[target] - self.node_x[node]
+        dy1 = self.node_y[target] - self.node_y[node]
+        dx2 = x - self.node_x[node]
+        dy2 = y - self.node_y[node]
+        return dx2 * dx2 + dy2 * dy2 >= dx1 * dx1 + dy1 * dy1
+
+    def collides(self, games, x, y):
+        """
+        Checks which Pac-Men touch an entity at (x, y).
+        """
+        dx = self.pacman_x[games] - x
+        dy = self.pacman_y[games] - y
+        return dx * dx + dy * dy <= (COLLIDE_RADIUS + COLLIDE_RADIUS) ** 2
+
+    def update_pacman(self, games, actions, dt):
+        """
+        Moves Pac-Man and turns it at nodes or reverses it between them, like Pacman.update().
+        """
+        bit = access_bit(PACMAN)
+        direction = self.pacman_direction[games]
+        self.pacman_x[games] += DIRECTION_X[direction + 2] * PACMAN_SPEED * dt
+        self.pacman_y[games] += DIRECTION_Y[direction + 2] * PACMAN_SPEED * dt
+
+        over = self.overshot(self.pacman_x[games], self.pacman_y[games],
+                             self.pacman_node[games], self.pacman_target[games])
+        g, action, direction = games[over], actions[over], direction[over]
+        if g.size:
+            node = self.pacman_target[g]
+            portal = self.neighbors[node, PORTAL_COLUMN]
+            node = np.where(portal >= 0, portal, node)
+            target = self.new_target(g, node, action, bit)
+            turned = target != node
+            direction = np.where(turned, action, direction)
+            target = np.where(turned, target, self.new_target(g, node, direction, bit))
+            direction = np.where(target == node, STOP, direction)
+            self.pacman_node[g] = node
+            self.pacman_target[g] = target
+            self.pacman_direction[g] = direction
+            self.pacman_x[g] = self.node_x[node]
+            self.pacman_y[g] = self.node_y[node]
+
+        g, action = games[~over], actions[~over]
+        direction = self.pacman_direction[g]
+        reverse = g[(action != STOP) & (action == -direction)]
+        if reverse.size:
+            self.pacman_direction[reverse] = -self.pacman_direction[reverse]
+            node = self.pacman_node[reverse]
+            self.pacman_node[reverse] = self.pacman_target[reverse]
+            self.pacman_target[reverse] = node
+
+    def set_mode(self, games, j, mode):
+        """
+        Switches a ghost to a mode, like ModeController.set_mode().
+        """
+        self.main_mode[games, j] = mode
+        self.main_deadline[games, j] = self.play_time[games] + MODE_TIME[mode]
+        self.current_mode[games, j] = mode
+        self.ghost_speed[games, j] = MODE_SPEED[mode]
+        self.ghost_move[games, j] = MODE_MOVE[mode]
+
+    def normal_mode(self, games, j):
+        """
+        Returns a ghost to normal movement and closes its spawn node below it, like Ghost.normal_mode().
+        """
+        self.ghost_speed[games, j] = GHOST_RESET_SPEED
+        self.ghost_move[games, j] = MOVE_GOAL
+        spawn = self.ghost_spawn[games, j]
+        self.access[games, spawn, DIRECTION_COLUMN[DOWN + 2]] &= ~np.uint16(access_bit(GHOST_NAMES[j]))
+
+    def start_freight(self, games, j):
+        """
+        Frightens a ghost, like Ghost.start_freight().
+        """
+        current = self.current_mode[games, j]
+        frightened = games[current == M_FREIGHT]
+        self.mode_deadline[frightened, j] = self.play_time[frightened] + MODE_TIME[M_FREIGHT]
+        normal = games[(current == M_SCATTER) | (current == M_CHASE)]
+        self.set_mode(normal, j, M_FREIGHT)
+        self.mode_deadline[normal, j] = self.play_time[normal] + MODE_TIME[M_FREIGHT]
+        freight = games[self.current_mode[games, j] == M_FREIGHT]
+        self.ghost_speed[freight, j] = MODE_SPEED[M_FREIGHT]
+        self.ghost_move[freight, j] = MOVE_RANDOM
+
+    def start_spawn(self, games, j):
+        """
+        Sends an eaten ghost home, like Ghost.start_spawn().
+        """
+        self.set_mode(games[self.current_mode[games, j] == M_FREIGHT], j, M_SPAWN)
+        spawn = games[self.current_mode[games, j] == M_SPAWN]
+        self.ghost_speed[spawn, j] = GHOST_SPAWN_SPEED
+        self.ghost_move[spawn, j] = MOVE_GOAL
+        node = self.ghost_spawn[spawn, j]
+        self.ghost_goal_x[spawn, j] = self.node_x[node]
+        self.ghost_goal_y[spawn, j] = self.node_y[node]
+
+    def update_mode(self, games, j):
+        """
+        Ends the modes of a ghost that are due and updates its mode, like ModeController.update()
+        after the deadlines of GameSimulation.play_timers have run.
+        """
+        now = self.play_time[games]
+        mode = self.main_mode[games, j]
+        expired = now >= self.main_deadline[games, j]
+        mode = np.where(expired, NEXT_MODE[mode], mode)
+        self.main_mode[games, j] = mode
+        self.main_deadline[games, j] = np.where(expired, now + MODE_TIME[mode], self.main_deadline[games, j])
+
+        current = mode.copy()
+        self.ghost_speed[games, j] = MODE_SPEED[current]
+        self.ghost_move[games, j] = MODE_MOVE[current]
+
+        node = self.ghost_node[games, j]
+        spawn = self.ghost_spawn[games, j]
+        at_home = ((np.abs(self.node_x[node] - self.node_x[spawn]) < 0.000001)
+                   & (np.abs(self.node_y[node] - self.node_y[spawn]) < 0.000001))
+        home = games[(current == M_SPAWN) & at_home]
+        self.main_mode[home, j] = M_WAIT
+        self.main_deadline[home, j] = self.play_time[home] + MODE_TIME[M_WAIT]
+
+        due = now >= np.nan_to_num(self.mode_deadline[games, j], nan=np.inf)
+        self.mode_deadline[games[due], j] = np.nan
+        over = due & (current == M_FREIGHT)
+        if over.any():
+            self.normal_mode(games[over], j)
+            current[over] = self.main_mode[games[over], j]
+
+        arrived = (current == M_SPAWN) & (node == spawn)
+        if arrived.any():
+            self.normal_mode(games[arrived], j)
+            current[arrived] = self.main_mode[games[arrived], j]
+        self.current_mode[games, j] = current
+
+    def update_ghost(self, games, j, dt):
+        """
+        Moves a ghost, updates its mode and picks its next direction at nodes, like Ghost.update().
+        """
+        bit = access_bit(GHOST_NAMES[j])
+        direction = self.ghost_direction[games, j]
+        speed = self.ghost_speed[games, j]
+        self.ghost_x[games, j] += DIRECTION_X[direction + 2] * speed * dt
+        self.ghost_y[games, j] += DIRECTION_Y[direction + 2] * speed * dt
+        self.update_mode(games, j)
+
+        over = self.overshot(self.ghost_x[games, j], self.ghost_y[games, j],
+                             self.ghost_node[games, j], self.ghost_target[games, j])
+        g = games[over]
+        if g.size:
+            node = self.ghost_target[g, j]
+            direction = self.ghost_direction[g, j]
+            reverse = -direction
+            valid = (((self.access[g[:, None], node[:, None], np.arange(4)] & bit) != 0)
+                     & (self.neighbors[node, :4] >= 0)
+                     & (MOVE_DIRECTIONS != reverse[:, None]))
+            stuck = ~valid.any(axis=1)
+
+            move = self.ghost_move[g, j]
+            new_direction = reverse.copy()
+
+            chase = (move == MOVE_GOAL) & ~stuck
+            if chase.any():
+                dx = (self.node_x[node[chase], None] + DIRECTION_X[MOVE_DIRECTIONS + 2] * TILEWIDTH
+                      - self.ghost_goal_x[g[chase], j, None])
+                dy = (self.node_y[node[chase], None] + DIRECTION_Y[MOVE_DIRECTIONS + 2] * TILEWIDTH
+                      - self.ghost_goal_y[g[chase], j, None])
+                distance = np.where(valid[chase], dx * dx + dy * dy, np.inf)
+                new_direction[chase] = MOVE_DIRECTIONS[np.argmin(distance, axis=1)]
+
+            wander = move == MOVE_RANDOM
+            if wander.any():
+                counts = np.where(stuck[wander], 1, valid[wander].sum(axis=1))
+                choice = np.asarray(self.random_choice(g[wander], counts))
+                picked = valid[wander] & (np.cumsum(valid[wander], axis=1) == choice[:, None] + 1)
+                new_direction[wander] = np.where(stuck[wander], reverse[wander],
+                                                 MOVE_DIRECTIONS[np.argmax(picked, axis=1)])
+
+            portal = self.neighbors[node, PORTAL_COLUMN]
+            node = np.where(portal >= 0, portal, node)
+            target = self.new_target(g, node, new_direction, bit)
+            turned = target != node
+            direction = np.where(turned, new_direction, direction)
+            target = np.where(turned, target, self.new_target(g, node, direction, bit))
+            self.ghost_node[g, j] = node
+            self.ghost_target[g, j] = target
+            self.ghost_direction[g, j] = direction
+            self.ghost_x[g, j] = self.node_x[node]
+            self.ghost_y[g, j] = self.node_y[node]
+
+        self.update_goal(games, j)
+
+    def update_goal(self, games, j):
+        """
+        Aims a ghost at its chase, scatter or home goal, like the update_goal() of each ghost class.
+        """
+        current = self.current_mode[games, j]
+        pacman_node = self.pacman_node[games]
+        dx = DIRECTION_X[self.pacman_direction[games] + 2]
+        dy = DIRECTION_Y[self.pacman_direction[games] + 2]
+        goal_x = self.ghost_goal_x[games, j]
+        goal_y = self.ghost_goal_y[games, j]
+
+        if j == BLINKY_INDEX:
+            chase_x, chase_y = self.node_x[pacman_node], self.node_y[pacman_node]
+        elif j == PINKY_INDEX:
+            chase_x = self.node_x[pacman_node] + dx * TILEWIDTH * 4
+            chase_y = self.node_y[pacman_node] + dy * TILEWIDTH * 4
+        elif j == INKY_INDEX:
+            blinky_x = self.ghost_x[games, BLINKY_INDEX]
+            blinky_y = self.ghost_y[games, BLINKY_INDEX]
+            chase_x = (self.pacman_x[games] + dx * TILEWIDTH * 2 - blinky_x) * 2 + blinky_x
+            chase_y = (self.pacman_y[games] + dy * TILEWIDTH * 2 - blinky_y) * 2 + blinky_y
+        else:
+            chase_x = self.node_x[pacman_node] + dx * TILEWIDTH * 4
+            chase_y = self.node_y[pacman_node] + dy * TILEWIDTH * 4
+            near_x = self.pacman_x[games] - self.ghost_x[games, j]
+            near_y = self.pacman_y[games] - self.ghost_y[games, j]
+            near = (current == M_CHASE) & (near_x * near_x + near_y * near_y <= (TILEWIDTH * 8) ** 2)
+            chase_x = np.where(near, SCATTER_GOAL[j][0], chase_x)
+            chase_y = np.where(near, SCATTER_GOAL[j][1], chase_y)
+            self.current_mode[games[near], j] = M_SCATTER
+
+        spawn = self.ghost_spawn[games, j]
+        goal_x = np.where(current == M_CHASE, chase_x, goal_x)
+        goal_y = np.where(current == M_CHASE, chase_y, goal_y)
+        goal_x = np.where(current == M_SCATTER, SCATTER_GOAL[j][0], goal_x)
+        goal_y = np.where(current == M_SCATTER, SCATTER_GOAL[j][1], goal_y)
+        goal_x = np.where(current == M_SPAWN, self.node_x[spawn], goal_x)
+        goal_y = np.where(current == M_SPAWN, self.node_y[spawn], goal_y)
+        self.ghost_goal_x[games, j] = goal_x
+        self.ghost_goal_y[games, j] = goal_y
+
+    def random_choice(self, games, counts):
+        """
+        Picks the index of a random direction for ghosts that wander.
+
+        Args:
+            games (ndarray): Games whose ghost picks a direction.
+            counts (ndarray): Number of directions to pick from in each game.
+
+        Returns:
+            ndarray: Index in [0, count) for every game.
+        """
+        return self.rng.integers(0, counts)
+
+    def update_fruit(self, games):
+        """
+        Marks the fruit of the given games whose deadline has come for removal, like Fruit.expire().
+        """
+        g = games[self.fruit[games]]
+        self.fruit_destroy[g] |= self.play_time[g] >= self.fruit_deadline[g]
+
+    def check_pellets(self, games):
+        """
+        Lets Pac-Man eat the pellet it touches, like GameSimulation.checkPelletEvents().
+        """
+        row = np.rint(self.pacman_y[games] / TILEHEIGHT).astype(np.int64)
+        col = np.rint(self.pacman_x[games] / TILEWIDTH).astype(np.int64)
+        maze = self.maze[games]
+        inside = (row >= 0) & (row < self.pellet_grid.shape[1]) & (col >= 0) & (col < self.pellet_grid.shape[2])
+        slot = np.where(inside, self.pellet_grid[maze, np.clip(row, 0, self.pellet_grid.shape[1] - 1),
+                                                 np.clip(col, 0, self.pellet_grid.shape[2] - 1)], -1)
+        safe = np.maximum(slot, 0)
+        dx = self.pacman_x[games] - self.pellet_x[maze, safe]
+        dy = self.pacman_y[games] - self.pellet_y[maze, safe]
+        eaten = ((slot >= 0) & self.pellet_alive[games, safe]
+                 & (dx * dx + dy * dy <= (COLLIDE_RADIUS + PELLET_RADIUS) ** 2))
+        g, maze, slot = games[eaten], maze[eaten], slot[eaten]
+        if g.size == 0:
+            return
+
+        self.num_eaten[g] += 1
+        self.score[g] += self.pellet_points[maze, slot]
+        inky = g[self.num_eaten[g] == INKY_PELLETS]
+        self.access[inky, self.ghost_spawn[inky, INKY_INDEX], DIRECTION_COLUMN[RIGHT + 2]] |= np.uint16(access_bit(INKY))
+        clyde = g[self.num_eaten[g] == CLYDE_PELLETS]
+        self.access[clyde, self.ghost_spawn[clyde, CLYDE_INDEX], DIRECTION_COLUMN[LEFT + 2]] |= np.uint16(access_bit(CLYDE))
+
+        self.pellet_alive[g, slot] = False
+        self.remaining[g] -= 1
+
+        power = g[self.pellet_power[maze, slot]]
+        if power.size:
+            for j in range(len(GHOST_NAMES)):
+                self.start_freight(power, j)
+            self.ghost_points[power] = GHOST_POINTS
+
+        cleared = g[self.remaining[g] == 0]
+        self.set_pause(cleared, LEVEL_PAUSE, AFTER_NEXT)
+
+    def check_fruit(self, games):
+        """
+        Places, collects and removes fruit, like GameSimulation.checkFruitEvents().
+        """
+        ready = games[np.isin(self.num_eaten[games], FRUIT_PELLETS) & ~self.fruit[games]]
+        self.fruit[ready] = True
+        self.fruit_deadline[ready] = self.play_time[ready] + FRUIT_LIFESPAN
+        self.fruit_destroy[ready] = False
+        self.fruit_x[ready] = self.fruit_start[self.maze[ready], 0]
+        self.fruit_y[ready] = self.fruit_start[self.maze[ready], 1]
+
+        g = games[self.fruit[games]]
+        eaten = self.collides(g, self.fruit_x[g], self.fruit_y[g])
+        self.score[g[eaten]] += FRUIT_POINTS
+        self.fruit[g[eaten | self.fruit_destroy[g]]] = False
+
+    def check_ghosts(self, games):
+        """
+        Lets Pac-Man eat frightened ghosts and ghosts catch Pac-Man, like GameSimulation.checkGhostEvents().
+        """
+        for j in range(len(GHOST_NAMES)):
+            touching = self.collides(games, self.ghost_x[games, j], self.ghost_y[games, j])
+            current = self.current_mode[games, j]
+
+            eaten = games[touching & (current == M_FREIGHT)]
+            if eaten.size:
+                self.score[eaten] += self.ghost_points[eaten, j]
+                self.ghost_points[eaten] *= 2
+                self.set_pause(eaten, GHOST_EATEN_PAUSE, AFTER_SHOW)
+                self.start_spawn(eaten, j)
+                self.access[eaten, self.home_node[self.maze[eaten]], DIRECTION_COLUMN[DOWN + 2]] |= \
+                    np.uint16(access_bit(GHOST_NAMES[j]))
+
+            caught = games[touching & (current != M_FREIGHT) & (current != M_SPAWN) & self.pacman_alive[games]]
+            if caught.size:
+                self.lives[caught] -= 1
+                self.pacman_alive[caught] = False
+                self.pacman_direction[caught] = STOP
+                over = self.lives[caught] <= 0
+                self.set_pause(caught[over], DEATH_PAUSE, AFTER_RESTART)
+                self.set_pause(caught[~over], DEATH_PAUSE, AFTER_RESET)
@@ -0,0 +1,34 @@
+"""
+Measures the cost of Snapshotter.capture() and Snapshotter.restore().
+
+Run from the repository root:
+
+    python -m benchmarks.bench_snapshot
+"""
+import timeit
+from constants import *
+from simulation import GameSimulation
+from snapshot import Snapshotter
+
+
+def main(repeat=5, number=2000):
+    sim = GameSimulation(seed=0)
+    sim.startGame()
+    sim.run(1200, LEFT)
+    snapshotter = Snapshotter(sim)
+    state = snapshotter.capture()
+
+    results = {
+        "capture (new record)": lambda: snapshotter.capture(),
+        "capture (into record)": lambda: snapshotter.capture(state),
+        "restore": lambda: snapshotter.restore(state),
+        "copy": lambda: state.copy(),
+    }
+    print(f"snapshot size: {state.nbytes} bytes")
+    for name, function in results.items():
+        best = min(timeit.repeat(function, repeat=repeat, number=number)) / number
+        print(f"{name:24s} {best * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Counts the Vector objects created per frame of a headless game and times a frame.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_vector
+"""
+import time
+import vector
+from constants import *
+from simulation import GameSimulation
+
+
+def count_vectors(function):
+    """
+    Calls function and returns the number of Vector objects created meanwhile.
+    """
+    init = vector.Vector.__init__
+    count = 0
+
+    def counting_init(instance, *args):
+        nonlocal count
+        count += 1
+        init(instance, *args)
+
+    vector.Vector.__init__ = counting_init
+    try:
+        function()
+    finally:
+        vector.Vector.__init__ = init
+    return count
+
+
+def new_game():
+    sim = GameSimulation(seed=0)
+    sim.startGame()
+    sim.toggle_pause()
+    return sim
+
+
+def main(frames=6000):
+    sim = new_game()
+    count = count_vectors(lambda: sim.run(frames, LEFT))
+    print(f"Vector objects per frame: {count / frames:.1f}")
+
+    sim = new_game()
+    start = time.perf_counter()
+    sim.run(frames, LEFT)
+    elapsed = time.perf_counter() - start
+    print(f"time per frame: {elapsed / frames * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,12 @@ INKY = 6
 CLYDE = 7
 FRUIT = 8
 
+# Bit of every entity name in the access masks of the maze nodes.
+ACCESS_BITS = {name: 1 << name for name in (PACMAN, GHOST, BLINKY, PINKY, INKY, CLYDE, FRUIT)}
+# Access of a new node: Pac-Man, the four ghosts and the fruit may leave it in every direction.
+DEFAULT_ACCESS = (ACCESS_BITS[PACMAN] | ACCESS_BITS[BLINKY] | ACCESS_BITS[PINKY] | ACCESS_BITS[INKY]
+                  | ACCESS_BITS[CLYDE] | ACCESS_BITS[FRUIT])
+
 
 PELLET = 1
 POWERPELLET = 2
@@ -50,6 +56,14 @@ WAIT = "WAIT"
 RANDOM = "RANDOM"
 FREIGHT = "FREIGHT"
 SPAWN = "SPAWN"
+# Ghost modes in the order they are numbered in batch arrays, snapshots and observations.
+MODES = (SCATTER, CHASE, WAIT, RANDOM, FREIGHT, SPAWN)
+MODE_INDEX = {mode: index for index, mode in enumerate(MODES)}
+
+# How ghosts head for their goal: by the straight-line distance from the next
+# node, or along the shortest path through the maze.
+GREEDY = "GREEDY"
+SHORTEST_PATH = "SHORTEST_PATH"
 
 SCORETXT = 0
 READYTXT = 1
@@ -59,4 +73,40 @@ GAMEOVERTXT = 4
 
 DEATH = 5
 HELLO = 2
-IRS = 20
\ No newline at end of file
+IRS = 20
+
+FPS = 60
+FIXED_DT = 1.0 / FPS
+
+# Rules of the game, read by the game and by the batch engine.
+# Seconds every ghost mode lasts, and the mode that follows it.
+MODE_TIMES = {SCATTER: 7, CHASE: 20, WAIT: 3, RANDOM: 10, FREIGHT: 7, SPAWN: 5}
+NEXT_MODES = {WAIT: SCATTER, SCATTER: CHASE, CHASE: SCATTER, RANDOM: SCATTER, FREIGHT: SCATTER, SPAWN: WAIT}
+# Speeds in pixels per second on 16 pixel tiles, see Entity.set_speed().
+MODE_SPEEDS = {SCATTER: 110, CHASE: 110, WAIT: 110, RANDOM: 110, FREIGHT: 50, SPAWN: 200}
+ENTITY_SPEED = 100
+SPAWN_SPEED = 150
+# How each ghost mode picks directions, see Ghost.update_move_method().
+MODE_MOVE_METHODS = {SCATTER: "scatter_movement", CHASE: "goal_movement", WAIT: "wait_movement",
+                     RANDOM: "random_movement", FREIGHT: "freight_movement", SPAWN: "spawn_movement"}
+# Corner every ghost heads for in SCATTER mode.
+SCATTER_GOALS = {GHOST: (0, 0), BLINKY: (0, 0), PINKY: (520, 80), INKY: (520, 640), CLYDE: (0, TILEHEIGHT * NROWS)}
+
+COLLIDE_RADIUS = 5
+PELLET_RADIUS = int(2 * TILEWIDTH / 16)
+START_LIVES = 5
+GHOST_POINTS = 200
+FRUIT_POINTS = 100
+FRUIT_LEVEL_POINTS = 20
+FRUIT_LIFESPAN = 5
+# Numbers of eaten pellets at which a fruit appears.
+FRUIT_PELLETS = (50, 140)
+# Numbers of eaten pellets at which Inky and Clyde may leave the ghost house.
+INKY_PELLETS = 30
+CLYDE_PELLETS = 70
+# Seconds the game pauses after a level is cleared, Pac-Man dies or a ghost is eaten.
+LEVEL_PAUSE = 3
+DEATH_PAUSE = 3
+GHOST_EATEN_PAUSE = 1
+# Functions run when a timed pause ends, as numbered in batch arrays and snapshots.
+AFTER_NONE, AFTER_SHOW, AFTER_RESET, AFTER_RESTART, AFTER_NEXT = range(5)
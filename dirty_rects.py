@@ -0,0 +1,85 @@
+import pygame
+from constants import *
+
+
+def merge_rects(rects, bounds=None):
+    """
+    Merges overlapping rectangles so every pixel is pushed at most once.
+
+    Args:
+        rects (list): Rectangles or rect-like tuples.
+        bounds (pygame.Rect or None): Area the result is clipped to.
+
+    Returns:
+        list: Non-overlapping rectangles covering all the given ones.
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if bounds is not None:
+            rect = rect.clip(bounds)
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+        index = 0
+        while index < len(merged):
+            if merged[index].colliderect(rect):
+                rect.union_ip(merged.pop(index))
+                index = 0
+            else:
+                index += 1
+        merged.append(rect)
+    return merged
+
+
+class DirtyRects(object):
+    """
+    Keeps track of the screen areas drawn in the last frame for dirty-rectangle rendering.
+
+    Attributes:
+        previous (list): Areas drawn by sprites, text and HUD in the last frame.
+        background (pygame.Surface or None): Background shown in the last frame.
+        pellets (PelletGroup or None): Pellet group shown in the last frame.
+        pixels_pushed (int): Pixels sent to the display in the last frame.
+        total_pixels_pushed (int): Pixels sent to the display since the tracker was created.
+        frames (int): Number of frames rendered.
+    """
+
+    def __init__(self):
+        self.bounds = pygame.Rect((0, 0), SCREENSIZE)
+        self.previous = []
+        self.background = None
+        self.pellets = None
+        self.pixels_pushed = 0
+        self.total_pixels_pushed = 0
+        self.frames = 0
+
+    def needs_full_redraw(self, background, pellets):
+        """
+        Checks if the whole screen has to be drawn, which happens on the first frame,
+        when the background swaps and when a new level creates a new pellet group.
+        """
+        return background is not self.background or pellets is not self.pellets
+
+    def invalidate(self):
+        """
+        Forces a full redraw on the next frame.
+        """
+        self.background = None
+        self.pellets = None
+
+    def finish_frame(self, drawn, pushed, background, pellets):
+        """
+        Records a rendered frame.
+
+        Args:
+            drawn (list): Areas drawn by sprites, text and HUD this frame.
+            pushed (list): Areas sent to the display this frame.
+            background (pygame.Surface): Background shown this frame.
+            pellets (PelletGroup): Pellet group shown this frame.
+        """
+        self.previous = [rect for rect in drawn if rect is not None]
+        self.background = background
+        self.pellets = pellets
+        self.pixels_pushed = sum(rect.width * rect.height for rect in pushed)
+        self.total_pixels_pushed += self.pixels_pushed
+        self.frames += 1
@@ -10,6 +10,7 @@ class Entity():
 
     Attributes:
         name (str): The name of the entity.
+        access_bit (int): Bit of the name in the access masks of the nodes, 0 for none.
         directions (dict): Mapping of movement directions to vector values.
         direction (Vector): Current movement direction.
         speed (float): Movement speed of the entity.
@@ -41,8 +42,8 @@ class Entity():
             RIGHT: Vector(1, 0)
         }
         self.direction = STOP
-        self.speed = 100 * TILEWIDTH / 16
-        self.collide_radius = 5
+        self.speed = ENTITY_SPEED * TILEWIDTH / 16
+        self.collide_radius = COLLIDE_RADIUS
         self.radius = 10
         self.color = WHITE
         self.node = node
@@ -53,6 +54,15 @@ class Entity():
         self.set_spawn_node(node)
         self.image = None
 
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        self.access_bit = ACCESS_BITS.get(name, 0)
+
     def set_position(self):
         """
         Sets the position of the entity to the current node's position.
@@ -84,7 +94,7 @@ class Entity():
             bool: True if the direction is valid, False if its not.
         """
         if direction is not STOP:
-            if self.name in self.node.access[direction]:
+            if self.node.access[direction] & self.access_bit:
                 if self.node.neighbors[direction] is not None:
                     return True
         return False
@@ -129,10 +139,8 @@ class Entity():
             bool: True if the target has been overshot, False otherwise.
         """
         if self.target is not None:
-            vec1 = self.target.position - self.node.position
-            vec2 = self.position - self.node.position
-            node2_target = vec1.magnitudeSquared()
-            node2_self = vec2.magnitudeSquared()
+            node2_target = self.target.position.distanceSquared(self.node.position)
+            node2_self = self.position.distanceSquared(self.node.position)
             return node2_self >= node2_target
         return False
 
@@ -166,15 +174,17 @@ class Entity():
 
         Args:
             screen: The game screen surface.
+
+        Returns:
+            pygame.Rect or None: The area drawn, or None if the entity is hidden.
         """
         if self.visible:
             if self.image is not None:
-                adjust = Vector(TILEWIDTH, TILEHEIGHT) / 2
-                p = self.position - adjust
-                screen.blit(self.image, p.asTuple())
+                return screen.blit(self.image, (self.position.x - TILEWIDTH / 2, self.position.y - TILEHEIGHT / 2))
             else:
                 p = self.position.asInt()
-                pygame.draw.circle(screen, self.color, p, self.radius)
+                return pygame.draw.circle(screen, self.color, p, self.radius)
+        return None
 
     def setBetweenNodes(self, direction):
         """
@@ -202,5 +212,5 @@ class Entity():
         """
         self.set_spawn_node(self.spawn_node)
         self.direction = STOP
-        self.speed = 100 * TILEWIDTH / 16
+        self.speed = ENTITY_SPEED * TILEWIDTH / 16
         self.visible = True
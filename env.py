@@ -0,0 +1,325 @@
+import random
+import multiprocessing
+import numpy as np
+from constants import *
+from simulation import GameSimulation
+
+# Discrete actions: the index of the direction Pac-Man is steered in.
+ACTIONS = (STOP, UP, DOWN, LEFT, RIGHT)
+
+PACMAN_FEATURES = 3 + len(ACTIONS)
+GHOST_FEATURES = 2 + len(MODES)
+OBSERVATION_SIZE = PACMAN_FEATURES + 4 * GHOST_FEATURES + 2 + NROWS * NCOLS
+
+
+class EnvSimulation(GameSimulation):
+    """
+    GameSimulation that collects the points scored and notices the end of the game.
+    """
+
+    def __init__(self, seed=None):
+        super().__init__(headless=True, seed=seed)
+        self.reward = 0
+        self.game_over = False
+
+    def update_score(self, points):
+        GameSimulation.update_score(self, points)
+        self.reward += points
+
+    def on_game_over(self):
+        self.game_over = True
+
+
+class PacmanEnv(object):
+    """
+    Reset/step environment around the headless game, in the style of Gymnasium.
+
+    Observations are float32 vectors of OBSERVATION_SIZE values:
+    Pac-Man's position, alive flag and direction (one-hot), the position and mode
+    (one-hot) of every ghost, the lives and the level, and the pellets of the maze
+    as a NROWS x NCOLS grid holding 1 for a pellet and 2 for a power pellet.
+    Positions are divided by the screen size.
+
+    The reward of a step is the number of points scored in it. An episode ends
+    when the last life is lost, or is truncated after max_steps steps. The game is
+    resumed automatically when it waits for the player.
+
+    Attributes:
+        action_count (int): Number of discrete actions, see ACTIONS.
+        observation_size (int): Length of an observation.
+        frame_skip (int): Game steps per environment step, all with the same action.
+        dt (float): Simulated time of a game step in seconds.
+        max_steps (int or None): Steps after which an episode is truncated.
+        sim (EnvSimulation): The game of the current episode.
+        rng (random.Random): Draws the seed of every episode.
+    """
+
+    action_count = len(ACTIONS)
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, frame_skip=1, dt=FIXED_DT, max_steps=None):
+        self.frame_skip = frame_skip
+        self.dt = dt
+        self.max_steps = max_steps
+        self.sim = None
+        self.steps = 0
+        self.rng = random.Random()
+
+    def reset(self, seed=None):
+        """
+        Starts a new game.
+
+        Every game gets its own seed drawn from the environment's random stream,
+        so seeding the first reset makes all following episodes reproducible.
+
+        Args:
+            seed (int or None): Reseeds the environment's random stream.
+
+        Returns:
+            tuple: (observation, info)
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+        self.sim = EnvSimulation(self.rng.getrandbits(64))
+        self.sim.startGame()
+        self.steps = 0
+        return self.observe(), self.info()
+
+    def step(self, action):
+        """
+        Steers Pac-Man for frame_skip game steps.
+
+        Args:
+            action (int): Index into ACTIONS.
+
+        Returns:
+            tuple: (observation, reward, terminated, truncated, info)
+        """
+        sim = self.sim
+        direction = ACTIONS[int(action)]
+        sim.reward = 0
+        for _ in range(self.frame_skip):
+            if sim.pause.paused and sim.pause.pause_time is None:
+                sim.toggle_pause()
+            sim.step(self.dt, direction)
+            if sim.game_over:
+                break
+        self.steps += 1
+        terminated = sim.game_over
+        truncated = not terminated and self.max_steps is not None and self.steps >= self.max_steps
+        return self.observe(), float(sim.reward), terminated, truncated, self.info()
+
+    def info(self):
+        """
+        Returns the score, lives and level of the current game.
+        """
+        return {"score": self.sim.score, "lives": self.sim.lives, "level": self.sim.level}
+
+    def observe(self, out=None):
+        """
+        Writes the observation of the current game state into out, or a new array.
+        """
+        if out is None:
+            out = np.empty(OBSERVATION_SIZE, dtype=np.float32)
+        out[:] = 0
+        sim = self.sim
+        pacman = sim.pacman
+        out[0] = pacman.position.x / SCREENWIDTH
+        out[1] = pacman.position.y / SCREENHEIGHT
+        out[2] = pacman.alive
+        out[3 + ACTIONS.index(pacman.direction)] = 1
+
+        offset = PACMAN_FEATURES
+        for ghost in sim.ghosts:
+            out[offset] = ghost.position.x / SCREENWIDTH
+            out[offset + 1] = ghost.position.y / SCREENHEIGHT
+            out[offset + 2 + MODES.index(ghost.mode.current_mode)] = 1
+            offset += GHOST_FEATURES
+        out[offset] = sim.lives
+        out[offset + 1] = sim.level
+        offset += 2
+
+        pellets = out[offset:].reshape(NROWS, NCOLS)
+        grid = sim.pelletGroup.grid
+        rows, cols = min(grid.shape[0], NROWS), min(grid.shape[1], NCOLS)
+        pellets[:rows, :cols] = grid[:rows, :cols] >= 0
+        for pellet in sim.pelletGroup.power_pellets:
+            if sim.pelletGroup.contains(pellet) and pellet.row < NROWS and pellet.column < NCOLS:
+                pellets[pellet.row, pellet.column] = 2
+        return out
+
+    def close(self):
+        """
+        Drops the current game.
+        """
+        self.sim = None
+
+
+def worker(index, env_kwargs, buffers, conn):
+    """
+    Runs one environment of a SubprocVecEnv. Commands arrive over conn, the
+    observations, actions, rewards and flags are read and written in shared memory.
+    """
+    observations, actions, rewards, dones, scores = SubprocVecEnv.views(buffers)
+    env = PacmanEnv(**env_kwargs)
+    try:
+        while True:
+            command, seed = conn.recv()
+            if command == "step":
+                _, reward, terminated, truncated, info = env.step(actions[index])
+                rewards[index] = reward
+                dones[index] = terminated or truncated
+                scores[index] = info["score"]
+                if terminated or truncated:
+                    env.reset()
+                env.observe(observations[index])
+            elif command == "reset":
+                env.reset(seed)
+                env.observe(observations[index])
+                rewards[index] = 0
+                dones[index] = False
+                scores[index] = 0
+            else:
+                break
+            conn.send(None)
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        env.close()
+        conn.close()
+
+
+class SubprocVecEnv(object):
+    """
+    Runs M PacmanEnv instances in worker processes.
+
+    Observations, actions, rewards, done flags and scores live in shared memory
+    buffers that the workers read and write in place, so only a short command and
+    an empty reply cross the pipe of each worker per step. step_async() lets the
+    caller work while the workers step.
+
+    A finished episode is reset right away in its worker; the returned observation
+    is then the first one of the new episode and dones marks the reset.
+
+    Attributes:
+        num_envs (int): Number of environments.
+        observations (ndarray): (M, OBSERVATION_SIZE) float32 view of the shared observations.
+        actions (ndarray): (M,) int32 view of the shared actions.
+        rewards (ndarray): (M,) float32 view of the shared rewards.
+        dones (ndarray): (M,) bool view of the shared done flags.
+        scores (ndarray): (M,) int64 view of the shared scores.
+    """
+
+    def __init__(self, num_envs, env_kwargs=None, start_method=None):
+        """
+        Args:
+            num_envs (int): Number of environments and worker processes.
+            env_kwargs (dict or None): Arguments of every PacmanEnv.
+            start_method (str or None): multiprocessing start method, the platform default if None.
+        """
+        context = multiprocessing.get_context(start_method)
+        self.num_envs = num_envs
+        self.buffers = (num_envs,
+                        context.RawArray('f', num_envs * OBSERVATION_SIZE),
+                        context.RawArray('i', num_envs),
+                        context.RawArray('f', num_envs),
+                        context.RawArray('b', num_envs),
+                        context.RawArray('q', num_envs))
+        self.observations, self.actions, self.rewards, self.dones, self.scores = self.views(self.buffers)
+
+        self.conns = []
+        self.processes = []
+        for index in range(num_envs):
+            parent, child = context.Pipe()
+            process = context.Process(target=worker, args=(index, env_kwargs or {}, self.buffers, child), daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+        self.closed = False
+        self.waiting = False
+
+    @staticmethod
+    def views(buffers):
+        """
+        Wraps the shared buffers in NumPy arrays without copying them.
+        """
+        num_envs, observations, actions, rewards, dones, scores = buffers
+        return (np.frombuffer(observations, dtype=np.float32).reshape(num_envs, OBSERVATION_SIZE),
+                np.frombuffer(actions, dtype=np.int32),
+                np.frombuffer(rewards, dtype=np.float32),
+                np.frombuffer(dones, dtype=np.int8).view(bool),
+                np.frombuffer(scores, dtype=np.int64))
+
+    def send(self, command, seeds=None):
+        """
+        Sends a command to every worker.
+        """
+        for index, conn in enumerate(self.conns):
+            conn.send((command, None if seeds is None else seeds[index]))
+
+    def wait(self):
+        """
+        Waits until every worker has carried out its command.
+        """
+        for conn in self.conns:
+            conn.recv()
+
+    def reset(self, seed=None):
+        """
+        Starts a new game in every environment.
+
+        Args:
+            seed (int or None): Seed of the first environment, the others get seed + 1, seed + 2...
+
+        Returns:
+            ndarray: Copy of the observations.
+        """
+        seeds = None if seed is None else [seed + index for index in range(self.num_envs)]
+        self.send("reset", seeds)
+        self.wait()
+        return self.observations.copy()
+
+    def step_async(self, actions):
+        """
+        Starts stepping every environment without waiting for the result.
+        """
+        self.actions[:] = actions
+        self.send("step")
+        self.waiting = True
+
+    def step_wait(self):
+        """
+        Waits for the step started by step_async() and returns its result like step().
+        """
+        self.wait()
+        self.waiting = False
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy(), [{"score": int(score)} for score in self.scores]
+
+    def step(self, actions):
+        """
+        Steps every environment with its action.
+
+        Args:
+            actions (array): Index into ACTIONS for every environment.
+
+        Returns:
+            tuple: (observations, rewards, dones, infos)
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        if self.closed:
+            return
+        if self.waiting:
+            self.wait()
+        self.send("close")
+        for process in self.processes:
+            process.join()
+        for conn in self.conns:
+            conn.close()
+        self.closed = True
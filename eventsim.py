@@ -0,0 +1,824 @@
+import functools
+import heapq
+import math
+import time
+from constants import *
+from simulation import GameSimulation
+
+# Events at most this far apart are handled together.
+EVENT_TOLERANCE = 1e-9
+# Arrivals this close to a frame, in frames, are settled by replaying the fixed steps.
+TIE_FRAMES = 1e-6
+NEVER = math.inf
+# Timer deadlines whose frames are remembered, a few per clock are pending at a time.
+DEADLINE_CACHE_SIZE = 64
+# Times of the frames at FIXED_DT, grown on demand by fixed_time().
+FRAME_TIMES = [0.0]
+
+# Slots of the event heap. Every slot has at most one live event; planning it
+# again invalidates the one it had. Events due in the same frame are handled in
+# slot order, which is the order of step(): ghosts, contacts, then Pac-Man.
+GHOST_SLOT = 0
+TOUCH_SLOT = 4
+FRUIT_SLOT = 8
+PACMAN_SLOT = 9
+SLOTS = 10
+
+# Kinds of events.
+ARRIVAL = 0
+PELLET = 1
+TOUCH = 2
+STEER = 3
+RESUME = 4
+MODE = 5
+
+
+def contact_time(dx, dy, vx, vy, reach):
+    """
+    Returns when two points moving in straight lines first come within reach of each other.
+
+    Args:
+        dx, dy (float): Position of the second point relative to the first.
+        vx, vy (float): Velocity of the second point relative to the first.
+        reach (float): Distance at which they touch.
+
+    Returns:
+        float: 0 if they touch now, NEVER if they never will.
+    """
+    c = dx * dx + dy * dy - reach * reach
+    if c <= 0:
+        return 0.0
+    a = vx * vx + vy * vy
+    b = dx * vx + dy * vy
+    if a == 0 or b >= 0:
+        return NEVER
+    disc = b * b - a * c
+    if disc < 0:
+        return NEVER
+    return (-b - math.sqrt(disc)) / a
+
+
+def fixed_time(frames):
+    """
+    Returns the time a clock shows after some frames at FIXED_DT, rounded as it adds them up.
+    """
+    if frames >= len(FRAME_TIMES):
+        for _ in range(len(FRAME_TIMES), frames + 1):
+            FRAME_TIMES.append(FRAME_TIMES[-1] + FIXED_DT)
+    return FRAME_TIMES[frames]
+
+
+def frame_time(t):
+    """
+    Returns the time of the first frame at FIXED_DT that is not before t.
+    """
+    return fixed_time(max(math.ceil(t / FIXED_DT - TIE_FRAMES), 0))
+
+
+@functools.lru_cache(maxsize=DEADLINE_CACHE_SIZE)
+def deadline_time(deadline):
+    """
+    Returns the time of the frame at FIXED_DT in which a timer of a fixed-step clock runs.
+    """
+    frames = max(math.floor(deadline / FIXED_DT) - 1, 0)
+    while fixed_time(frames) < deadline:
+        frames += 1
+    return FRAME_TIMES[frames]
+
+
+def tick(clock, dt):
+    """
+    Moves a clock forward and runs the timers that became due, putting it on the time
+    a fixed-step clock shows when it lands on a frame.
+    """
+    now = clock.now + dt
+    frames = round(now / FIXED_DT)
+    if abs(now / FIXED_DT - frames) < TIE_FRAMES:
+        now = fixed_time(frames)
+    clock.now = max(clock.now, now)
+    clock.run_due()
+
+
+def replay(origin, frame):
+    """
+    Returns where the fixed steps from an origin of EventSimulation.origins put an entity by a frame.
+    """
+    start, x, y, sx, sy = origin[:5]
+    for _ in range(frame - start):
+        x += sx
+        y += sy
+    return x, y
+
+
+def moving(entity):
+    """
+    Returns whether an entity is on its way to another node.
+    """
+    return entity.direction != STOP and entity.target is not entity.node
+
+
+class EventSimulation(GameSimulation):
+    """
+    Headless game that jumps from one event to the next instead of stepping at a fixed rate.
+
+    Between events every entity moves in a straight line at a constant speed, so
+    nothing has to be decided. Each entity has the time of its next event in a
+    heap: Pac-Man and the ghosts reaching their target node, Pac-Man touching a
+    pellet the rules react to, and Pac-Man touching a ghost or the fruit. The
+    game jumps to the earliest of them or of the deadlines on the schedulers,
+    moving the entities analytically and eating the plain pellets on Pac-Man's
+    way in bulk. Only the entity an event concerns is updated and planned again,
+    and the contacts with Pac-Man when he turns. Anything that can change the
+    rules for everyone, a timer, a pause, a special pellet or a contact, plans
+    the whole game again.
+
+    Events are rounded up to the frame at FIXED_DT in which a fixed step would
+    see them, and an entity is put where the fixed steps since its last turn
+    put it, to the last bit, so a run plays out as run() does frame for frame.
+    A policy is asked for a direction at events only, and is expected to decide
+    from what changes at events, such as Pac-Man's node and direction. The power
+    pellets do not blink, as nothing is drawn.
+
+    Attributes:
+        events (list): Heap of (time, slot, version, kind), times on play_timers.
+        handled (int): Number of events handled so far.
+    """
+
+    def __init__(self, seed=None, ghost_targeting=GREEDY):
+        """
+        Args:
+            seed (int or None): Seed of the game's random stream, drawn at random if None.
+            ghost_targeting (str): GREEDY, the original ghosts, or SHORTEST_PATH.
+        """
+        GameSimulation.__init__(self, headless=True, seed=seed, ghost_targeting=ghost_targeting)
+        self.events = []
+        self.versions = [0] * SLOTS
+        self.due = [NEVER] * SLOTS
+        self.kinds = [ARRIVAL] * SLOTS
+        self.meals = []
+        self.origins = {}
+        self.trails = {}
+        self.handled = 0
+        self.stale = True
+        self.timed = False
+        self.timed_frame = None
+        self.checked = None
+        self.dying = NEVER
+        self.modes = {}
+        self.held = True
+        self.mark = None
+
+    def startGame(self):
+        GameSimulation.startGame(self)
+        self.pelletGroup.stop_flashing()
+        self.stale = self.held = True
+
+    def travel_time(self, entity):
+        """
+        Returns when an entity moving towards its target node gets there, NEVER if it stands still.
+        """
+        if not moving(entity):
+            return NEVER
+        node = entity.node.position
+        target = entity.target.position
+        position = entity.position
+        # Entities move along one axis, so distances along the edge are sums of the axis offsets.
+        edge = abs(target.x - node.x) + abs(target.y - node.y)
+        done = abs(position.x - node.x) + abs(position.y - node.y)
+        return max(edge - done, 0.0) / entity.speed
+
+    def arrival_time(self, entity):
+        """
+        Returns when the event of an entity reaching its target node is due, NEVER if it stands still.
+        That is the first frame after it gets there, when it is put back on the node.
+        """
+        wait = self.travel_time(entity)
+        if wait == NEVER:
+            return NEVER
+        frames = wait / FIXED_DT
+        if abs(frames - round(frames)) < TIE_FRAMES and entity in self.origins:
+            # Whether it gets there in this frame or the next is down to how run() rounds.
+            wait = self.overshoot_frames(entity, round(frames) + 1) * FIXED_DT
+        now = self.play_timers.now
+        return max(frame_time(now + wait) - now, 0.0)
+
+    def frame(self):
+        """
+        Returns the number of frames at FIXED_DT played so far.
+        """
+        return round(self.play_timers.now / FIXED_DT)
+
+    def track(self, entity):
+        """
+        Remembers where an entity starts moving in a straight line and how far it goes per frame,
+        keeping the origin it has if it still moves the same way.
+        """
+        origin = self.origins.get(entity)
+        frame = self.frame()
+        if not moving(entity):
+            if origin is not None:
+                del self.origins[entity]
+                self.trails[entity] = (origin, frame, self.rest(entity))
+            return
+        vector = entity.directions[entity.direction]
+        step = entity.speed * FIXED_DT
+        sx, sy = vector.x * step, vector.y * step
+        if origin is not None and origin[3:7] == (sx, sy, entity.node, entity.direction):
+            return
+        if origin is not None:
+            self.trails[entity] = (origin, frame, self.rest(entity))
+        position = entity.position
+        self.origins[entity] = (frame, position.x, position.y, sx, sy, entity.node, entity.direction, entity.target)
+
+    def rewind(self, entity, frames):
+        """
+        Puts an entity back where the fixed steps had it some frames ago, with the node, direction
+        and target it had then, if its origins go back that far.
+        """
+        if frames < 0:
+            return
+        frame = self.frame() - frames
+        origin = self.origins.get(entity)
+        if origin is None or origin[0] > frame:
+            origin, end, rest = self.trails.get(entity, (None, None, None))
+            if origin is None:
+                return
+            if frame >= end:
+                # It has stood where its last origin ended since.
+                self.restore(entity, rest)
+                return
+            if origin[0] > frame:
+                return
+        entity.position.set(*replay(origin, frame))
+        entity.node, entity.direction, entity.target = origin[5:]
+
+    @staticmethod
+    def rest(entity):
+        """
+        Returns the position, node, direction and target of an entity.
+        """
+        return entity.position.x, entity.position.y, entity.node, entity.direction, entity.target
+
+    @staticmethod
+    def restore(entity, rest):
+        """
+        Puts an entity back to what rest() returned for it.
+        """
+        x, y, entity.node, entity.direction, entity.target = rest
+        entity.position.set(x, y)
+
+    def aim(self, ghost, frames):
+        """
+        Updates the goal of a ghost as step() did some frames ago, with Pac-Man and Blinky where they were then.
+        """
+        mode = ghost.mode
+        current = mode.current_mode
+        timed = frames > 1 and self.timed_frame == self.frame()
+        if timed:
+            # A timer has changed the mode since that step().
+            mode.current_mode = self.modes[ghost]
+        elif current in (SCATTER, CHASE):
+            # step() updates the mode before the goal, which takes back a SCATTER Clyde chose on his own.
+            mode.current_mode = mode.main_mode.mode
+        if mode.current_mode is not CHASE:
+            # Only the goals of the chase follow Pac-Man.
+            ghost.update_goal()
+        else:
+            saved = [(entity, self.rest(entity)) for entity in (self.pacman, self.ghosts.blinky)]
+            self.rewind(self.pacman, frames)
+            if ghost is self.ghosts.inky:
+                # Blinky moves before Inky in a step().
+                self.rewind(self.ghosts.blinky, frames - 1)
+            ghost.update_goal()
+            for entity, rest in saved:
+                self.restore(entity, rest)
+        if timed:
+            mode.current_mode = current
+
+    def sync(self, entity):
+        """
+        Puts an entity where the fixed steps since its origin put it, to the last bit.
+        """
+        origin = self.origins.get(entity)
+        if origin is not None:
+            entity.position.set(*replay(origin, self.frame()))
+
+    def overshoot_frames(self, entity, limit):
+        """
+        Returns in how many frames the fixed steps from its origin take an entity past its target node.
+
+        Args:
+            entity (Entity): An entity with an origin.
+            limit (int): Frames returned if the steps never get there.
+        """
+        start, x, y, sx, sy = self.origins[entity][:5]
+        node = entity.node.position
+        reach = entity.target.position.distanceSquared(node)
+        frames = start - self.frame()
+        while frames < limit:
+            # The same test as overshot_target(), on the same floats.
+            if (x - node.x) ** 2 + (y - node.y) ** 2 >= reach:
+                return max(frames, 0)
+            x += sx
+            y += sy
+            frames += 1
+        return limit
+
+    def pellets_ahead(self, horizon):
+        """
+        Yields the pellets Pac-Man touches before a horizon, in the order he touches them.
+
+        Args:
+            horizon (float): Seconds to look ahead, at most until Pac-Man reaches his target node.
+
+        Yields:
+            tuple: Seconds until the contact, 0 for the pellets he touches now, and the pellet.
+        """
+        pacman = self.pacman
+        pellets = self.pelletGroup
+        position = pacman.position
+        if not moving(pacman):
+            for pellet in pellets.pellets_near(position):
+                if pacman.collideCheck(pellet):
+                    yield 0.0, pellet
+            return
+
+        step = pacman.directions[pacman.direction]
+        sx, sy = int(step.x), int(step.y)
+        distance = min(self.travel_time(pacman), horizon) * pacman.speed
+        grid = pellets.grid
+        rows, cols = grid.shape
+        row = int(round(position.y / TILEHEIGHT))
+        col = int(round(position.x / TILEWIDTH))
+        tiles = int(distance // min(TILEWIDTH, TILEHEIGHT)) + 2
+        for k in range(-1, tiles + 1):
+            r, c = row + k * sy, col + k * sx
+            if not (0 <= r < rows and 0 <= c < cols):
+                continue
+            slot = grid[r, c]
+            if slot < 0:
+                continue
+            pellet = pellets.slots[slot]
+            if pacman.collideCheck(pellet):
+                yield 0.0, pellet
+                continue
+            reach = pacman.collide_radius + pellet.collide_radius
+            along = (pellet.position.x - position.x) * sx + (pellet.position.y - position.y) * sy
+            if reach < along <= distance + reach:
+                yield (along - reach) / pacman.speed, pellet
+
+    def pellet_time(self, horizon=NEVER):
+        """
+        Returns when Pac-Man next touches a pellet, 0 if he touches one now.
+
+        Args:
+            horizon (float): Only pellets reached before this time are looked for.
+
+        Returns:
+            float: Seconds until the contact, NEVER if none is found before the horizon
+                or before Pac-Man reaches his target node.
+        """
+        for wait, _ in self.pellets_ahead(horizon):
+            return wait
+        return NEVER
+
+    def special_pellet(self, pellet, count):
+        """
+        Returns whether eating a pellet changes more than the score.
+
+        Args:
+            pellet (Pellet): The pellet.
+            count (int): Number of pellets eaten once it is eaten.
+        """
+        return (pellet.name == POWERPELLET or count in FRUIT_PELLETS or count == INKY_PELLETS
+                or count == CLYDE_PELLETS or count - self.pelletGroup.num_eaten == self.pelletGroup.remaining)
+
+    def velocity(self, entity):
+        """
+        Returns the velocity of an entity in pixels per second.
+        """
+        if not moving(entity):
+            return 0.0, 0.0
+        vector = entity.directions[entity.direction]
+        return vector.x * entity.speed, vector.y * entity.speed
+
+    def place(self, entity, frame):
+        """
+        Returns where the fixed steps put an entity by a frame if it goes on as it does.
+        """
+        origin = self.origins.get(entity)
+        if origin is None:
+            return entity.position.x, entity.position.y
+        return replay(origin, frame)
+
+    def touches(self, other, frames):
+        """
+        Returns whether the rules see Pac-Man touch a ghost or the fruit some frames from now,
+        with the same test as collideCheck() on the same floats.
+        """
+        frame = self.frame() + frames
+        px, py = self.place(self.pacman, frame - 1)
+        ox, oy = self.place(other, frame)
+        return (px - ox) ** 2 + (py - oy) ** 2 <= (self.pacman.collide_radius + other.collide_radius) ** 2
+
+    def touch_time(self, other):
+        """
+        Returns when Pac-Man touches a ghost or the fruit if neither of them turns, 0 if he touches it now.
+        """
+        pacman = self.pacman
+        vx, vy = self.velocity(pacman)
+        ox, oy = self.velocity(other)
+        # step() checks the contacts before it moves Pac-Man, so it sees him a frame late.
+        dx = other.position.x - pacman.position.x + vx * FIXED_DT
+        dy = other.position.y - pacman.position.y + vy * FIXED_DT
+        return contact_time(dx, dy, ox - vx, oy - vy, pacman.collide_radius + other.collide_radius)
+
+    def schedule(self, slot, wait, kind=ARRIVAL):
+        """
+        Replaces the event of a slot.
+
+        Args:
+            slot (int): Slot of the event.
+            wait (float): Seconds until the event, NEVER to leave the slot empty.
+                The event is due in the frame that follows.
+            kind (int): ARRIVAL, PELLET, TOUCH, STEER, RESUME or MODE.
+        """
+        self.versions[slot] += 1
+        self.due[slot] = NEVER
+        self.kinds[slot] = kind
+        if wait < NEVER:
+            self.due[slot] = frame_time(self.play_timers.now + wait)
+            heapq.heappush(self.events, (self.due[slot], slot, self.versions[slot], kind))
+
+    def plan_pacman(self):
+        """
+        Plans Pac-Man's next arrival or special pellet, and the plain pellets he eats on his way.
+        """
+        now = self.play_timers.now
+        wait = self.arrival_time(self.pacman)
+        kind = ARRIVAL
+        meals = []
+        count = self.pelletGroup.num_eaten
+        for contact, pellet in self.pellets_ahead(NEVER):
+            count += 1
+            meal = self.meal_time(contact, pellet)
+            if self.special_pellet(pellet, count):
+                wait = meal
+                kind = PELLET
+                break
+            meals.append((now + meal, pellet))
+        meals.reverse()
+        self.meals = meals
+        self.schedule(PACMAN_SLOT, wait, kind)
+
+    def meal_time(self, contact, pellet):
+        """
+        Returns when the rules see Pac-Man touch a pellet he reaches in some seconds.
+        """
+        if contact == 0 and self.checked != self.frame():
+            # The rules of this frame are still to run, and they may see him touch it already.
+            pacman = self.pacman
+            rest = self.rest(pacman)
+            self.rewind(pacman, 1)
+            touched = pacman.collideCheck(pellet)
+            self.restore(pacman, rest)
+            if touched:
+                return 0.0
+        # step() checks the pellets before it moves Pac-Man, so it sees him a frame late.
+        frames = contact / FIXED_DT + 1
+        if abs(frames - round(frames)) < TIE_FRAMES:
+            # Whether the rules see the contact in this frame or the next is down to how run() rounds.
+            frames = round(frames)
+            return (frames if self.touches(pellet, frames) else frames + 1) * FIXED_DT
+        return contact + FIXED_DT
+
+    def plan_touch(self, index):
+        """
+        Plans when Pac-Man next touches a ghost that can eat him or be eaten.
+        """
+        ghost = self.ghosts.ghosts_list[index]
+        mode = ghost.mode.current_mode
+        if mode == FREIGHT or (mode != SPAWN and self.pacman.alive):
+            self.plan_contact(TOUCH_SLOT + index, ghost)
+        else:
+            self.schedule(TOUCH_SLOT + index, NEVER)
+
+    def plan_fruit(self):
+        """
+        Plans when Pac-Man next touches the fruit.
+        """
+        if self.fruit is not None and not self.fruit.destroy:
+            self.plan_contact(FRUIT_SLOT, self.fruit)
+        else:
+            self.schedule(FRUIT_SLOT, NEVER)
+
+    def plan_contact(self, slot, other):
+        """
+        Plans when Pac-Man next touches a ghost or the fruit.
+        """
+        wait = self.touch_time(other)
+        frames = wait / FIXED_DT
+        if 0 < wait < NEVER and abs(frames - round(frames)) < TIE_FRAMES:
+            # Whether the rules see the contact in this frame or the next is down to how run() rounds.
+            frames = round(frames)
+            wait = (frames if self.touches(other, frames) else frames + 1) * FIXED_DT
+        elif wait == 0 and self.checked == self.frame():
+            # step() applies the rules once a frame.
+            wait = FIXED_DT
+        self.schedule(slot, wait, TOUCH)
+
+    def plan_contacts(self):
+        """
+        Plans Pac-Man's next move and his contacts with everything else.
+        """
+        self.plan_pacman()
+        for index in range(len(self.ghosts.ghosts_list)):
+            self.plan_touch(index)
+        self.plan_fruit()
+
+    def refresh(self):
+        """
+        Plans the whole game again, after something that can change the rules for every entity.
+        """
+        self.stale = False
+        steer = self.due[PACMAN_SLOT] if self.kinds[PACMAN_SLOT] == STEER else NEVER
+        self.events = []
+        self.meals = []
+        # A timer runs before the ghosts move in step(), anything else after.
+        choose = 0.0 if self.timed else FIXED_DT
+        self.timed = False
+        entities = (self.pacman, *self.ghosts.ghosts_list)
+        for entity in entities:
+            self.sync(entity)
+        if self.pause.paused:
+            self.origins = {}
+            self.trails = {}
+            self.held = True
+            return
+        # No step() has updated the ghost goals since the game was held.
+        kind = RESUME if self.held else ARRIVAL
+        self.held = False
+        self.checkFruitEvents()
+        for index, ghost in enumerate(self.ghosts.ghosts_list):
+            if moving(ghost) and kind == RESUME:
+                # Its mode is updated after it has moved in the first step().
+                self.track(ghost)
+                wait = self.arrival_time(ghost)
+                self.schedule(GHOST_SLOT + index, min(wait, FIXED_DT), kind if wait <= FIXED_DT else MODE)
+            elif moving(ghost):
+                self.update_mode(index)
+            else:
+                # A ghost standing on a node chooses again in the next step(),
+                # with the goal of the mode it had, as its mode is updated then.
+                self.track(ghost)
+                self.schedule(GHOST_SLOT + index, choose, kind)
+        self.track(self.pacman)
+        self.plan_contacts()
+        if steer < self.due[PACMAN_SLOT] and steer >= self.play_timers.now - EVENT_TOLERANCE:
+            # The action is still to be taken up in the frame it was planned for.
+            self.schedule(PACMAN_SLOT, steer - self.play_timers.now, STEER)
+
+    def update_mode(self, index):
+        """
+        Updates the mode of a moving ghost as step() does after moving it, and plans its next event.
+        """
+        ghost = self.ghosts.ghosts_list[index]
+        before = ghost.mode.main_mode.mode, ghost.speed
+        ghost.mode.update(0.0)
+        self.track(ghost)
+        wait, kind = self.arrival_time(ghost), ARRIVAL
+        if (ghost.mode.main_mode.mode, ghost.speed) != before and wait > FIXED_DT:
+            # A mode that changed can change again in the next step().
+            wait, kind = FIXED_DT, MODE
+        self.schedule(GHOST_SLOT + index, wait, kind)
+
+    def turn_ghost(self, ghost, goal=True):
+        """
+        Puts a ghost on the node it reached and lets it choose where to go next.
+
+        Args:
+            ghost (Ghost): The ghost.
+            goal (bool): Update its goal first, as the step() before would have.
+        """
+        target = ghost.target.position
+        ghost.position.set(target.x, target.y)
+        if goal:
+            # The goal it chooses with is the one of the step() before, which saw Pac-Man another frame back.
+            self.aim(ghost, 2)
+        ghost.update(0.0)
+        self.track(ghost)
+
+    def steer(self, action):
+        """
+        Plans to turn Pac-Man around or start him from a node in the next frame if the action asks to,
+        as step() does when it gets the action.
+        """
+        pacman = self.pacman
+        if pacman.target is pacman.node:
+            if not pacman.valid_direction(action):
+                return
+        elif not pacman.opposite_direction(action):
+            return
+        if self.due[PACMAN_SLOT] > self.play_timers.now + FIXED_DT + EVENT_TOLERANCE:
+            self.schedule(PACMAN_SLOT, FIXED_DT, STEER)
+
+    def handle(self, slot, kind, action):
+        """
+        Applies the rules to the entities of an event that is due.
+        """
+        self.handled += 1
+        if slot == PACMAN_SLOT:
+            if kind != PELLET:
+                pacman = self.pacman
+                if kind == ARRIVAL:
+                    target = pacman.target.position
+                    pacman.position.set(target.x, target.y)
+                else:
+                    self.sync(pacman)
+                pacman.update(0.0, action)
+                self.track(pacman)
+                self.plan_contacts()
+            else:
+                self.check(action)
+        elif slot < TOUCH_SLOT:
+            index = slot - GHOST_SLOT
+            ghost = self.ghosts.ghosts_list[index]
+            if kind == MODE:
+                self.sync(ghost)
+                self.update_mode(index)
+            else:
+                before = ghost.mode.main_mode.mode, ghost.speed
+                self.turn_ghost(ghost, kind != RESUME)
+                wait, kind = self.arrival_time(ghost), ARRIVAL
+                if not moving(ghost):
+                    # It chooses again in the next step(), unless it waits, blocked both ways,
+                    # for a timer or a pellet that plans the whole game again.
+                    wait = NEVER if ghost.mode.current_mode == WAIT else FIXED_DT
+                elif wait > FIXED_DT and (ghost.mode.current_mode == SPAWN
+                                          or (ghost.mode.main_mode.mode, ghost.speed) != before):
+                    # Its mode sees it at home or out of it after the next move,
+                    # and a mode that changed can change again.
+                    wait, kind = FIXED_DT, MODE
+                self.schedule(slot, wait, kind)
+            self.plan_touch(index)
+        else:
+            self.check(action)
+
+    def check(self, action):
+        """
+        Applies the pellet, fruit and ghost rules as step() does, and plans the game again.
+        """
+        self.checked = self.frame()
+        # The rules see Pac-Man where the step() before left him.
+        pacman = self.pacman
+        rest = self.rest(pacman)
+        self.rewind(pacman, 1)
+        # They also run before step() moves the clock of the pauses on.
+        now = self.timers.now
+        self.timers.now = fixed_time(max(round(now / FIXED_DT) - 1, 0))
+        # step() has updated every ghost goal just before, and they are kept if the game is held.
+        for ghost in self.ghosts.ghosts_list:
+            self.sync(ghost)
+            self.aim(ghost, 1)
+        self.checkPelletEvents()
+        self.checkFruitEvents()
+        self.checkGhostEvents()
+        self.timers.now = now
+        # A step() that pauses the game or kills Pac-Man does not move him.
+        if pacman.alive and not self.pause.paused:
+            self.restore(pacman, rest)
+        else:
+            self.origins.pop(pacman, None)
+        if not pacman.alive:
+            self.die_step(action)
+        self.stale = True
+
+    def die_step(self, action):
+        """
+        Moves a dead Pac-Man on by a frame, as step() does even while the game is held for his death.
+        """
+        pacman = self.pacman
+        pacman.update(FIXED_DT, action)
+        self.dying = fixed_time(round(self.timers.now / FIXED_DT) + 1)
+        if pacman.direction == STOP and not pacman.overshot_target():
+            # Stopped between two nodes, he stays there whatever the action.
+            self.dying = NEVER
+
+    def next_event_time(self):
+        """
+        Returns the time until the next event of the game, NEVER if nothing will happen.
+        """
+        if self.stale:
+            self.refresh()
+        best = NEVER
+        deadline = self.timers.next_deadline()
+        if deadline is not None:
+            best = deadline_time(deadline) - self.timers.now
+        if not self.pacman.alive:
+            best = min(best, self.dying - self.timers.now)
+        if not self.pause.paused:
+            deadline = self.play_timers.next_deadline()
+            if deadline is not None:
+                best = min(best, deadline_time(deadline) - self.play_timers.now)
+            events, versions = self.events, self.versions
+            while events and events[0][2] != versions[events[0][1]]:
+                heapq.heappop(events)
+            if events:
+                best = min(best, events[0][0] - self.play_timers.now)
+        return max(best, 0.0)
+
+    def drift(self, dt):
+        """
+        Moves the game forward to a time not past the next event without applying the rules,
+        but for the plain pellets Pac-Man eats on his way.
+
+        Args:
+            dt (float): Simulated time in seconds.
+        """
+        self.stats.steps += 1
+        self.stats.simulated_time += dt
+        if not self.pause.paused:
+            meals = self.meals
+            until = self.play_timers.now + dt + EVENT_TOLERANCE
+            while meals and meals[-1][0] <= until:
+                self.eat_pellet(meals.pop()[1])
+            if dt == 0:
+                # Nothing moves, and the timers due now have run.
+                return
+            for entity in (self.pacman, *self.ghosts.ghosts_list):
+                if moving(entity):
+                    entity.position.add_scaled(entity.directions[entity.direction], entity.speed * dt)
+            deadline = self.play_timers.next_deadline()
+            if deadline is not None and deadline <= self.play_timers.now + dt + EVENT_TOLERANCE:
+                self.modes = {ghost: ghost.mode.main_mode.mode if ghost.mode.current_mode in (SCATTER, CHASE)
+                              else ghost.mode.current_mode for ghost in self.ghosts.ghosts_list}
+            fired = self.play_timers.fired
+            tick(self.play_timers, dt)
+            if self.play_timers.fired != fired:
+                self.stale = self.timed = True
+                self.timed_frame = self.frame()
+        fired = self.timers.fired
+        tick(self.timers, dt)
+        if self.timers.fired != fired:
+            self.stale = True
+
+    def run_for(self, duration, action=STOP, auto_resume=True):
+        """
+        Plays the game for some simulated time, jumping from event to event.
+
+        Args:
+            duration (float): Simulated time in seconds.
+            action (int or callable): Direction for the whole run, or a function that
+                gets the simulation and returns the direction, asked at every event.
+            auto_resume (bool): Resume the game whenever it waits for the player,
+                as if space was pressed, so long runs continue after a lost life.
+
+        Returns:
+            RunStats: The stats of the simulation, including this run.
+        """
+        start = time.perf_counter()
+        remaining = duration
+        if self.mark != self.state_mark():
+            # The game has been stepped or paused since the last run.
+            self.origins = {}
+            self.trails = {}
+            self.stale = True
+        while True:
+            # run() resumes the game before a step, not after the one that paused it.
+            if (auto_resume and self.pause.paused and self.pause.pause_time is None
+                    and remaining > EVENT_TOLERANCE):
+                self.toggle_pause()
+                self.stale = True
+            if self.stale:
+                self.refresh()
+            direction = action(self) if callable(action) else action
+            if not self.pause.paused and self.pacman.alive:
+                self.steer(direction)
+            wait = self.next_event_time()
+            if wait > remaining + EVENT_TOLERANCE:
+                if remaining > 0:
+                    self.drift(remaining)
+                break
+            self.drift(wait)
+            remaining -= wait
+            if not self.pacman.alive and self.dying <= self.timers.now + EVENT_TOLERANCE:
+                self.die_step(direction)
+                continue
+            events, versions = self.events, self.versions
+            until = self.play_timers.now + EVENT_TOLERANCE
+            while not self.stale and events and events[0][0] <= until:
+                _, slot, version, kind = heapq.heappop(events)
+                if version == versions[slot]:
+                    self.handle(slot, kind, direction)
+                    if slot == PACMAN_SLOT:
+                        # The policy decides how Pac-Man goes on from where the event left him.
+                        break
+        self.mark = self.state_mark()
+        self.stats.wall_time += time.perf_counter() - start
+        return self.stats
+
+    def state_mark(self):
+        """
+        Returns what changes when the game is stepped or paused from outside run_for().
+        """
+        return self.stats.steps, self.pause.paused, self.pause.pause_time
@@ -0,0 +1,133 @@
+from collections import deque
+import numpy as np
+from constants import *
+from maze_compiler import NODE_SYMBOLS, PATH_SYMBOLS
+from nodes import NEIGHBOR_COLUMN
+
+UNREACHED = -1
+
+
+class FlowField(object):
+    """
+    Distance in tiles from Pac-Man to every tile of the maze, shared by the ghosts and bots.
+
+    The field is a breadth-first search over the walkable tiles of the maze
+    text, starting at the tile of pacman.node. Steps between neighboring tiles
+    cost 1 and the portals cost nothing. It is only searched again when
+    pacman.node changes, so any number of readers share one search per node
+    Pac-Man passes. Access rules are not applied: the distance is the same for
+    every entity. Tiles that cannot be reached, such as those of the ghost
+    home, hold UNREACHED.
+
+    Attributes:
+        pacman (Pacman): Entity the distances are measured from.
+        nodes (NodeGroup or None): Node group the tile tables were built for.
+        node (Node or None): Node of Pac-Man the field was searched from.
+        distances (ndarray): (rows, cols) int32 distances in tiles.
+        searches (int): Number of searches done so far.
+    """
+
+    def __init__(self, pacman):
+        """
+        Args:
+            pacman (Pacman): Entity to measure the distances from.
+        """
+        self.pacman = pacman
+        self.nodes = None
+        self.node = None
+        self.distances = np.zeros((0, 0), dtype=np.int32)
+        self.searches = 0
+
+    def build(self, nodes):
+        """
+        Builds the tile neighbor lists of the maze of a node group, portals included.
+
+        Args:
+            nodes (NodeGroup): Node group of the maze, with its portals set.
+        """
+        chars = nodes.maze.chars()
+        rows, cols = chars.shape
+        walkable = np.isin(chars, NODE_SYMBOLS + PATH_SYMBOLS).ravel().tolist()
+        self.nodes = nodes
+        self.node = None
+        self.shape = (rows, cols)
+        self.steps = [[] for _ in range(rows * cols)]
+        self.portals = [[] for _ in range(rows * cols)]
+        for index, open_tile in enumerate(walkable):
+            if not open_tile:
+                continue
+            row, col = divmod(index, cols)
+            for other_row, other_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if 0 <= other_row < rows and 0 <= other_col < cols and walkable[other_row * cols + other_col]:
+                    self.steps[index].append(other_row * cols + other_col)
+
+        partners = nodes.neighbors[:, NEIGHBOR_COLUMN[PORTAL]].tolist()
+        for index, partner in enumerate(partners):
+            if partner >= 0:
+                tile = self.tile_index(*nodes.positions[index].tolist())
+                other = self.tile_index(*nodes.positions[partner].tolist())
+                if tile is not None and other is not None:
+                    self.portals[tile].append(other)
+
+    def tile_index(self, x, y):
+        """
+        Returns the flat index of the tile under a point, None outside the maze.
+        """
+        rows, cols = self.shape
+        col, row = int(x // TILEWIDTH), int(y // TILEHEIGHT)
+        if 0 <= row < rows and 0 <= col < cols:
+            return row * cols + col
+        return None
+
+    def update(self):
+        """
+        Searches the field again if Pac-Man has moved on to another node.
+
+        Returns:
+            bool: Whether a search was done.
+        """
+        node = self.pacman.node
+        if node is self.node and node.group is self.nodes:
+            return False
+        if node.group is not self.nodes:
+            self.build(node.group)
+        self.node = node
+
+        distances = [UNREACHED] * len(self.steps)
+        start = self.tile_index(node.position.x, node.position.y)
+        if start is not None:
+            distances[start] = 0
+            queue = deque([start])
+            steps, portals = self.steps, self.portals
+            while queue:
+                tile = queue.popleft()
+                distance = distances[tile]
+                for other in portals[tile]:
+                    if distances[other] == UNREACHED or distances[other] > distance:
+                        distances[other] = distance
+                        queue.appendleft(other)
+                for other in steps[tile]:
+                    if distances[other] == UNREACHED or distances[other] > distance + 1:
+                        distances[other] = distance + 1
+                        queue.append(other)
+        self.distances = np.array(distances, dtype=np.int32).reshape(self.shape)
+        self.searches += 1
+        return True
+
+    def distance(self, x, y):
+        """
+        Returns the distance in tiles from Pac-Man to the tile under a point.
+
+        Args:
+            x (float): X coordinate in pixels.
+            y (float): Y coordinate in pixels.
+
+        Returns:
+            int: Number of tiles, UNREACHED if the tile cannot be reached.
+        """
+        self.update()
+        col, row = int(x // TILEWIDTH), int(y // TILEHEIGHT)
+        rows, cols = self.distances.shape
+        if 0 <= row < rows and 0 <= col < cols:
+            return int(self.distances[row, col])
+        return UNREACHED
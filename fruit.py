@@ -15,33 +15,66 @@ class Fruit(Entity):
             destroy (bool): Indicates whether the fruit should be removed.
             points (int): The score awarded when the fruit is collected.
             sprites (FruitSprites): The sprite representation of the fruit.
+            deadline (float or None): Scheduler time at which the fruit disappears.
     """
 
-    def __init__(self, node, level=0):
+    def __init__(self, node, level=0, headless=False, scheduler=None):
         """
         Initializes a fruit entity.
 
         Args:
             node (Node): The initial position of the fruit.
             level (int): The game level, affecting the fruit's point value.
+            headless (bool): If True, no sprites are created.
+            scheduler (Scheduler or None): If given, the fruit disappears at a deadline on it
+                instead of counting its age in update().
         """
         Entity.__init__(self, node)
         self.name = FRUIT
         self.color = GREEN
-        self.lifespan = 5
+        self.lifespan = FRUIT_LIFESPAN
         self.timer = 0
         self.destroy = False
-        self.points = 100 + level * 20
+        self.points = FRUIT_POINTS + level * FRUIT_LEVEL_POINTS
         self.setBetweenNodes(RIGHT)
-        self.sprites = FruitSprites(self, level)
+        self.sprites = None if headless else FruitSprites(self, level)
+        self.scheduler = scheduler
+        self.deadline = None
+        self.expiry = None
+        if scheduler is not None:
+            self.schedule(scheduler.now + self.lifespan)
 
     def update(self, dt):
         """
         Updates the fruit's state based on elapsed time.
+        Does nothing when the fruit disappears at a scheduler deadline.
 
         Args:
             dt (float): Time elapsed since the last update.
         """
+        if self.scheduler is not None:
+            return
         self.timer += dt
         if self.timer >= self.lifespan:
             self.destroy = True
+
+    def schedule(self, deadline):
+        """
+        Sets when the fruit disappears on the scheduler, replacing the previous deadline.
+
+        Args:
+            deadline (float or None): Scheduler time, None to keep the fruit.
+        """
+        if self.expiry is not None:
+            self.expiry.cancel()
+            self.expiry = None
+        self.deadline = deadline
+        if deadline is not None:
+            self.expiry = self.scheduler.call_at(deadline, self.expire)
+
+    def expire(self):
+        """
+        Marks the fruit for removal. Called by the scheduler.
+        """
+        self.expiry = None
+        self.destroy = True
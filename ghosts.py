@@ -1,10 +1,12 @@
 from pygame.locals import *
 from vector import Vector
 from constants import *
-from random import randint
+import random
 from entity import Entity
 from modes import ModeController
 from sprites import GhostSprites
+from nodes import NEIGHBOR_DIRECTIONS
+from flowfield import FlowField, UNREACHED
 
 
 class Ghost(Entity):
@@ -12,59 +14,46 @@ class Ghost(Entity):
     Base class for all ghost entities in the game. Handles movement, modes, and interactions with Pacman
     """
 
-    def __init__(self, node, pacman):
+    def __init__(self, node, pacman, rng=None, targeting=GREEDY, scheduler=None):
         super().__init__(node)
         self.name = GHOST
-        self.points = 200
+        self.rng = rng if rng is not None else random.Random()
+        self.targeting = targeting
+        self.flow_field = None
+        self.points = GHOST_POINTS
         self.goal = Vector()
         self.pacman = pacman
-        self.mode = ModeController(self)
+        self.sprites = None
+        self.scheduler = scheduler
+        self.mode = ModeController(self, scheduler=scheduler)
         self.update_move_method()
 
     def update_move_method(self):
         """
         Updates the movement method based on the ghost's current mode
         """
-        if self.mode.current_mode is SCATTER:
-            self.set_speed(110)
-            self.move_method = self.scatter_movement
-
-        elif self.mode.current_mode is CHASE:
-            self.set_speed(110)
-            self.move_method = self.goal_movement
-
-        elif self.mode.current_mode is WAIT:
-            self.set_speed(110)
-            self.move_method = self.wait_movement
-
-        elif self.mode.current_mode is RANDOM:
-            self.set_speed(110)
-            self.move_method = self.random_movement
-
-        elif self.mode.current_mode is FREIGHT:
-            self.set_speed(50)
-            self.move_method = self.freight_movement
-
-        elif self.mode.current_mode is SPAWN:
-            self.set_speed(200)
-            self.move_method = self.spawn_movement
+        mode = self.mode.current_mode
+        if mode in MODE_SPEEDS:
+            self.set_speed(MODE_SPEEDS[mode])
+            self.move_method = getattr(self, MODE_MOVE_METHODS[mode])
 
     def update_goal(self):
         """
         Updates the goal position of the ghost based on its current mode
         """
         if self.mode.current_mode is CHASE:
-            self.goal = self.pacman.node.position
+            self.goal.set(self.pacman.node.position.x, self.pacman.node.position.y)
 
         elif self.mode.current_mode is SCATTER:
-            self.goal = self.scatter_goal
+            self.goal.set(*SCATTER_GOALS[self.name])
 
     def update(self, dt):
         """
         Updates ghost movement and mode control
         """
-        self.position += self.directions[self.direction] * self.speed * dt
-        self.sprites.update()
+        self.position.add_scaled(self.directions[self.direction], self.speed * dt)
+        if self.sprites is not None:
+            self.sprites.update()
         self.mode.update(dt)
 
         if self.overshot_target():
@@ -110,23 +99,107 @@ class Ghost(Entity):
         Returns: random element from given directions list
         """
 
-        return directions[randint(0, len(directions) - 1)]
+        return directions[self.rng.randint(0, len(directions) - 1)]
 
     def goal_movement(self, directions):
         """
         Method for getting the best direction from list to chase Pacman
 
+        Returns the direction chosen by the ghost's targeting, GREEDY or SHORTEST_PATH
+        """
+        if self.targeting is SHORTEST_PATH:
+            return self.path_movement(directions)
+        return self.greedy_movement(directions)
+
+    def greedy_movement(self, directions):
+        """
+        Method for getting the direction from list that leads straight towards the goal
+
         Returns the direction that minimizes the distance to the goal
         """
         distances = []
+        position = self.node.position
+        goal = self.goal
 
         for direction in directions:
-            distance = self.node.position + self.directions[direction] * TILEWIDTH - self.goal
-            distances.append(distance.magnitudeSquared())
+            vector = self.directions[direction]
+            dx = position.x + vector.x * TILEWIDTH - goal.x
+            dy = position.y + vector.y * TILEWIDTH - goal.y
+            distances.append(dx**2 + dy**2)
 
         index = distances.index(min(distances))
         return directions[index]
 
+    def path_movement(self, directions):
+        """
+        Method for getting the direction from list that starts the shortest path to the goal
+
+        The path goes to the node closest to the goal and only takes the moves the
+        ghost is allowed to, looked up in the node group's shortest path tables.
+        A goal on Pacman's node is looked up in the shared flow field instead.
+        If the first move of the path is not in the list, the direction whose
+        neighbor is closest to the goal along the maze is taken instead, and
+        greedy_movement() if the goal cannot be reached at all.
+
+        Returns the direction that minimizes the path length to the goal
+        """
+        if self.flow_field is not None and self.goal == self.pacman.node.position:
+            direction = self.chase_movement(directions)
+            if direction is not None:
+                return direction
+
+        group = self.node.group
+        dist, hop = group.shortestPaths(self.name)
+        node = self.node.index
+        goal = group.nearestNode(self.goal.x, self.goal.y)
+        column = hop[node, goal]
+        if column >= 0 and NEIGHBOR_DIRECTIONS[column] in directions:
+            return NEIGHBOR_DIRECTIONS[column]
+
+        best = None
+        best_length = float("inf")
+        position = self.node.position
+        for direction in directions:
+            neighbor = self.node.neighbors[direction]
+            if neighbor is None:
+                continue
+            step = abs(neighbor.position.x - position.x) + abs(neighbor.position.y - position.y)
+            length = step + dist[neighbor.index, goal]
+            if length < best_length:
+                best, best_length = direction, length
+        if best is None:
+            return self.greedy_movement(directions)
+        return best
+
+    def chase_movement(self, directions):
+        """
+        Method for getting the direction from list with the shortest way to Pacman
+
+        Returns the direction whose neighbor is the fewest tiles away from Pacman in
+        the shared flow field, None if Pacman cannot be reached from any of them
+        """
+        best = None
+        best_distance = float("inf")
+        position = self.node.position
+        for direction in directions:
+            neighbor = self.node.neighbors[direction]
+            if neighbor is None:
+                continue
+            distance = self.flow_field.distance(neighbor.position.x, neighbor.position.y)
+            if distance == UNREACHED:
+                continue
+            distance += (abs(neighbor.position.x - position.x) + abs(neighbor.position.y - position.y)) // TILEWIDTH
+            if distance < best_distance:
+                best, best_distance = direction, distance
+        return best
+
+    def pacman_distance(self):
+        """
+        Returns the number of tiles between the ghost and Pacman through the maze,
+        UNREACHED if the ghost is outside of the maze paths
+        """
+        return self.flow_field.distance(self.position.x, self.position.y)
+
     def wait_movement(self, directions):
         """
         Returns opposite direction
@@ -157,14 +230,14 @@ class Ghost(Entity):
         """
         self.mode.set_freight_mode()
         if self.mode.current_mode == FREIGHT:
-            self.set_speed(50)
+            self.set_speed(MODE_SPEEDS[FREIGHT])
             self.move_method = self.random_movement
 
     def normal_mode(self):
         """
         Puts the ghost into normal mode
         """
-        self.set_speed(100)
+        self.set_speed(ENTITY_SPEED)
         self.move_method = self.goal_movement
         self.spawn_node.denyAccess(DOWN, self)
 
@@ -172,7 +245,7 @@ class Ghost(Entity):
         """
         Sets ghosts home goal
         """
-        self.goal = self.home_goal
+        self.goal.set(self.home_goal.x, self.home_goal.y)
 
     def start_spawn(self):
         """
@@ -180,7 +253,7 @@ class Ghost(Entity):
         """
         self.mode.set_spawn_mode()
         if self.mode.current_mode == SPAWN:
-            self.set_speed(150)
+            self.set_speed(SPAWN_SPEED)
             self.move_method = self.goal_movement
             self.spawn()
 
@@ -189,7 +262,7 @@ class Ghost(Entity):
         Resets the ghost to its initial state
         """
         Entity.reset(self)
-        self.points = 200
+        self.points = GHOST_POINTS
         self.move_method = self.goal_movement
 
 
@@ -198,22 +271,24 @@ class Blinky(Ghost):
     Blinky is the red ghost that directly chases Pacman
     """
 
-    def __init__(self, node, pacman):
-        super().__init__(node, pacman)
-        self.mode = ModeController(self, SCATTER)
+    def __init__(self, node, pacman, headless=False, rng=None, targeting=GREEDY, scheduler=None):
+        super().__init__(node, pacman, rng, targeting, scheduler)
+        self.mode.cancel()
+        self.mode = ModeController(self, SCATTER, scheduler)
         self.color = PURPLE
         self.name = BLINKY
-        self.sprites = GhostSprites(self)
+        if not headless:
+            self.sprites = GhostSprites(self)
 
     def update_goal(self):
         if self.mode.current_mode is CHASE:
-            self.goal = self.pacman.node.position
+            self.goal.set(self.pacman.node.position.x, self.pacman.node.position.y)
 
         elif self.mode.current_mode is SCATTER:
-            self.goal = Vector(0, 0)
+            self.goal.set(*SCATTER_GOALS[BLINKY])
 
         elif self.mode.current_mode is SPAWN:
-            self.goal = self.home_goal
+            self.goal.set(self.home_goal.x, self.home_goal.y)
 
 
 class Pinky(Ghost):
@@ -221,21 +296,24 @@ class Pinky(Ghost):
     Pinky predicts Pacman's movement and moves 4 tiles ahead
     """
 
-    def __init__(self, node, pacman):
-        super().__init__(node, pacman)
+    def __init__(self, node, pacman, headless=False, rng=None, targeting=GREEDY, scheduler=None):
+        super().__init__(node, pacman, rng, targeting, scheduler)
         self.color = PINK
         self.name = PINKY
-        self.sprites = GhostSprites(self)
+        if not headless:
+            self.sprites = GhostSprites(self)
 
     def update_goal(self):
         if self.mode.current_mode is CHASE:
-            self.goal = self.pacman.node.position + self.pacman.directions[self.pacman.direction] * TILEWIDTH * 4
+            node = self.pacman.node.position
+            ahead = self.pacman.directions[self.pacman.direction]
+            self.goal.set(node.x + ahead.x * TILEWIDTH * 4, node.y + ahead.y * TILEWIDTH * 4)
 
         elif self.mode.current_mode is SCATTER:
-            self.goal = Vector(520, 80)
+            self.goal.set(*SCATTER_GOALS[PINKY])
 
         elif self.mode.current_mode is SPAWN:
-            self.goal = self.home_goal
+            self.goal.set(self.home_goal.x, self.home_goal.y)
 
 
 class Inky(Ghost):
@@ -243,68 +321,86 @@ class Inky(Ghost):
     Inky's behavior depends on both Pacman and Blinky's positions
     """
 
-    def __init__(self, node, pacman, blinky=None):
-        super().__init__(node, pacman)
+    def __init__(self, node, pacman, blinky=None, headless=False, rng=None, targeting=GREEDY, scheduler=None):
+        super().__init__(node, pacman, rng, targeting, scheduler)
         self.color = CYAN
         self.blinky = blinky
         self.name = INKY
-        self.sprites = GhostSprites(self)
+        if not headless:
+            self.sprites = GhostSprites(self)
 
     def update_goal(self):
         if self.mode.current_mode is CHASE:
-            pacman_plus_two = self.pacman.position + self.pacman.directions[self.pacman.direction] * TILEWIDTH * 2
-            self.goal = (pacman_plus_two - self.blinky.position) * 2 + self.blinky.position
+            pacman = self.pacman.position
+            ahead = self.pacman.directions[self.pacman.direction]
+            blinky = self.blinky.position
+            self.goal.set((pacman.x + ahead.x * TILEWIDTH * 2 - blinky.x) * 2 + blinky.x,
+                          (pacman.y + ahead.y * TILEWIDTH * 2 - blinky.y) * 2 + blinky.y)
 
         elif self.mode.current_mode is SCATTER:
-            self.goal = Vector(520, 640)
+            self.goal.set(*SCATTER_GOALS[INKY])
 
         elif self.mode.current_mode is SPAWN:
-            self.goal = self.home_goal
+            self.goal.set(self.home_goal.x, self.home_goal.y)
 
 
 class Clyde(Ghost):
     """
-    Clyde moves towards Pacman but runs away if he's 8 tiles close to him
+    Clyde moves towards Pacman but runs away if he's 8 tiles close to him,
+    counted through the maze when targeting SHORTEST_PATH
     """
 
-    def __init__(self, node, pacman):
-        super().__init__(node, pacman)
+    def __init__(self, node, pacman, headless=False, rng=None, targeting=GREEDY, scheduler=None):
+        super().__init__(node, pacman, rng, targeting, scheduler)
         self.color = ORANGE
         self.name = CLYDE
-        self.sprites = GhostSprites(self)
+        if not headless:
+            self.sprites = GhostSprites(self)
 
     def update_goal(self):
         if self.mode.current_mode is CHASE:
-            d = self.pacman.position - self.position
-
-            d_squared = d.magnitudeSquared()
+            if self.targeting is SHORTEST_PATH and self.flow_field is not None:
+                distance = self.pacman_distance()
+                close = distance != UNREACHED and distance <= 8
+            else:
+                close = self.pacman.position.distanceSquared(self.position) <= (TILEWIDTH * 8) ** 2
 
-            if d_squared <= (TILEWIDTH * 8) ** 2:
+            if close:
                 self.mode.current_mode = SCATTER
-                self.goal = Vector(0, TILEHEIGHT * NROWS)
+                self.goal.set(*SCATTER_GOALS[CLYDE])
 
             else:
-                self.goal = self.pacman.node.position + self.pacman.directions[self.pacman.direction] * TILEWIDTH * 4
+                node = self.pacman.node.position
+                ahead = self.pacman.directions[self.pacman.direction]
+                self.goal.set(node.x + ahead.x * TILEWIDTH * 4, node.y + ahead.y * TILEWIDTH * 4)
 
         elif self.mode.current_mode is SCATTER:
-            self.goal = Vector(0, TILEHEIGHT * NROWS)
+            self.goal.set(*SCATTER_GOALS[CLYDE])
 
         elif self.mode.current_mode is SPAWN:
-            self.goal = self.home_goal
+            self.goal.set(self.home_goal.x, self.home_goal.y)
 
 
 class GhostsGroup():
     """
     Manages all ghost entities in the game
+
+    The ghosts share one flow field of the distances to Pacman, searched again
+    only when Pacman reaches another node. Given a scheduler, their modes end
+    at deadlines on it instead of counting time in update
     """
 
-    def __init__(self, node, pacman):
-        self.blinky = Blinky(node, pacman)
-        self.pinky = Pinky(node, pacman)
-        self.inky = Inky(node, pacman, self.blinky)
-        self.clyde = Clyde(node, pacman)
+    def __init__(self, node, pacman, headless=False, rng=None, targeting=GREEDY, scheduler=None):
+        self.rng = rng if rng is not None else random.Random()
+        self.flow_field = FlowField(pacman)
+        self.blinky = Blinky(node, pacman, headless, self.rng, targeting, scheduler)
+        self.pinky = Pinky(node, pacman, headless, self.rng, targeting, scheduler)
+        self.inky = Inky(node, pacman, self.blinky, headless, self.rng, targeting, scheduler)
+        self.clyde = Clyde(node, pacman, headless, self.rng, targeting, scheduler)
 
         self.ghosts_list = [self.blinky, self.pinky, self.inky, self.clyde]
+        for ghost in self.ghosts_list:
+            ghost.flow_field = self.flow_field
 
     def __iter__(self):
         return iter(self.ghosts_list)
@@ -323,8 +419,12 @@ class GhostsGroup():
         self.resetPoints()
 
     def render(self, screen):
+        rects = []
         for ghost in self.ghosts_list:
-            ghost.render(screen)
+            rect = ghost.render(screen)
+            if rect is not None:
+                rects.append(rect)
+        return rects
 
     def updatePoints(self):
         for ghost in self:
@@ -332,7 +432,7 @@ class GhostsGroup():
 
     def resetPoints(self):
         for ghost in self:
-            ghost.points = 200
+            ghost.points = GHOST_POINTS
 
     def hide(self):
         for ghost in self:
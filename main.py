@@ -1,72 +1,77 @@
+import os
+import time
 import pygame
 from pygame.locals import *
 from constants import *
-from pacman import Pacman
-from nodes import NodeGroup
-from pellets import PelletGroup
-from fruit import Fruit
-from ghosts import GhostsGroup
-from pauser import Pause
+from simulation import GameSimulation
 from text import TextGroup
 from music import MusicController
 from sprites import LifeSprites
 from sprites import MazeSprites
-from mazedata import MazeData
 from settings_menu import SettingsMenu
+from background_cache import BackgroundCache
+from dirty_rects import DirtyRects, merge_rects
+from replay import Replay, PAUSE_EVENT, MUTE_EVENT
 
 
-class GameController(object):
+class GameController(GameSimulation):
     """
     Main controller for the Pac-Man game.
 
+    Adds the window, keyboard input, text, music and HUD on top of the game rules
+    in GameSimulation.
+
     Attributes:
         screen (pygame.Surface): Main game screen.
         background (pygame.Surface): Current background surface.
         clock (pygame.time.Clock): Game clock.
-        fruit (Fruit or None): Current fruit in the game.
-        pause (Pause): Pause controller.
-        level (int): Current game level.
-        lives (int): Number of player lives.
-        score (int): Player score.
         textGroup (TextGroup): Handles on-screen text.
         musicController (MusicController): Controls game music.
         lifesprites (LifeSprites): Handles life indicator sprites.
-        finishBG (bool): Flag for background animation at level end.
         finishTime (float): Time between background swaps.
         finishTimer (float): Timer for background swap.
         fruit_captured (list): List of captured fruit sprites.
-        mazedata (MazeData): Handles maze data.
         difficulty_levels (list): Available difficulty levels.
         background_colors (list): Available background colors.
-        difficulty (int): Selected difficulty level.
         bg_color (int): Selected background color.
+        background_cache (BackgroundCache): Composed backgrounds stored on disk.
+        dirty_rendering (bool): Whether only the changed parts of the screen are redrawn.
+        dirty_rects (DirtyRects): Areas drawn last frame and pixels pushed per frame.
+        fast_forward (bool): Whether the game runs with a fixed dt as fast as possible.
+        fast_forward_dt (float): Simulated time of a frame in fast-forward mode.
+        render_every (int): In fast-forward mode, render every Nth frame, never if 0.
+        frame (int): Number of frames updated.
+        replay (Replay or None): Recording of the session, started by the first startGame().
+        replay_path (str or None): File the replay is saved to when the window is closed.
     """
 
     def __init__(self):
         pygame.init()
+        GameSimulation.__init__(self, headless=False)
         self.screen = pygame.display.set_mode(SCREENSIZE, 0, 32)
         pygame.display.set_caption("Pac-Man Game")
         self.background = None
         self.clock = pygame.time.Clock()
-        self.fruit = None
         self.background_norm = None
         self.background_finish = None
-        self.pause = Pause(True)
-        self.level = 0
-        self.lives = 5
-        self.score = 0
-        self.textGroup = TextGroup()
+        self.textGroup = TextGroup(self.timers)
         self.musicController = MusicController()
         self.lifesprites = LifeSprites(self.lives)
-        self.finishBG = False
         self.finishTime = 0.2
         self.finishTimer = 0
         self.fruit_captured = []
-        self.mazedata = MazeData()
         self.difficulty_levels = ["Easy", "Medium", "Hard"]
         self.background_colors = [BLACK, GRAY, NAVY]
-        self.difficulty = 1
         self.bg_color = 0
+        self.background_cache = BackgroundCache()
+        self.dirty_rendering = False
+        self.dirty_rects = DirtyRects()
+        self.fast_forward = False
+        self.fast_forward_dt = FIXED_DT
+        self.render_every = 0
+        self.frame = 0
+        self.replay = None
+        self.replay_path = None
 
     def set_difficulty(self, difficulty_level):
         """
@@ -75,16 +80,25 @@ class GameController(object):
         Args:
             difficulty_level (int): Difficulty index (0 = Easy, 1 = Medium, 2 = Hard).
         """
-        self.difficulty = difficulty_level
+        GameSimulation.set_difficulty(self, difficulty_level)
+        self.lifesprites.reset_lives(self.lives)
 
-        if self.difficulty == 0:
-            self.lives = 6
-        elif self.difficulty == 1:
-            self.lives = 4
-        elif self.difficulty == 2:
-            self.lives = 3
+    def set_fast_forward(self, enabled, dt=FIXED_DT, render_every=0):
+        """
+        Turns fast-forward mode on or off.
 
-        self.lifesprites.reset_lives(self.lives)
+        In fast-forward mode the clock is not used: every frame advances the game by
+        dt and frames follow each other as fast as the CPU allows. The speed reached
+        is reported by stats.speed in simulated seconds per wall-clock second.
+
+        Args:
+            enabled (bool): Whether fast-forward mode is on.
+            dt (float): Simulated time of a frame in seconds.
+            render_every (int): Render every Nth frame, or never if 0.
+        """
+        self.fast_forward = enabled
+        self.fast_forward_dt = dt
+        self.render_every = render_every
 
     def set_background_color(self, color):
         """
@@ -99,15 +113,10 @@ class GameController(object):
         """
         Restarts the game, resetting all attributes to initial values.
         """
-        self.lives = 5
-        self.level = 0
-        self.score = 0
-        self.textGroup.update_score(self.score)
-        self.textGroup.update_level(self.level)
+        self.textGroup.update_score(0)
+        self.textGroup.update_level(0)
         self.textGroup.show_text(READYTXT)
-        self.pause.paused = True
-        self.fruit = None
-        self.startGame()
+        GameSimulation.restart_game(self)
         self.lifesprites.reset_lives(self.lives)
         self.fruit_captured = []
 
@@ -115,88 +124,79 @@ class GameController(object):
         """
         Resets the current level without restarting the game.
         """
-        self.pause.paused = True
         self.textGroup.show_text(READYTXT)
-        self.pacman.reset()
-        self.ghosts.reset()
-        self.fruit = None
+        GameSimulation.reset_level(self)
 
     def next_level(self):
         """
         Advances to the next level.
         """
-        self.show_entities()
-        self.level += 1
-        self.textGroup.update_level(self.level)
-        self.pause.paused = True
-        self.startGame()
+        self.textGroup.update_level(self.level + 1)
+        GameSimulation.next_level(self)
 
     def setBackground(self):
         """
         Sets the background surfaces for the game.
 
-        This method creates two background surfaces: one for normal gameplay and one for
-        the finishing sequence. Both are filled with the selected background color and then
-        updated using the maze sprites to add level-specific visual elements.
+        This method gets two background surfaces: one for normal gameplay and one for
+        the finishing sequence. Both are taken from the background cache when possible
+        and composed from the maze sprites otherwise.
         """
-        self.background_norm = pygame.surface.Surface(SCREENSIZE).convert()
-        self.background_norm.fill(self.bg_color)
-        self.background_finish = pygame.surface.Surface(SCREENSIZE).convert()
-        self.background_finish.fill(self.bg_color)
-        self.background_norm = self.mazesprites.construct_background(self.background_norm, self.level % 5)
-        self.background_finish = self.mazesprites.construct_background(self.background_finish, 5)
+        self.background_norm = self.get_background(self.level % 5)
+        self.background_finish = self.get_background(5)
         self.finishBG = False
         self.background = self.background_norm
 
+    def get_background(self, row):
+        """
+        Returns the background for the current maze and the given color row.
+
+        The surface is filled with the selected background color and the maze sprites
+        are drawn on it, unless the same background is already in the cache.
+
+        Args:
+            row (int): Color row of the sprite sheet used for the walls.
+
+        Returns:
+            pygame.Surface: The composed background.
+        """
+        key = self.background_cache.make_key(self.mazesprites.mazefile, self.mazesprites.rot_file, self.bg_color, row)
+        background = self.background_cache.load(key)
+        if background is None:
+            background = pygame.surface.Surface(SCREENSIZE).convert()
+            background.fill(self.bg_color)
+            background = self.mazesprites.construct_background(background, row)
+            self.background_cache.save(key, background)
+        return background
+
     def startGame(self):
         """
         Initializes and starts a new game level.
 
-        This method sets up the maze, loads necessary game objects such as Pac-Man, ghosts,
-        pellets, and nodes, and applies various constraints to regulate ghost behavior.
+        The game objects are set up by GameSimulation, then the maze sprites,
+        background and music of the level are loaded.
         """
-        self.mazedata.load_maze(self.level)
-        self.mazesprites = MazeSprites('mazes/' + self.mazedata.obj.name + ".txt", 'mazes/' + self.mazedata.obj.name + "_rotation.txt")
+        if self.replay is None:
+            self.replay = Replay.start(self)
+        GameSimulation.startGame(self)
+        self.mazesprites = MazeSprites(self.get_maze_file(), 'mazes/' + self.mazedata.obj.name + "_rotation.txt")
         self.setBackground()
         self.musicController.play_bg_music()
-        self.nodes = NodeGroup('mazes/' + self.mazedata.obj.name + ".txt")
-        self.mazedata.obj.set_portal_pairs(self.nodes)
-        self.mazedata.obj.connect_home_nodes(self.nodes)
-
-        self.pacman = Pacman(self.nodes.getNodeFromTiles(*self.mazedata.obj.pacman_start))
-        self.pelletGroup = PelletGroup('mazes/' + self.mazedata.obj.name + ".txt")
-        self.ghosts = GhostsGroup(self.nodes.getStartTempNode(), self.pacman)
-        self.ghosts.pinky.set_spawn_node(self.nodes.getNodeFromTiles(*self.mazedata.obj.add_offset(2, 3)))
-        self.ghosts.inky.set_spawn_node(self.nodes.getNodeFromTiles(*self.mazedata.obj.add_offset(0, 3)))
-        self.ghosts.clyde.set_spawn_node(self.nodes.getNodeFromTiles(*self.mazedata.obj.add_offset(4, 3)))
-        self.ghosts.blinky.set_spawn_node(self.nodes.getNodeFromTiles(*self.mazedata.obj.add_offset(2, 0)))
-
-        self.nodes.denyHomeAccess(self.pacman)
-        self.nodes.denyHomeAccessList(self.ghosts)
-        self.ghosts.inky.spawn_node.denyAccess(RIGHT, self.ghosts.inky)
-        self.ghosts.clyde.spawn_node.denyAccess(LEFT, self.ghosts.clyde)
-        self.mazedata.obj.deny_ghosts_access(self.ghosts, self.nodes)
 
     def update(self):
         """
         Updates all game objects and handles game logic per frame.
         """
-        dt = self.clock.tick(60) / 1000.0
-        self.textGroup.update(dt)
-        self.pelletGroup.update(dt)
-
-        if not self.pause.paused:
-            self.ghosts.update(dt)
-            if self.fruit is not None:
-                self.fruit.update(dt)
-            self.checkPelletEvents()
-            self.checkFruitEvents()
-            self.checkGhostEvents()
-        if self.pacman.alive:
-            if not self.pause.paused:
-                self.pacman.update(dt)
+        start = time.perf_counter()
+        if self.fast_forward:
+            dt = self.fast_forward_dt
         else:
-            self.pacman.update(dt)
+            dt = self.clock.tick(FPS) / 1000.0
+        self.frame += 1
+        direction = self.pacman.getValidKey()
+        self.step(dt, direction)
+        if self.replay is not None:
+            self.replay.record_tick(direction, dt)
         if self.finishBG:
             self.finishTimer += dt
             if self.finishTimer >= self.finishTime:
@@ -205,11 +205,12 @@ class GameController(object):
                     self.background = self.background_finish
                 else:
                     self.background = self.background_norm
-        after_pause_method = self.pause.update(dt)
-        if after_pause_method is not None:
-            after_pause_method()
         self.checkEvents()
-        self.render()
+        if not self.fast_forward:
+            self.render()
+        elif self.render_every and self.frame % self.render_every == 0:
+            self.render()
+        self.stats.wall_time += time.perf_counter() - start
 
     def update_score(self, points):
         """
@@ -218,58 +219,32 @@ class GameController(object):
         Args:
             points (int): Points to add to the score.
         """
-        self.score += points
+        GameSimulation.update_score(self, points)
         self.textGroup.update_score(self.score)
 
-    def checkFruitEvents(self):
-        """
-        Handles fruit spawning and collection events.
-        """
-        if self.pelletGroup.num_eaten == 50 or self.pelletGroup.num_eaten == 140:
-            if self.fruit is None:
-                self.fruit = Fruit(self.nodes.getNodeFromTiles(9, 20))
-        if self.fruit is not None:
-            if self.pacman.collideCheck(self.fruit):
-                self.musicController.play_pacman_eat_music()
-                self.update_score(self.fruit.points)
-                self.textGroup.add_text(str(self.fruit.points), WHITE, self.fruit.position.x, self.fruit.position.y, 8, time=1)
-
-                # Ensure the captured fruit is stored only if it is unique
-                fruit_captured = False
-                for fruit in self.fruit_captured:
-                    if fruit.get_offset() == self.fruit.image.get_offset():
-                        fruit_captured = True
-                        break
-                if not fruit_captured:
-                    self.fruit_captured.append(self.fruit.image)
-                self.fruit = None
-            elif self.fruit.destroy:
-                self.fruit = None
-
-    def checkPelletEvents(self):
-        """
-        Handles pellet consumption and power-up activation.
-        """
-        pellet = self.pacman.eatPellets(self.pelletGroup.pellets)
-        if pellet:
-            self.pelletGroup.num_eaten += 1
-            self.musicController.play_pacman_eat_music()
-            self.update_score(pellet.points)
-
-            if self.pelletGroup.num_eaten == 30:
-                self.ghosts.inky.spawn_node.allowAccess(RIGHT, self.ghosts.inky)
-            if self.pelletGroup.num_eaten == 70:
-                self.ghosts.clyde.spawn_node.allowAccess(LEFT, self.ghosts.clyde)
-
-            self.pelletGroup.pellets.remove(pellet)
-
-            if pellet.name == POWERPELLET:
-                self.ghosts.start_freight()
-
-            if self.pelletGroup.is_empty():
-                self.finishBG = True
-                self.hide_entities()
-                self.pause.set_pause(pause_time=3, func=self.next_level)
+    def on_pellet_eaten(self, pellet):
+        self.musicController.play_pacman_eat_music()
+
+    def on_fruit_eaten(self, fruit):
+        self.musicController.play_pacman_eat_music()
+        self.textGroup.add_text(str(fruit.points), WHITE, fruit.position.x, fruit.position.y, 8, time=1)
+
+        # Ensure the captured fruit is stored only if it is unique
+        for captured in self.fruit_captured:
+            if captured.get_offset() == fruit.image.get_offset():
+                return
+        self.fruit_captured.append(fruit.image)
+
+    def on_ghost_eaten(self, ghost):
+        self.musicController.play_pacman_eat_ghost()
+        self.textGroup.add_text(str(ghost.points), WHITE, ghost.position.x, ghost.position.y, 8, time=1)
+
+    def on_pacman_death(self):
+        self.musicController.play_pacman_die()
+        self.lifesprites.remove_image()
+
+    def on_game_over(self):
+        self.textGroup.show_text(GAMEOVERTXT)
 
     def checkEvents(self):
         """
@@ -277,89 +252,114 @@ class GameController(object):
         """
         for event in pygame.event.get():
             if event.type == QUIT:
+                self.save_replay()
                 exit()
             elif event.type == KEYDOWN:
                 if event.key == K_SPACE:
-                    if self.pacman.alive:
-                        self.pause.set_pause(player_paused=True)
+                    self.record_event(PAUSE_EVENT)
+                    if self.toggle_pause():
                         if not self.pause.paused:
                             self.textGroup.hide_text()
-                            self.show_entities()
                         else:
                             self.textGroup.show_text(PAUSETXT)
-                            self.hide_entities()
 
                 if event.key == K_m:
+                    self.record_event(MUTE_EVENT)
                     self.musicController.pause_music()
 
-    def checkGhostEvents(self):
-        """
-        Handles interactions between Pac-Man and ghosts.
-        """
-        for ghost in self.ghosts:
-            if self.pacman.collide_ghost(ghost):
-                if ghost.mode.current_mode is FREIGHT:
-                    self.musicController.play_pacman_eat_ghost()
-                    self.pacman.visible = False
-                    ghost.visible = False
-                    self.update_score(ghost.points)
-                    self.textGroup.add_text(str(ghost.points), WHITE, ghost.position.x, ghost.position.y, 8, time=1)
-                    self.ghosts.updatePoints()
-                    self.pause.set_pause(pause_time=1, func=self.show_entities)
-                    ghost.start_spawn()
-                    self.nodes.allowHomeAccess(ghost)
-                elif ghost.mode.current_mode is not SPAWN:
-                    if self.pacman.alive:
-                        self.musicController.play_pacman_die()
-                        self.lives -= 1
-                        self.lifesprites.remove_image()
-                        self.pacman.die()
-                        self.ghosts.hide()
-                        if self.lives <= 0:
-                            self.textGroup.show_text(GAMEOVERTXT)
-                            self.pause.set_pause(pause_time=3, func=self.restart_game)
-                        else:
-                            self.pause.set_pause(pause_time=3, func=self.reset_level)
-
-    def show_entities(self):
+    def record_event(self, event):
         """
-        Makes Pac-Man and ghosts visible.
+        Adds a key press to the replay, if one is being recorded.
         """
-        self.pacman.visible = True
-        self.ghosts.show()
+        if self.replay is not None:
+            self.replay.record_event(event)
 
-    def hide_entities(self):
+    def save_replay(self, path=None):
         """
-        Hides Pac-Man and ghosts from the screen.
+        Saves the replay of the session with the current score and state.
+
+        Args:
+            path (str or None): File to write, replay_path if None.
+
+        Returns:
+            bool: True if a replay was written.
         """
-        self.pacman.visible = False
-        self.ghosts.hide()
+        path = path or self.replay_path
+        if self.replay is None or path is None:
+            return False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.replay.finish(self)
+        self.replay.save(path)
+        return True
 
     def render(self):
         """
         Renders all game objects onto the screen.
         """
+        if self.dirty_rendering:
+            self.render_dirty()
+            return
+
         self.screen.blit(self.background, (0, 0))
         self.pelletGroup.render(self.screen)
+        drawn = self.render_sprites()
+        pygame.display.update()
+        self.dirty_rects.finish_frame(drawn, [self.dirty_rects.bounds], self.background, self.pelletGroup)
+
+    def render_dirty(self):
+        """
+        Renders only the parts of the screen that changed since the last frame.
+
+        The areas drawn last frame and the pellets that changed are restored from the
+        background and the pellet layer, the sprites, text and HUD are drawn again, and
+        only the union of those areas is pushed to the display.
+        """
+        if self.dirty_rects.needs_full_redraw(self.background, self.pelletGroup):
+            self.screen.blit(self.background, (0, 0))
+            self.pelletGroup.render(self.screen)
+            drawn = self.render_sprites()
+            pygame.display.update()
+            self.dirty_rects.finish_frame(drawn, [self.dirty_rects.bounds], self.background, self.pelletGroup)
+            return
+
+        restored = merge_rects(self.dirty_rects.previous + self.pelletGroup.pop_dirty_rects(), self.dirty_rects.bounds)
+        for rect in restored:
+            self.screen.blit(self.background, rect, rect)
+            self.pelletGroup.render_area(self.screen, rect)
+        drawn = self.render_sprites()
+        pushed = merge_rects(restored + drawn, self.dirty_rects.bounds)
+        pygame.display.update(pushed)
+        self.dirty_rects.finish_frame(drawn, pushed, self.background, self.pelletGroup)
+
+    def render_sprites(self):
+        """
+        Draws the fruit, Pac-Man, ghosts, text and HUD over the maze.
+
+        Returns:
+            list: The areas drawn.
+        """
+        drawn = []
         if self.fruit is not None:
-            self.fruit.render(self.screen)
-        self.pacman.render(self.screen)
-        self.ghosts.render(self.screen)
-        self.textGroup.render(self.screen)
+            drawn.append(self.fruit.render(self.screen))
+        drawn.append(self.pacman.render(self.screen))
+        drawn.extend(self.ghosts.render(self.screen))
+        drawn.extend(self.textGroup.render(self.screen))
         for i in range(len(self.lifesprites.images)):
             x = self.lifesprites.images[i].get_width() * i
             y = SCREENHEIGHT - self.lifesprites.images[i].get_height()
-            self.screen.blit(self.lifesprites.images[i], (x, y))
+            drawn.append(self.screen.blit(self.lifesprites.images[i], (x, y)))
         for i in range(len(self.fruit_captured)):
             x = SCREENWIDTH - self.fruit_captured[i].get_width() * (i + 1)
             y = SCREENHEIGHT - self.fruit_captured[i].get_height()
-            self.screen.blit(self.fruit_captured[i], (x, y))
-
-        pygame.display.update()
+            drawn.append(self.screen.blit(self.fruit_captured[i], (x, y)))
+        return [rect for rect in drawn if rect is not None]
 
 
 if __name__ == "__main__":
     game = GameController()
+    game.replay_path = os.path.join("replays", time.strftime("%Y%m%d-%H%M%S") + ".replay")
     settings_menu = SettingsMenu(game)
 
     running = True
@@ -379,4 +379,5 @@ if __name__ == "__main__":
         else:
             game.update()
 
+    game.save_replay()
     pygame.quit()
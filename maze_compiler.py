@@ -0,0 +1,274 @@
+import os
+import json
+import hashlib
+import numpy as np
+from constants import *
+
+NODE_SYMBOLS = ['+', 'P', 'n']
+PATH_SYMBOLS = ['.', '-', '|', 'p']
+PELLET_SYMBOLS = {'.': PELLET, '+': PELLET, 'P': POWERPELLET, 'p': POWERPELLET}
+
+# Column order of the adjacency table, -1 marks a missing neighbor.
+ADJACENCY_DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+NO_NEIGHBOR = -1
+
+MAGIC = b"PMAZ"
+FORMAT_VERSION = 1
+ALIGNMENT = 16
+
+# Mazes compiled in this process, keyed by the digest of their sources.
+_compiled = {}
+
+
+class CompiledMaze(object):
+    """
+    Binary form of a maze file shared by NodeGroup, PelletGroup and MazeSprites.
+
+    Attributes:
+        digest (str): Hash of the maze and rotation file contents.
+        grid (ndarray): Maze characters as uint8 codes, shape (rows, cols).
+        nodes (ndarray): Tile (col, row) of every node in row-major order.
+        adjacency (ndarray): Node index of the UP, DOWN, LEFT and RIGHT neighbor of every node.
+        pellets (ndarray): (row, col, kind) of every pellet in row-major order.
+        rotation (ndarray): Rotation characters as uint8 codes, empty without a rotation file.
+    """
+
+    FIELDS = ("grid", "nodes", "adjacency", "pellets", "rotation")
+
+    def __init__(self, digest, grid, nodes, adjacency, pellets, rotation):
+        self.digest = digest
+        self.grid = grid
+        self.nodes = nodes
+        self.adjacency = adjacency
+        self.pellets = pellets
+        self.rotation = rotation
+
+    def chars(self):
+        """
+        Returns the maze as an array of one-character strings, like np.loadtxt(dtype='<U1').
+        """
+        return decode_chars(self.grid)
+
+    def rotation_chars(self):
+        """
+        Returns the rotation grid as an array of one-character strings.
+        """
+        return decode_chars(self.rotation)
+
+    def save(self, path):
+        """
+        Writes the maze into a single binary file that load() can memory-map.
+
+        The file holds a magic tag, a JSON header with the dtype, shape and offset
+        of every array, and the raw arrays aligned to 16 bytes.
+
+        Args:
+            path (str): Destination file.
+        """
+        header = {"version": FORMAT_VERSION, "digest": self.digest, "arrays": {}}
+        offset = 0
+        for name in self.FIELDS:
+            array = np.ascontiguousarray(getattr(self, name))
+            header["arrays"][name] = [array.dtype.str, list(array.shape), offset]
+            offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        header_bytes = json.dumps(header).encode()
+        start = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+        with open(path, "wb") as file:
+            file.write(MAGIC)
+            file.write(np.uint32(len(header_bytes)).tobytes())
+            file.write(header_bytes)
+            for name in self.FIELDS:
+                array = np.ascontiguousarray(getattr(self, name))
+                file.seek(start + header["arrays"][name][2])
+                file.write(array.tobytes())
+            file.truncate(start + offset)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-maps a file written by save().
+
+        Args:
+            path (str): File to load.
+
+        Returns:
+            CompiledMaze: Maze whose arrays are read-only views into the mapped file.
+        """
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a compiled maze")
+        header_size = int(data[len(MAGIC):len(MAGIC) + 4].view(np.uint32)[0])
+        header_end = len(MAGIC) + 4 + header_size
+        header = json.loads(bytes(data[len(MAGIC) + 4:header_end]))
+        if header["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path} has an unsupported format version")
+        start = -(-header_end // ALIGNMENT) * ALIGNMENT
+
+        arrays = {}
+        for name, (dtype, shape, offset) in header["arrays"].items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape)) * dtype.itemsize
+            begin = start + offset
+            arrays[name] = data[begin:begin + count].view(dtype).reshape(shape)
+        return cls(header["digest"], **arrays)
+
+
+def decode_chars(codes):
+    """
+    Turns an array of uint8 character codes back into one-character strings.
+    """
+    return codes.view('S1').astype('<U1')
+
+
+def encode_chars(chars):
+    """
+    Turns an array of one-character strings into uint8 character codes.
+    """
+    return np.char.encode(chars, 'ascii').view(np.uint8).reshape(chars.shape)
+
+
+def default_rotation_file(mazefile):
+    """
+    Returns the rotation file that belongs to a maze file (mazeN.txt -> mazeN_rotation.txt),
+    or None if there is no such file.
+    """
+    base, ext = os.path.splitext(mazefile)
+    rot_file = base + "_rotation" + ext
+    if os.path.exists(rot_file):
+        return rot_file
+    return None
+
+
+def build_node_table(data):
+    """
+    Lists the nodes of a maze and connects them the same way NodeGroup does:
+    nodes on the same row or column are neighbors when only path symbols lie between them.
+
+    Args:
+        data (ndarray): 2D array of maze characters.
+
+    Returns:
+        tuple: (nodes, adjacency) arrays as stored in CompiledMaze.
+    """
+    is_node = np.isin(data, NODE_SYMBOLS)
+    is_path = np.isin(data, PATH_SYMBOLS)
+    rows, cols = np.nonzero(is_node)
+    index = np.full(data.shape, NO_NEIGHBOR, dtype=np.int32)
+    index[rows, cols] = np.arange(len(rows))
+    adjacency = np.full((len(rows), len(ADJACENCY_DIRECTIONS)), NO_NEIGHBOR, dtype=np.int16)
+    up, down, left, right = [ADJACENCY_DIRECTIONS.index(d) for d in (UP, DOWN, LEFT, RIGHT)]
+
+    for row in range(data.shape[0]):
+        previous = NO_NEIGHBOR
+        for col in range(data.shape[1]):
+            if is_node[row, col]:
+                current = index[row, col]
+                if previous != NO_NEIGHBOR:
+                    adjacency[previous, right] = current
+                    adjacency[current, left] = previous
+                previous = current
+            elif not is_path[row, col]:
+                previous = NO_NEIGHBOR
+
+    for col in range(data.shape[1]):
+        previous = NO_NEIGHBOR
+        for row in range(data.shape[0]):
+            if is_node[row, col]:
+                current = index[row, col]
+                if previous != NO_NEIGHBOR:
+                    adjacency[previous, down] = current
+                    adjacency[current, up] = previous
+                previous = current
+            elif not is_path[row, col]:
+                previous = NO_NEIGHBOR
+
+    nodes = np.stack([cols, rows], axis=1).astype(np.int16)
+    return nodes, adjacency
+
+
+def build_pellet_table(data):
+    """
+    Lists the pellets of a maze in row-major order.
+
+    Args:
+        data (ndarray): 2D array of maze characters.
+
+    Returns:
+        ndarray: (row, col, kind) of every pellet.
+    """
+    pellets = []
+    for row in range(data.shape[0]):
+        for col in range(data.shape[1]):
+            kind = PELLET_SYMBOLS.get(data[row][col])
+            if kind is not None:
+                pellets.append((row, col, kind))
+    return np.array(pellets, dtype=np.int16).reshape(-1, 3)
+
+
+def compile_source(digest, mazefile, rot_file=None):
+    """
+    Parses the text files of a maze into a CompiledMaze.
+    """
+    data = np.atleast_2d(np.loadtxt(mazefile, dtype='<U1'))
+    nodes, adjacency = build_node_table(data)
+    if rot_file is not None:
+        rotation = encode_chars(np.atleast_2d(np.loadtxt(rot_file, dtype='<U1')))
+    else:
+        rotation = np.zeros((0, 0), dtype=np.uint8)
+    return CompiledMaze(digest, encode_chars(data), nodes, adjacency, build_pellet_table(data), rotation)
+
+
+def compile_maze(mazefile, rot_file=None, cache_dir=".cache/mazes"):
+    """
+    Returns the compiled form of a maze, parsing the text files only once.
+
+    The result is kept in memory for the rest of the process and written to
+    cache_dir as a binary artifact named by the hash of the sources, so later
+    runs memory-map it instead of parsing the text again.
+
+    Args:
+        mazefile (str): Path to the maze layout file.
+        rot_file (str or None): Path to the rotation file. Defaults to the
+            mazeN_rotation.txt file next to the maze, when it exists.
+        cache_dir (str): Folder for compiled artifacts.
+
+    Returns:
+        CompiledMaze: The compiled maze.
+    """
+    if rot_file is None:
+        rot_file = default_rotation_file(mazefile)
+
+    digest = hashlib.sha1(repr((FORMAT_VERSION, NODE_SYMBOLS, PATH_SYMBOLS, PELLET_SYMBOLS)).encode())
+    for path in (mazefile, rot_file):
+        if path is not None:
+            with open(path, "rb") as file:
+                digest.update(file.read())
+        digest.update(b"\0")
+    digest = digest.hexdigest()
+
+    maze = _compiled.get(digest)
+    if maze is not None:
+        return maze
+
+    name = os.path.splitext(os.path.basename(mazefile))[0]
+    path = os.path.join(cache_dir, f"{name}-{digest[:16]}.pmaz")
+    if os.path.exists(path):
+        try:
+            maze = CompiledMaze.load(path)
+        except (OSError, ValueError):
+            maze = None
+
+    if maze is None:
+        maze = compile_source(digest, mazefile, rot_file)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            maze.save(temp_path)
+            os.replace(temp_path, path)
+            maze = CompiledMaze.load(path)
+        except OSError:
+            pass
+
+    _compiled[digest] = maze
+    return maze
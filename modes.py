@@ -5,45 +5,82 @@ class DefaultMode():
     """
     Handles the default behavior of a ghost's movement modes.
 
+    Without a scheduler the time spent in a mode is counted by update(). With
+    one, the end of every mode is registered as a deadline and the scheduler
+    switches to the next mode when it is reached.
+
     Attributes:
         timer (float): Tracks time elapsed in the current mode.
         mode (str): Current mode of the ghost.
         time (float): Duration of the current mode before switching.
+        scheduler (Scheduler or None): Scheduler that ends the modes.
+        deadline (float or None): Scheduler time at which the current mode ends.
     """
 
-    def __init__(self, start_mode=WAIT):
+    def __init__(self, start_mode=WAIT, scheduler=None):
         """
         Initializes the mode system with a starting mode.
 
         Args:
             start_mode (str): The initial mode of the ghost.
+            scheduler (Scheduler or None): Scheduler that ends the modes. Defaults to None.
         """
         self.timer = 0
         self.mode = None
+        self.scheduler = scheduler
+        self.deadline = None
+        self.expiry = None
         self.set_mode(start_mode)
 
     def update(self, dt):
         """
         Updates the mode timer and switches modes when necessary.
+        Does nothing when the modes are ended by a scheduler.
 
         Args:
             dt (float): Time since the last update.
         """
+        if self.scheduler is not None:
+            return
         self.timer += dt
 
         if self.timer >= self.time:
-            if self.mode == WAIT:
-                self.scatter()
-            elif self.mode == SCATTER:
-                self.chase()
-            elif self.mode == CHASE:
-                self.scatter()
-            elif self.mode == RANDOM:
-                self.scatter()
-            elif self.mode == FREIGHT:
-                self.scatter()
-            elif self.mode == SPAWN:
-                self.wait()
+            self.expire()
+
+    def expire(self):
+        """
+        Switches to the mode that follows the current one.
+        """
+        self.set_mode(NEXT_MODES[self.mode])
+
+    def start_timer(self):
+        """
+        Starts counting the time of the mode that was just set.
+        """
+        self.timer = 0
+        if self.scheduler is not None:
+            self.schedule(self.scheduler.now + self.time)
+
+    def schedule(self, deadline):
+        """
+        Sets when the current mode ends on the scheduler, replacing the previous deadline.
+
+        Args:
+            deadline (float or None): Scheduler time, None to never end the mode.
+        """
+        if self.expiry is not None:
+            self.expiry.cancel()
+            self.expiry = None
+        self.deadline = deadline
+        if deadline is not None:
+            self.expiry = self.scheduler.call_at(deadline, self.expire)
+
+    def cancel(self):
+        """
+        Stops the scheduler from ending the current mode.
+        """
+        if self.scheduler is not None:
+            self.schedule(None)
 
     def reset_mode(self):
         """
@@ -76,58 +113,67 @@ class DefaultMode():
 
     def scatter(self):
         self.mode = SCATTER
-        self.time = 7
-        self.timer = 0
+        self.time = MODE_TIMES[SCATTER]
+        self.start_timer()
 
     def chase(self):
         self.mode = CHASE
-        self.time = 20
-        self.timer = 0
+        self.time = MODE_TIMES[CHASE]
+        self.start_timer()
 
     def wait(self):
         self.mode = WAIT
-        self.time = 3
-        self.timer = 0
+        self.time = MODE_TIMES[WAIT]
+        self.start_timer()
 
     def random(self):
         self.mode = RANDOM
-        self.time = 10
-        self.timer = 0
+        self.time = MODE_TIMES[RANDOM]
+        self.start_timer()
 
     def freight(self):
         self.mode = FREIGHT
-        self.time = 7
-        self.timer = 0
+        self.time = MODE_TIMES[FREIGHT]
+        self.start_timer()
 
     def spawn(self):
         self.mode = SPAWN
-        self.time = 5
-        self.timer = 0
+        self.time = MODE_TIMES[SPAWN]
+        self.start_timer()
 
 
 class ModeController():
     """
     Manages the mode transitions and updates for a ghost.
 
+    With a scheduler, the end of the main modes and of FREIGHT mode are deadlines
+    on it, and update() only reacts to where the ghost is.
+
     Attributes:
         time (float): Timer tracking duration of current mode.
         timer (float): Secondary timer for tracking FREIGHT mode.
         main_mode (DefaultMode): The main mode handler.
         current_mode (str): The currently active mode.
         ghost (Ghost): The ghost instance associated with this controller.
+        scheduler (Scheduler or None): Scheduler that ends the modes.
+        deadline (float or None): Scheduler time at which FREIGHT mode ends.
     """
 
-    def __init__(self, ghost, start_mode=WAIT):
+    def __init__(self, ghost, start_mode=WAIT, scheduler=None):
         """
         Initializes the mode controller.
 
         Args:
             ghost (Ghost): The ghost whose mode is controlled.
             start_mode (str): The initial mode for the ghost.
+            scheduler (Scheduler or None): Scheduler that ends the modes. Defaults to None.
         """
         self.time = 0
         self.timer = 0
-        self.main_mode = DefaultMode(start_mode)
+        self.scheduler = scheduler
+        self.deadline = None
+        self.expiry = None
+        self.main_mode = DefaultMode(start_mode, scheduler)
         self.current_mode = self.main_mode.mode
         self.ghost = ghost
 
@@ -146,11 +192,10 @@ class ModeController():
             self.main_mode.set_mode(WAIT)
 
         if self.current_mode == FREIGHT:
-            self.timer += dt
-            if self.timer >= self.time:
-                self.time = None
-                self.ghost.normal_mode()
-                self.current_mode = self.main_mode.mode
+            if self.scheduler is None:
+                self.timer += dt
+                if self.timer >= self.time:
+                    self.end_freight()
         elif self.current_mode in [SCATTER, CHASE]:
             self.current_mode = self.main_mode.mode
 
@@ -158,6 +203,45 @@ class ModeController():
             self.ghost.normal_mode()
             self.current_mode = self.main_mode.mode
 
+    def end_freight(self):
+        """
+        Returns the ghost to normal movement when its FREIGHT time is over.
+        """
+        self.time = None
+        self.ghost.normal_mode()
+        self.current_mode = self.main_mode.mode
+
+    def expire_freight(self):
+        """
+        Ends FREIGHT mode if the ghost is still frightened. Called by the scheduler.
+        """
+        self.expiry = None
+        self.deadline = None
+        if self.main_mode.mode == FREIGHT:
+            self.end_freight()
+
+    def schedule(self, deadline):
+        """
+        Sets when FREIGHT mode ends on the scheduler, replacing the previous deadline.
+
+        Args:
+            deadline (float or None): Scheduler time, None for no pending end.
+        """
+        if self.expiry is not None:
+            self.expiry.cancel()
+            self.expiry = None
+        self.deadline = deadline
+        if deadline is not None:
+            self.expiry = self.scheduler.call_at(deadline, self.expire_freight)
+
+    def cancel(self):
+        """
+        Stops the scheduler from ending the modes of this controller.
+        """
+        if self.scheduler is not None:
+            self.schedule(None)
+            self.main_mode.cancel()
+
     def set_mode(self, mode):
         """
         Changes the mode dynamically.
@@ -172,13 +256,18 @@ class ModeController():
     def set_freight_mode(self):
         """
         Activates the frightened (FREIGHT) mode if the ghost is in SCATTER or CHASE.
+        Frightening a ghost again restarts its FREIGHT time.
         """
         if self.current_mode in [SCATTER, CHASE]:
             self.timer = 0
-            self.time = 7
+            self.time = MODE_TIMES[FREIGHT]
             self.set_mode(FREIGHT)
         elif self.current_mode == FREIGHT:
             self.timer = 0
+        else:
+            return
+        if self.scheduler is not None:
+            self.schedule(self.scheduler.now + self.time)
 
     def set_spawn_mode(self):
         """
@@ -1,12 +1,89 @@
 import pygame
+from collections import OrderedDict
 from vector import Vector
 from constants import *
 import numpy as np
+from maze_compiler import compile_maze, NODE_SYMBOLS, PATH_SYMBOLS, ADJACENCY_DIRECTIONS, NO_NEIGHBOR
+
+# Column order of the neighbor table: the four moves, then the portal.
+NEIGHBOR_DIRECTIONS = ADJACENCY_DIRECTIONS + (PORTAL,)
+NEIGHBOR_COLUMN = {direction: column for column, direction in enumerate(NEIGHBOR_DIRECTIONS)}
+# Column order of the access table.
+ACCESS_DIRECTIONS = ADJACENCY_DIRECTIONS
+ACCESS_COLUMN = {direction: column for column, direction in enumerate(ACCESS_DIRECTIONS)}
+
+# Shortest paths computed in this process, keyed by maze digest, neighbor table and allowed moves.
+_shortest_paths = OrderedDict()
+# Number of access layouts whose shortest paths the process remembers.
+SHORTEST_PATHS_CACHE_SIZE = 64
+# Number of points a node group remembers the nearest node of.
+NEAREST_CACHE_SIZE = 1024
+
+
+def access_bit(name):
+    """
+    Returns the bit of an entity name in the access masks, from ACCESS_BITS.
+    """
+    return ACCESS_BITS[name]
+
+
+def access_mask(names):
+    """
+    Returns the access mask of the given entity names.
+    """
+    mask = 0
+    for name in names:
+        mask |= access_bit(name)
+    return mask
+
+
+def shortest_paths(positions, neighbors, allowed):
+    """
+    Computes the shortest paths between all pairs of nodes with Floyd-Warshall.
+
+    Moves are as long as the Manhattan distance between their nodes, portals
+    are free.
+
+    :param positions: (N, 2) positions of the nodes
+    :param neighbors: (N, 5) neighbor table, see NEIGHBOR_DIRECTIONS
+    :param allowed: (N, 4) bools, whether the moves in ACCESS_DIRECTIONS may be taken
+    :return: (dist, hop): (N, N) path lengths, inf if there is no path, and (N, N)
+        column in NEIGHBOR_DIRECTIONS of the first step of every path, -1 if none
+    """
+    count = len(positions)
+    dist = np.full((count, count), np.inf)
+    hop = np.full((count, count), NO_NEIGHBOR, dtype=np.int8)
+    np.fill_diagonal(dist, 0)
+    for column, direction in enumerate(NEIGHBOR_DIRECTIONS):
+        sources = np.flatnonzero(neighbors[:, column] != NO_NEIGHBOR)
+        if direction == PORTAL:
+            targets = neighbors[sources, column]
+            length = np.zeros(len(sources))
+        else:
+            sources = sources[allowed[sources, ACCESS_COLUMN[direction]]]
+            targets = neighbors[sources, column]
+            length = np.abs(positions[sources] - positions[targets]).sum(axis=1)
+        shorter = length < dist[sources, targets]
+        dist[sources[shorter], targets[shorter]] = length[shorter]
+        hop[sources[shorter], targets[shorter]] = column
+
+    for middle in range(count):
+        through = dist[:, middle, None] + dist[None, middle, :]
+        shorter = through < dist
+        dist = np.where(shorter, through, dist)
+        hop = np.where(shorter, hop[:, middle, None], hop)
+    return dist, hop
 
 
 class Node:
     """
     Class representing a node in the maze graph.
+
+    access holds, per direction, a bitmask of the entity names allowed to
+    leave the node that way (see ACCESS_BITS in constants).
+
+    A node that belongs to a NodeGroup has an index into the group's arrays and
+    writes changes to its access masks through to them.
     """
 
     def __init__(self, x, y):
@@ -18,10 +95,9 @@ class Node:
         """
         self.position = Vector(x, y)
         self.neighbors = {LEFT: None, RIGHT: None, UP: None, DOWN: None, PORTAL: None}
-        self.access = {UP: [PACMAN, BLINKY, PINKY, INKY, CLYDE, FRUIT],
-                       DOWN: [PACMAN, BLINKY, PINKY, INKY, CLYDE, FRUIT],
-                       LEFT: [PACMAN, BLINKY, PINKY, INKY, CLYDE, FRUIT],
-                       RIGHT: [PACMAN, BLINKY, PINKY, INKY, CLYDE, FRUIT]}
+        self.access = {UP: DEFAULT_ACCESS, DOWN: DEFAULT_ACCESS, LEFT: DEFAULT_ACCESS, RIGHT: DEFAULT_ACCESS}
+        self.index = None
+        self.group = None
 
     def denyAccess(self, direction, entity):
         """
@@ -30,8 +106,7 @@ class Node:
         :param direction: Movement direction (UP, DOWN, LEFT, RIGHT)
         :param entity: Entity for which access is denied
         """
-        if entity.name in self.access[direction]:
-            self.access[direction].remove(entity.name)
+        self.denyAccessMask(direction, access_bit(entity.name))
 
     def allowAccess(self, direction, entity):
         """
@@ -40,8 +115,29 @@ class Node:
         :param direction: Movement direction
         :param entity: Entity for which access is allowed
         """
-        if entity.name not in self.access[direction]:
-            self.access[direction].append(entity.name)
+        self.allowAccessMask(direction, access_bit(entity.name))
+
+    def denyAccessMask(self, direction, mask):
+        """
+        Denies movement in a given direction for all entities in a mask at once.
+
+        :param direction: Movement direction (UP, DOWN, LEFT, RIGHT)
+        :param mask: Access bits of the entities, see access_mask()
+        """
+        self.access[direction] &= ~mask
+        if self.group is not None:
+            self.group.writeAccess(self, direction)
+
+    def allowAccessMask(self, direction, mask):
+        """
+        Allows movement in a given direction for all entities in a mask at once.
+
+        :param direction: Movement direction (UP, DOWN, LEFT, RIGHT)
+        :param mask: Access bits of the entities, see access_mask()
+        """
+        self.access[direction] |= mask
+        if self.group is not None:
+            self.group.writeAccess(self, direction)
 
     def render(self, screen):
         """
@@ -59,7 +155,23 @@ class Node:
 
 class NodeGroup(object):
     """
-       Class representing a group of nodes in the game maze.
+    Class representing a group of nodes in the game maze.
+
+    Besides the Node objects, the graph is kept as integer-indexed arrays, with
+    node.index as the row of a node:
+
+    - positions: (x, y) of every node.
+    - neighbors: UP, DOWN, LEFT, RIGHT and PORTAL neighbor of every node, -1 if none.
+    - access: bitmask of the entity names allowed to leave every node UP, DOWN,
+      LEFT and RIGHT, see access_bit().
+
+    Neighbors set through the group and access changed through the nodes are
+    written to both. The *AccessList methods change the access of many entities
+    with one mask operation.
+
+    shortestPaths() turns the arrays into all-pairs distance and next-hop tables
+    for one entity, computed when first asked for after the graph or the access
+    changed.
     """
 
     def __init__(self, level):
@@ -70,12 +182,16 @@ class NodeGroup(object):
         """
         self.level = level
         self.nodesLUT = {}
-        self.nodeSymbols = ['+', 'P', 'n']
-        self.pathSymbols = ['.', '-', '|', 'p']
-        data = self.readMazeFile(level)
-        self.createNodeTable(data)
-        self.connectHorizontally(data)
-        self.connectVertically(data)
+        self.nodeSymbols = list(NODE_SYMBOLS)
+        self.pathSymbols = list(PATH_SYMBOLS)
+        self.nodeList = []
+        self.positions = np.zeros((0, 2), dtype=np.float64)
+        self.neighbors = np.zeros((0, len(NEIGHBOR_DIRECTIONS)), dtype=np.int32)
+        self.access = np.zeros((0, len(ACCESS_DIRECTIONS)), dtype=np.uint16)
+        self.paths = {}
+        self.nearest = OrderedDict()
+        self.maze = compile_maze(level)
+        self.createNodesFromMaze(self.maze)
 
     def readMazeFile(self, textfile):
         """
@@ -84,7 +200,125 @@ class NodeGroup(object):
         :param textfile: Path to the level file
         :return: Array of level characters
         """
-        return np.loadtxt(textfile, dtype='<U1')
+        return compile_maze(textfile).chars()
+
+    def createNodesFromMaze(self, maze):
+        """
+        Creates and connects the nodes listed in a compiled maze.
+
+        :param maze: CompiledMaze with the node table and adjacency
+        """
+        nodes = []
+        for col, row in maze.nodes.tolist():
+            key = self.constructKey(col, row)
+            nodes.append(Node(*key))
+            self.nodesLUT[key] = nodes[-1]
+        self.addNodes(nodes)
+
+        for node, neighbors in zip(nodes, maze.adjacency.tolist()):
+            for direction, index in zip(ADJACENCY_DIRECTIONS, neighbors):
+                if index != NO_NEIGHBOR:
+                    self.setNeighbor(node, direction, nodes[index])
+
+    def addNodes(self, nodes):
+        """
+        Gives new nodes the next indices and appends them to the arrays.
+
+        :param nodes: Nodes without neighbors, not in the group yet
+        """
+        start = len(self.nodeList)
+        for offset, node in enumerate(nodes):
+            node.index = start + offset
+            node.group = self
+            self.nodeList.append(node)
+        positions = np.array([(node.position.x, node.position.y) for node in nodes], dtype=np.float64).reshape(-1, 2)
+        self.positions = np.concatenate([self.positions, positions])
+        neighbors = np.full((len(nodes), len(NEIGHBOR_DIRECTIONS)), NO_NEIGHBOR, dtype=np.int32)
+        self.neighbors = np.concatenate([self.neighbors, neighbors])
+        access = np.array([[node.access[d] for d in ACCESS_DIRECTIONS] for node in nodes],
+                          dtype=np.uint16).reshape(-1, len(ACCESS_DIRECTIONS))
+        self.access = np.concatenate([self.access, access])
+        self.paths.clear()
+        self.nearest.clear()
+
+    def setNeighbor(self, node, direction, other):
+        """
+        Links a node to a neighbor in one direction, in the node and in the neighbor table.
+
+        :param node: Node to link from
+        :param direction: Direction of the link (UP, DOWN, LEFT, RIGHT or PORTAL)
+        :param other: Neighbor node or None
+        """
+        node.neighbors[direction] = other
+        if node.group is self:
+            self.neighbors[node.index, NEIGHBOR_COLUMN[direction]] = NO_NEIGHBOR if other is None else other.index
+            self.paths.clear()
+
+    def updateAccess(self, node):
+        """
+        Writes the access masks of a node to the access table.
+
+        :param node: Node of this group
+        """
+        self.access[node.index] = [node.access[d] for d in ACCESS_DIRECTIONS]
+        self.paths.clear()
+
+    def writeAccess(self, node, direction):
+        """
+        Writes the access mask of a node in one direction to the access table.
+
+        :param node: Node of this group
+        :param direction: Direction (UP, DOWN, LEFT, RIGHT)
+        """
+        self.access[node.index, ACCESS_COLUMN[direction]] = node.access[direction]
+        self.paths.clear()
+
+    def shortestPaths(self, name):
+        """
+        Returns the shortest paths between all nodes for an entity, see shortest_paths().
+
+        Only the moves the entity is allowed to take count, and portals are free.
+        The tables are cached per entity until the graph or the access changes,
+        and per maze, graph and allowed moves for the SHORTEST_PATHS_CACHE_SIZE
+        most recently used layouts of the process, so access that is toggled
+        back and forth is only computed once.
+
+        :param name: Name of the entity, see ACCESS_BITS
+        :return: (dist, hop) tables indexed by node.index
+        """
+        paths = self.paths.get(name)
+        if paths is None:
+            allowed = (self.access & access_bit(name)) != 0
+            key = (self.maze.digest, self.neighbors.tobytes(), allowed.tobytes())
+            paths = _shortest_paths.get(key)
+            if paths is None:
+                paths = _shortest_paths[key] = shortest_paths(self.positions, self.neighbors, allowed)
+                if len(_shortest_paths) > SHORTEST_PATHS_CACHE_SIZE:
+                    _shortest_paths.popitem(last=False)
+            else:
+                _shortest_paths.move_to_end(key)
+            self.paths[name] = paths
+        return paths
+
+    def nearestNode(self, x, y):
+        """
+        Returns the index of the node closest to a point, remembered for the
+        NEAREST_CACHE_SIZE most recently used points.
+
+        :param x: X coordinate in pixels
+        :param y: Y coordinate in pixels
+        :return: Index of the node, the lowest one on ties
+        """
+        key = (x, y)
+        index = self.nearest.get(key)
+        if index is None:
+            offsets = self.positions - key
+            index = self.nearest[key] = int(np.argmin((offsets ** 2).sum(axis=1)))
+            if len(self.nearest) > NEAREST_CACHE_SIZE:
+                self.nearest.popitem(last=False)
+        else:
+            self.nearest.move_to_end(key)
+        return index
 
     def createNodeTable(self, data, xoffset=0, yoffset=0):
         """
@@ -94,12 +328,15 @@ class NodeGroup(object):
         :param xoffset: X offset
         :param yoffset: Y offset
         """
+        nodes = []
         for row in list(range(data.shape[0])):
             for col in list(range(data.shape[1])):
                 # Якщо символ є вузлом, додаємо його в таблицю
                 if data[row][col] in self.nodeSymbols:
                     x, y = self.constructKey(col + xoffset, row + yoffset)
                     self.nodesLUT[(x, y)] = Node(x, y)
+                    nodes.append(self.nodesLUT[(x, y)])
+        self.addNodes(nodes)
 
     def createHomeNodes(self, xoffset, yoffset):
         """
@@ -130,8 +367,8 @@ class NodeGroup(object):
         :param direction: Direction of the connection.
         """
         key = self.constructKey(*otherkey)
-        self.nodesLUT[homekey].neighbors[direction] = self.nodesLUT[key]
-        self.nodesLUT[key].neighbors[direction * -1] = self.nodesLUT[homekey]
+        self.setNeighbor(self.nodesLUT[homekey], direction, self.nodesLUT[key])
+        self.setNeighbor(self.nodesLUT[key], direction * -1, self.nodesLUT[homekey])
 
     def constructKey(self, x, y):
         """
@@ -152,8 +389,8 @@ class NodeGroup(object):
         :param direction1: Direction for the first node
         :param direction2: Direction for the second node
         """
-        self.nodesLUT[key1].neighbors[direction1] = self.nodesLUT[key2]
-        self.nodesLUT[key2].neighbors[direction2] = self.nodesLUT[key1]
+        self.setNeighbor(self.nodesLUT[key1], direction1, self.nodesLUT[key2])
+        self.setNeighbor(self.nodesLUT[key2], direction2, self.nodesLUT[key1])
 
     def connectHorizontally(self, data, xoffset=0, yoffset=0):
         """
@@ -206,9 +443,7 @@ class NodeGroup(object):
         :param ypixel: Y-coordinate in pixels.
         :return: Node object or None if not found.
         """
-        if (xpixel, ypixel) in self.nodesLUT.keys():
-            return self.nodesLUT[(xpixel, ypixel)]
-        return None
+        return self.nodesLUT.get((xpixel, ypixel))
 
     def getNodeFromTiles(self, col, row):
         """
@@ -218,10 +453,7 @@ class NodeGroup(object):
         :param row: Row index.
         :return: Node object or None if not found.
         """
-        x, y = self.constructKey(col, row)
-        if (x, y) in self.nodesLUT.keys():
-            return self.nodesLUT[(x, y)]
-        return None
+        return self.nodesLUT.get(self.constructKey(col, row))
 
     def getStartTempNode(self):
         """
@@ -229,8 +461,7 @@ class NodeGroup(object):
 
         :return: First Node object.
         """
-        nodes = list(self.nodesLUT.values())
-        return nodes[0]
+        return next(iter(self.nodesLUT.values()))
 
     def setPortalPair(self, pair1, pair2):
         """
@@ -241,9 +472,9 @@ class NodeGroup(object):
         """
         key1 = self.constructKey(*pair1)
         key2 = self.constructKey(*pair2)
-        if key1 in self.nodesLUT.keys() and key2 in self.nodesLUT.keys():
-            self.nodesLUT[key1].neighbors[PORTAL] = self.nodesLUT[key2]
-            self.nodesLUT[key2].neighbors[PORTAL] = self.nodesLUT[key1]
+        if key1 in self.nodesLUT and key2 in self.nodesLUT:
+            self.setNeighbor(self.nodesLUT[key1], PORTAL, self.nodesLUT[key2])
+            self.setNeighbor(self.nodesLUT[key2], PORTAL, self.nodesLUT[key1])
 
     def denyAccess(self, col, row, direction, entity):
         """
@@ -280,8 +511,9 @@ class NodeGroup(object):
         :param direction: Direction to deny access.
         :param entities: List of entities to restrict.
         """
-        for entity in entities:
-            self.denyAccess(col, row, direction, entity)
+        node = self.getNodeFromTiles(col, row)
+        if node is not None:
+            node.denyAccessMask(direction, access_mask(entity.name for entity in entities))
 
     def allowAccessList(self, col, row, direction, entities):
         """
@@ -292,8 +524,9 @@ class NodeGroup(object):
         :param direction: Direction to allow access.
         :param entities: List of entities to allow.
         """
-        for entity in entities:
-            self.allowAccess(col, row, direction, entity)
+        node = self.getNodeFromTiles(col, row)
+        if node is not None:
+            node.allowAccessMask(direction, access_mask(entity.name for entity in entities))
 
     def denyHomeAccess(self, entity):
         """
@@ -317,8 +550,7 @@ class NodeGroup(object):
 
         :param entities: List of entities to restrict.
         """
-        for entity in entities:
-            self.denyHomeAccess(entity)
+        self.nodesLUT[self.homekey].denyAccessMask(DOWN, access_mask(entity.name for entity in entities))
 
     def allowHomeAccessList(self, entities):
         """
@@ -326,5 +558,4 @@ class NodeGroup(object):
 
         :param entities: List of entities to allow.
         """
-        for entity in entities:
-            self.allowHomeAccess(entity)
+        self.nodesLUT[self.homekey].allowAccessMask(DOWN, access_mask(entity.name for entity in entities))
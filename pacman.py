@@ -12,11 +12,12 @@ class Pacman(Entity):
     and interactions with pellets and ghosts.
     """
 
-    def __init__(self, node):
+    def __init__(self, node, headless=False):
         """
         Initializes the Pacman entity.
 
         :param node: The starting node for Pacman.
+        :param headless: If True, no sprites are created and Pacman is never drawn.
         """
         super().__init__(node)
         self.name = PACMAN
@@ -28,7 +29,7 @@ class Pacman(Entity):
             RIGHT: Vector(1, 0)
         }
         self.direction = STOP
-        self.speed = 100 * TILEWIDTH / 16
+        self.speed = ENTITY_SPEED * TILEWIDTH / 16
         self.radius = 10
         self.color = YELLOW
         self.node = node
@@ -37,7 +38,7 @@ class Pacman(Entity):
         self.direction = LEFT
         self.setBetweenNodes(LEFT)
         self.alive = True
-        self.sprites = PacmanSprites(self)
+        self.sprites = None if headless else PacmanSprites(self)
 
     def reset(self):
         """
@@ -47,8 +48,9 @@ class Pacman(Entity):
         self.direction = LEFT
         self.setBetweenNodes(LEFT)
         self.alive = True
-        self.image = self.sprites.get_start_Image()
-        self.sprites.reset()
+        if self.sprites is not None:
+            self.image = self.sprites.get_start_Image()
+            self.sprites.reset()
 
     def die(self):
         """
@@ -57,15 +59,18 @@ class Pacman(Entity):
         self.alive = False
         self.direction = STOP
 
-    def update(self, dt):
+    def update(self, dt, direction=None):
         """
         Updates Pacman's position and handles movement logic.
 
         :param dt: Time delta for frame updates.
+        :param direction: Direction to steer in, read from the keyboard if None.
         """
-        self.sprites.update(dt)
-        self.position += self.directions[self.direction] * self.speed * dt
-        direction = self.getValidKey()
+        if self.sprites is not None:
+            self.sprites.update(dt)
+        self.position.add_scaled(self.directions[self.direction], self.speed * dt)
+        if direction is None:
+            direction = self.getValidKey()
         if self.overshot_target():
             self.node = self.target
             if self.node.neighbors[PORTAL] is not None:
@@ -128,7 +133,6 @@ class Pacman(Entity):
         :param other: The other entity to check collision with.
         :return: True if collides, False otherwise.
         """
-        d = self.position - other.position
-        dSquared = d.magnitudeSquared()
+        dSquared = self.position.distanceSquared(other.position)
         rSquared = (self.collide_radius + other.collide_radius) ** 2
         return dSquared <= rSquared
@@ -2,28 +2,39 @@ class Pause(object):
     """
     Manages game pause functionality, allowing for timed pauses and manual toggling.
 
+    Without a scheduler a timed pause is counted down by update(). With one, the
+    end of the pause is registered as a deadline and the scheduler resumes the
+    game and runs func when the deadline is reached.
+
     Attributes:
         paused (bool): Indicates whether the game is currently paused.
         timer (float): Tracks the elapsed time during a timed pause.
         pause_time (float or None): Duration for which the game should remain paused.
         func (callable or None): Function to be executed after the pause ends.
+        scheduler (Scheduler or None): Scheduler that ends timed pauses.
+        deadline (float or None): Scheduler time at which the timed pause ends.
     """
 
-    def __init__(self, paused=False):
+    def __init__(self, paused=False, scheduler=None):
         """
         Initializes the Pause instance.
 
         Args:
             paused (bool): Initial pause state. Defaults to False.
+            scheduler (Scheduler or None): Scheduler that ends timed pauses. Defaults to None.
         """
         self.paused = paused
         self.timer = 0
         self.pause_time = None
         self.func = None
+        self.scheduler = scheduler
+        self.deadline = None
+        self.expiry = None
 
     def update(self, dt):
         """
         Updates the pause timer and resumes the game when the pause time expires.
+        Does nothing when the pause is ended by a scheduler.
 
         Args:
             dt (float): Time elapsed since the last update.
@@ -31,7 +42,7 @@ class Pause(object):
         Returns:
             callable or None: The stored function if the pause ends, otherwise None.
         """
-        if self.pause_time is not None:
+        if self.pause_time is not None and self.scheduler is None:
             self.timer += dt
             if self.timer >= self.pause_time:
                 self.timer = 0
@@ -53,6 +64,33 @@ class Pause(object):
         self.func = func
         self.pause_time = pause_time
         self.flip()
+        if self.scheduler is not None:
+            self.schedule(None if pause_time is None else self.scheduler.now + pause_time)
+
+    def schedule(self, deadline):
+        """
+        Sets when the timed pause ends on the scheduler, replacing the previous deadline.
+
+        Args:
+            deadline (float or None): Scheduler time, None for no timed pause.
+        """
+        if self.expiry is not None:
+            self.expiry.cancel()
+            self.expiry = None
+        self.deadline = deadline
+        if deadline is not None:
+            self.expiry = self.scheduler.call_at(deadline, self.expire)
+
+    def expire(self):
+        """
+        Ends the timed pause and runs the stored function. Called by the scheduler.
+        """
+        self.deadline = None
+        self.expiry = None
+        self.pause_time = None
+        self.paused = False
+        if self.func is not None:
+            self.func()
 
     def flip(self):
         """
@@ -2,7 +2,8 @@ import pygame
 from vector import Vector
 from constants import *
 import numpy as np
-from typing import List
+from typing import List, Optional
+from maze_compiler import compile_maze
 
 
 class Pellet:
@@ -18,10 +19,12 @@ class Pellet:
         :param column: Column index of the pellet in the grid.
         """
         self.name = PELLET
+        self.row = row
+        self.column = column
         self.position = Vector(column * TILEWIDTH, row * TILEHEIGHT)
         self.color = YELLOW
-        self.radius = int(2 * TILEWIDTH / 16)
-        self.collide_radius = int(2 * TILEWIDTH / 16)
+        self.radius = PELLET_RADIUS
+        self.collide_radius = PELLET_RADIUS
         self.points = 10
         self.visible = True
 
@@ -32,9 +35,24 @@ class Pellet:
         :param screen: The Pygame screen where the pellet is drawn.
         """
         if self.visible:
-            adjust = Vector(TILEWIDTH, TILEHEIGHT) / 2
-            p = (self.position + adjust).asInt()
-            pygame.draw.circle(screen, self.color, p, self.radius)
+            pygame.draw.circle(screen, self.color, self.get_center(), self.radius)
+
+    def get_center(self):
+        """
+        Returns the pixel at the center of the pellet's tile.
+
+        :return: Integer (x, y) tuple.
+        """
+        return int(self.position.x + TILEWIDTH / 2), int(self.position.y + TILEHEIGHT / 2)
+
+    def get_rect(self) -> pygame.Rect:
+        """
+        Returns the area the pellet covers when drawn.
+
+        :return: Bounding rectangle of the pellet's circle.
+        """
+        x, y = self.get_center()
+        return pygame.Rect(x - self.radius, y - self.radius, 2 * self.radius + 1, 2 * self.radius + 1)
 
 
 class PowerPellet(Pellet):
@@ -55,6 +73,8 @@ class PowerPellet(Pellet):
         self.points = 50
         self.flash_time = 0.4  # Time interval for blinking effect
         self.timer = 0
+        self.deadline: Optional[float] = None
+        self.expiry = None
 
     def update(self, dt: float) -> None:
         """
@@ -64,34 +84,116 @@ class PowerPellet(Pellet):
         """
         self.timer += dt
         if self.timer >= self.flash_time:
-            self.visible = not self.visible
-            self.timer = 0
+            self.flash()
+
+    def flash(self) -> None:
+        """
+        Shows or hides the Power Pellet and starts the next blink interval.
+        """
+        self.visible = not self.visible
+        self.timer = 0
 
 
 class PelletGroup:
     """
     Manages a group of pellets and power pellets in the game.
+
+    Pellets are indexed by tile: grid holds, for every (row, column), the slot
+    of the pellet on that tile or -1, so collision checks only look at the
+    tiles around Pacman and removal does not scan a list.
+
+    Pellets are drawn once into layer, a transparent surface the size of the maze.
+    Eating a pellet erases its tile and a power pellet blink redraws only that
+    pellet, so render is a single blit.
+
+    Power pellets blink in update() or, given a scheduler, at deadlines on it.
     """
 
-    def __init__(self, pellet_file: str):
+    def __init__(self, pellet_file: str, scheduler=None):
         """
         Initializes a PelletGroup object by loading pellet data from a file.
 
         :param pellet_file: Path to the file containing pellet layout.
+        :param scheduler: Scheduler the power pellets blink on, None to blink in update().
         """
-        self.pellets: List[Pellet] = []
+        self.slots: List[Optional[Pellet]] = []
+        self.initial_slots: List[Pellet] = []
         self.power_pellets: List[PowerPellet] = []
+        self.grid: np.ndarray = np.full((0, 0), -1, dtype=np.int32)
+        self.remaining: int = 0
+        self.layer: Optional[pygame.Surface] = None
+        self.dirty_rects: List[pygame.Rect] = []
         self.create_pellet_list(pellet_file)
         self.num_eaten: int = 0
+        self.scheduler = None
+        if scheduler is not None:
+            self.start_flashing(scheduler)
+
+    @property
+    def pellets(self) -> List[Pellet]:
+        """
+        Pellets that have not been eaten yet, in row-major order.
+        """
+        return [pellet for pellet in self.slots if pellet is not None]
 
     def update(self, dt: float) -> None:
         """
         Updates the state of all power pellets in the group.
+        Does nothing while they blink on a scheduler.
 
         :param dt: Time elapsed since the last update.
         """
+        if self.scheduler is not None:
+            return
         for power_pellet in self.power_pellets:
+            visible = power_pellet.visible
             power_pellet.update(dt)
+            if power_pellet.visible != visible and self.contains(power_pellet):
+                self.redraw(power_pellet)
+
+    def start_flashing(self, scheduler) -> None:
+        """
+        Makes the power pellets blink at deadlines on a scheduler.
+
+        :param scheduler: The scheduler.
+        """
+        self.scheduler = scheduler
+        for power_pellet in self.power_pellets:
+            self.schedule_flash(power_pellet, scheduler.now + power_pellet.flash_time)
+
+    def stop_flashing(self) -> None:
+        """
+        Cancels the blinking on the scheduler. update() blinks the power pellets again.
+        """
+        for power_pellet in self.power_pellets:
+            if power_pellet.expiry is not None:
+                power_pellet.expiry.cancel()
+                power_pellet.expiry = None
+            power_pellet.deadline = None
+        self.scheduler = None
+
+    def schedule_flash(self, power_pellet: PowerPellet, deadline: float) -> None:
+        """
+        Sets when a power pellet blinks next, replacing its previous deadline.
+
+        :param power_pellet: One of the group's power pellets.
+        :param deadline: Scheduler time of the blink.
+        """
+        if power_pellet.expiry is not None:
+            power_pellet.expiry.cancel()
+        power_pellet.deadline = deadline
+        power_pellet.expiry = self.scheduler.call_at(deadline, lambda: self.flash(power_pellet))
+
+    def flash(self, power_pellet: PowerPellet) -> None:
+        """
+        Blinks a power pellet and schedules its next blink. Called by the scheduler.
+
+        :param power_pellet: One of the group's power pellets.
+        """
+        power_pellet.flash()
+        if self.contains(power_pellet):
+            self.redraw(power_pellet)
+        self.schedule_flash(power_pellet, self.scheduler.now + power_pellet.flash_time)
 
     def create_pellet_list(self, pellet_file: str) -> None:
         """
@@ -99,15 +201,20 @@ class PelletGroup:
 
         :param pellet_file: Path to the file containing pellet layout.
         """
-        data = self.read_pellet_file(pellet_file)
-        for row_index, row in enumerate(data):
-            for col_index, cell in enumerate(row):
-                if cell in {'.', '+'}:  # Normal pellet
-                    self.pellets.append(Pellet(row_index, col_index))
-                elif cell in {'P', 'p'}:  # Power pellet
-                    power_pellet = PowerPellet(row_index, col_index)
-                    self.pellets.append(power_pellet)
-                    self.power_pellets.append(power_pellet)
+        maze = compile_maze(pellet_file)
+        self.grid = np.full(maze.grid.shape, -1, dtype=np.int32)
+        for row_index, col_index, kind in maze.pellets.tolist():
+            if kind == PELLET:  # Normal pellet
+                pellet = Pellet(row_index, col_index)
+            elif kind == POWERPELLET:  # Power pellet
+                pellet = PowerPellet(row_index, col_index)
+                self.power_pellets.append(pellet)
+            else:
+                continue
+            self.grid[row_index, col_index] = len(self.slots)
+            self.slots.append(pellet)
+        self.initial_slots = list(self.slots)
+        self.remaining = len(self.slots)
 
     def read_pellet_file(self, text_file: str) -> np.ndarray:
         """
@@ -116,7 +223,7 @@ class PelletGroup:
         :param text_file: Path to the text file containing pellet layout.
         :return: NumPy array representing the pellet layout.
         """
-        return np.loadtxt(text_file, dtype='<U1')
+        return compile_maze(text_file).chars()
 
     def is_empty(self) -> bool:
         """
@@ -124,13 +231,113 @@ class PelletGroup:
 
         :return: True if there are no remaining pellets, False otherwise.
         """
-        return not self.pellets
+        return self.remaining == 0
+
+    def pellets_near(self, position: Vector) -> List[Pellet]:
+        """
+        Returns the pellets on the tile under a position and on the eight tiles around it.
+
+        :param position: Position in pixels, e.g. Pacman's position.
+        :return: Remaining pellets on those tiles, in row-major order.
+        """
+        row = int(round(position.y / TILEHEIGHT))
+        col = int(round(position.x / TILEWIDTH))
+        block = self.grid[max(row - 1, 0):max(row + 2, 0), max(col - 1, 0):max(col + 2, 0)]
+        return [self.slots[slot] for slot in block[block >= 0].tolist()]
+
+    def remove(self, pellet: Pellet) -> None:
+        """
+        Removes an eaten pellet from the group.
+
+        :param pellet: The pellet to remove.
+        :raises ValueError: If the pellet is not in the group.
+        """
+        slot = int(self.grid[pellet.row, pellet.column])
+        if slot < 0 or self.slots[slot] is not pellet:
+            raise ValueError("pellet is not in the group")
+        self.grid[pellet.row, pellet.column] = -1
+        self.slots[slot] = None
+        self.remaining -= 1
+        if self.layer is not None:
+            self.layer.fill(BLACK, pellet.get_rect())
+            self.dirty_rects.append(pellet.get_rect())
+
+    def restore(self, grid: np.ndarray) -> None:
+        """
+        Puts the pellets back as they were when a copy of grid was taken.
+
+        :param grid: A copy of grid from earlier in the same level.
+        """
+        self.grid[...] = grid
+        self.slots = [None] * len(self.initial_slots)
+        for slot in grid[grid >= 0].tolist():
+            self.slots[slot] = self.initial_slots[slot]
+        self.remaining = int((grid >= 0).sum())
+        if self.layer is not None:
+            self.build_layer()
+            self.dirty_rects.append(self.layer.get_rect())
+
+    def contains(self, pellet: Pellet) -> bool:
+        """
+        Checks if a pellet has not been eaten yet.
+
+        :param pellet: The pellet to check.
+        :return: True if the pellet is still in the group.
+        """
+        slot = int(self.grid[pellet.row, pellet.column])
+        return slot >= 0 and self.slots[slot] is pellet
+
+    def build_layer(self) -> None:
+        """
+        Draws every remaining pellet into a new transparent layer.
+        """
+        rows, cols = self.grid.shape
+        self.layer = pygame.Surface((max(cols * TILEWIDTH, 1), max(rows * TILEHEIGHT, 1)))
+        self.layer.fill(BLACK)
+        self.layer.set_colorkey(BLACK)
+        for pellet in self.pellets:
+            pellet.render(self.layer)
+
+    def redraw(self, pellet: Pellet) -> None:
+        """
+        Redraws the tile of a single pellet in the layer.
+
+        :param pellet: The pellet whose tile changed.
+        """
+        if self.layer is not None:
+            self.layer.fill(BLACK, pellet.get_rect())
+            pellet.render(self.layer)
+            self.dirty_rects.append(pellet.get_rect())
+
+    def pop_dirty_rects(self) -> List[pygame.Rect]:
+        """
+        Returns the areas of the layer changed since the last call and forgets them.
+
+        :return: Rectangles of eaten or blinking pellets.
+        """
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        return rects
 
     def render(self, screen):
         """
         Renders all pellets on the screen.
+        The layer is drawn on first use, so headless games never build it.
 
         :param screen: The Pygame screen where pellets are drawn.
         """
-        for pellet in self.pellets:
-            pellet.render(screen)
+        if self.layer is None:
+            self.build_layer()
+        screen.blit(self.layer, (0, 0))
+        self.dirty_rects = []
+
+    def render_area(self, screen, rect: pygame.Rect) -> None:
+        """
+        Renders only the pellets inside an area of the screen.
+
+        :param screen: The Pygame screen where pellets are drawn.
+        :param rect: The area to draw.
+        """
+        if self.layer is None:
+            self.build_layer()
+        screen.blit(self.layer, rect, rect)
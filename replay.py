@@ -0,0 +1,208 @@
+import json
+import time
+import zlib
+from simulation import GameSimulation
+
+PAUSE_EVENT = "pause"
+MUTE_EVENT = "mute"
+
+
+class Replay(object):
+    """
+    Input log of one game session, small enough to keep for every game played.
+
+    The game only depends on its seed, its starting settings, the direction
+    Pac-Man is steered in and the dt of every tick, and the ticks after which the
+    player paused. Those are recorded as run-length encoded streams: the
+    directions as [direction, count, ...] and the dt as [index, count, ...] into
+    the list of distinct dt values seen. Saved replays are zlib-compressed JSON.
+
+    Attributes:
+        seed (int): Seed of the game's random stream.
+        difficulty (int): Selected difficulty level.
+        level (int): Level the session started at.
+        lives (int): Lives at the start of the session.
+        ticks (int): Number of ticks recorded.
+        directions (list): Run-length encoded directions.
+        dts (list): Distinct dt values in seconds.
+        steps (list): Run-length encoded indices into dts.
+        events (list): [tick, event, ...] of the pause and mute key presses,
+            each applied after its tick.
+        score (int or None): Score at the end of the recording.
+        state_hash (str or None): GameSimulation.state_hash() at the end of the recording.
+    """
+
+    VERSION = 1
+
+    def __init__(self, seed, difficulty=1, level=0, lives=5):
+        """
+        Starts an empty replay.
+
+        Args:
+            seed (int): Seed of the game's random stream.
+            difficulty (int): Selected difficulty level.
+            level (int): Level the session starts at.
+            lives (int): Lives at the start of the session.
+        """
+        self.seed = seed
+        self.difficulty = difficulty
+        self.level = level
+        self.lives = lives
+        self.ticks = 0
+        self.directions = []
+        self.dts = []
+        self.steps = []
+        self.events = []
+        self.score = None
+        self.state_hash = None
+        self.dt_index = {}
+
+    @classmethod
+    def start(cls, sim):
+        """
+        Starts recording a game that has not been stepped yet.
+
+        Args:
+            sim (GameSimulation): The game.
+
+        Returns:
+            Replay: The empty replay.
+        """
+        return cls(sim.seed, sim.difficulty, sim.level, sim.lives)
+
+    def record_tick(self, direction, dt):
+        """
+        Appends a tick stepped with the given direction and dt.
+        """
+        index = self.dt_index.get(dt)
+        if index is None:
+            index = self.dt_index[dt] = len(self.dts)
+            self.dts.append(dt)
+        self.append_run(self.directions, direction)
+        self.append_run(self.steps, index)
+        self.ticks += 1
+
+    @staticmethod
+    def append_run(runs, value):
+        """
+        Adds one value to a run-length encoded list.
+        """
+        if runs and runs[-2] == value:
+            runs[-1] += 1
+        else:
+            runs.extend((value, 1))
+
+    def record_event(self, event):
+        """
+        Appends a key press handled after the last recorded tick.
+
+        Args:
+            event (str): PAUSE_EVENT or MUTE_EVENT.
+        """
+        self.events.extend((self.ticks - 1, event))
+
+    def finish(self, sim):
+        """
+        Stores the final score and state of the recorded game for verification.
+        """
+        self.score = sim.score
+        self.state_hash = sim.state_hash()
+
+    def to_bytes(self):
+        """
+        Returns the compressed replay.
+        """
+        data = {"version": self.VERSION, "seed": self.seed, "difficulty": self.difficulty,
+                "level": self.level, "lives": self.lives, "ticks": self.ticks,
+                "directions": self.directions, "dts": self.dts, "steps": self.steps,
+                "events": self.events, "score": self.score, "state_hash": self.state_hash}
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode(), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Reads a replay written by to_bytes().
+
+        Raises:
+            ValueError: If the data is not a replay of this version.
+        """
+        try:
+            data = json.loads(zlib.decompress(data))
+        except (zlib.error, ValueError) as error:
+            raise ValueError("not a replay") from error
+        if data.get("version") != cls.VERSION:
+            raise ValueError(f"unsupported replay version {data.get('version')}")
+        replay = cls(data["seed"], data["difficulty"], data["level"], data["lives"])
+        replay.ticks = data["ticks"]
+        replay.directions = data["directions"]
+        replay.dts = data["dts"]
+        replay.steps = data["steps"]
+        replay.events = data["events"]
+        replay.score = data["score"]
+        replay.state_hash = data["state_hash"]
+        replay.dt_index = {dt: index for index, dt in enumerate(replay.dts)}
+        return replay
+
+    def save(self, path):
+        """
+        Writes the compressed replay to a file.
+        """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a replay file written by save().
+        """
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    @staticmethod
+    def expand(runs):
+        """
+        Yields the values of a run-length encoded list one by one.
+        """
+        for value, count in zip(runs[::2], runs[1::2]):
+            for _ in range(count):
+                yield value
+
+    def play(self, verify=True):
+        """
+        Plays the replay back headless, as fast as possible.
+
+        Args:
+            verify (bool): Check the final score and state against the recording.
+
+        Returns:
+            GameSimulation: The game after the last tick. Its stats hold the
+            simulated and wall-clock time of the playback.
+
+        Raises:
+            ValueError: If verify is set and the game ends differently than recorded.
+        """
+        sim = GameSimulation(seed=self.seed)
+        sim.difficulty = self.difficulty
+        sim.level = self.level
+        sim.lives = self.lives
+        sim.startGame()
+
+        events = {}
+        for tick, event in zip(self.events[::2], self.events[1::2]):
+            events.setdefault(tick, []).append(event)
+
+        start = time.perf_counter()
+        directions = self.expand(self.directions)
+        for tick, index in enumerate(self.expand(self.steps)):
+            sim.step(self.dts[index], next(directions))
+            for event in events.get(tick, ()):
+                if event == PAUSE_EVENT:
+                    sim.toggle_pause()
+        sim.stats.wall_time += time.perf_counter() - start
+
+        if verify and self.score is not None:
+            if sim.score != self.score:
+                raise ValueError(f"replay ended with score {sim.score}, recorded {self.score}")
+            if sim.state_hash() != self.state_hash:
+                raise ValueError("replay ended in a different state than recorded")
+        return sim
@@ -0,0 +1,134 @@
+import heapq
+import itertools
+
+
+class Timer(object):
+    """
+    Handle of a callback registered with a Scheduler.
+
+    Attributes:
+        deadline (float): Scheduler time at which the callback runs.
+        callback (callable): Function run without arguments.
+        cancelled (bool): Whether the callback was cancelled before it ran.
+    """
+
+    __slots__ = ("deadline", "callback", "cancelled")
+
+    def __init__(self, deadline, callback):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Keeps the callback from running. The scheduler drops it when its deadline comes up.
+        """
+        self.cancelled = True
+        self.callback = None
+
+
+class Scheduler(object):
+    """
+    Runs callbacks at deadlines in simulated time.
+
+    Objects with a countdown register its deadline once instead of adding up dt
+    every frame. advance(dt) moves the clock and runs the callbacks that are due,
+    so a frame costs O(log n) per timer that expires and nothing for the others.
+    Pending timers are kept in a heap ordered by deadline, and timers with the
+    same deadline run in the order they were registered. A timer is due when the
+    clock has reached its deadline, like a countdown checked with timer >= time.
+
+    Callbacks may register and cancel timers and clear the scheduler. A timer
+    registered for a deadline that has already passed runs in the same advance().
+
+    Attributes:
+        now (float): Current time of the clock in seconds.
+        fired (int): Number of callbacks run so far.
+    """
+
+    def __init__(self, now=0.0):
+        """
+        Args:
+            now (float): Start time of the clock.
+        """
+        self.now = now
+        self.fired = 0
+        self.heap = []
+        self.counter = itertools.count()
+
+    def __len__(self):
+        """
+        Returns the number of timers waiting, cancelled ones that were not dropped yet included.
+        """
+        return len(self.heap)
+
+    def call_at(self, deadline, callback):
+        """
+        Registers a callback to run once the clock reaches a deadline.
+
+        Args:
+            deadline (float): Time of the clock.
+            callback (callable): Function run without arguments.
+
+        Returns:
+            Timer: Handle to cancel the callback.
+        """
+        timer = Timer(deadline, callback)
+        heapq.heappush(self.heap, (deadline, next(self.counter), timer))
+        return timer
+
+    def call_later(self, delay, callback):
+        """
+        Registers a callback to run after some time has passed on the clock.
+
+        Args:
+            delay (float): Time from now in seconds.
+            callback (callable): Function run without arguments.
+
+        Returns:
+            Timer: Handle to cancel the callback.
+        """
+        return self.call_at(self.now + delay, callback)
+
+    def advance(self, dt):
+        """
+        Moves the clock forward and runs the callbacks that became due.
+
+        Args:
+            dt (float): Time passed in seconds.
+        """
+        self.now += dt
+        self.run_due()
+
+    def run_due(self):
+        """
+        Runs the callbacks whose deadline is not after the current time, in deadline order.
+        """
+        while self.heap and self.heap[0][0] <= self.now:
+            timer = heapq.heappop(self.heap)[2]
+            if not timer.cancelled:
+                callback = timer.callback
+                timer.cancel()
+                self.fired += 1
+                callback()
+
+    def next_deadline(self):
+        """
+        Returns the deadline of the next timer that will run, None if there is none.
+        """
+        heap = self.heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def clear(self, now=0.0):
+        """
+        Drops all timers and sets the clock.
+
+        Args:
+            now (float): New time of the clock.
+        """
+        for _, _, timer in self.heap:
+            timer.cancel()
+        self.heap = []
+        self.now = now
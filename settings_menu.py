@@ -1,6 +1,9 @@
 import pygame
 from pygame.constants import *
 from constants import *
+from text import load_font, render_label
+
+MENU_FONT_SIZE = 15
 
 
 class SettingsMenu:
@@ -28,7 +31,7 @@ class SettingsMenu:
         """
         self.game_controller = game_controller
         self.selected_option = 0
-        self.font = pygame.font.Font('fonts/PressStart2P-Regular.ttf', 15)
+        self.font = load_font(MENU_FONT_SIZE)
         self.difficulty_levels = ["Easy", "Medium", "Hard"]
         self.background_colors = ['Black', 'Gray', 'Navy']
         self.options = [
@@ -42,12 +45,13 @@ class SettingsMenu:
         """
         Renders the settings menu on the screen.
         Highlights the selected option in red while others remain white.
+        The labels come from the shared label cache instead of being rendered every frame.
         """
         self.game_controller.screen.fill((0, 0, 0))
 
         for i, option in enumerate(self.options):
             color = (255, 255, 255) if i != self.selected_option else (255, 0, 0)
-            option_text = self.font.render(option, True, color)
+            option_text = render_label(option, color, MENU_FONT_SIZE)
             self.game_controller.screen.blit(option_text, (100, 100 + i * 50))
 
         pygame.display.update()
@@ -0,0 +1,398 @@
+import time
+import hashlib
+import random
+from constants import *
+from pacman import Pacman
+from nodes import NodeGroup
+from pellets import PelletGroup
+from fruit import Fruit
+from ghosts import GhostsGroup
+from pauser import Pause
+from scheduler import Scheduler
+from mazedata import MazeData
+
+
+class RunStats(object):
+    """
+    Counts the simulated and the wall-clock time spent stepping a game.
+
+    Attributes:
+        steps (int): Number of steps taken.
+        simulated_time (float): Sum of the dt of all steps, in seconds.
+        wall_time (float): Real time spent on the steps, in seconds.
+    """
+
+    def __init__(self):
+        self.steps = 0
+        self.simulated_time = 0.0
+        self.wall_time = 0.0
+
+    @property
+    def speed(self):
+        """
+        Simulated seconds per wall-clock second, 0 before anything was measured.
+        """
+        if self.wall_time <= 0:
+            return 0.0
+        return self.simulated_time / self.wall_time
+
+    def __str__(self):
+        return (f"{self.simulated_time:.1f} s simulated in {self.wall_time:.2f} s "
+                f"({self.speed:.1f}x real time, {self.steps} steps)")
+
+
+class GameSimulation(object):
+    """
+    Game rules of Pac-Man without a window, sound, clock or keyboard.
+
+    The simulation owns the maze nodes, pellets, Pac-Man, ghosts, fruit, pause and
+    scoring, and advances them with step(dt, action). GameController builds on it
+    and adds the display, input, text and music through the on_* hooks.
+
+    Timed events run on two schedulers instead of counting down every step.
+    timers advances every step and ends timed pauses and blinks the power
+    pellets. play_timers only advances while the game is not paused and ends
+    the ghost modes and the fruit.
+
+    Attributes:
+        headless (bool): Whether entities are created without sprites.
+        fruit (Fruit or None): Current fruit in the game.
+        pause (Pause): Pause controller.
+        timers (Scheduler): Clock of all steps, for pauses and power pellets.
+        play_timers (Scheduler): Clock of the unpaused steps, for ghost modes and fruit.
+        level (int): Current game level.
+        lives (int): Number of player lives.
+        score (int): Player score.
+        finishBG (bool): Whether the level is finished and the next one is about to start.
+        mazedata (MazeData): Handles maze data.
+        difficulty (int): Selected difficulty level.
+        seed (int): Seed of rng.
+        rng (random.Random): Random stream of this game, used for the ghosts' random moves.
+        ghost_targeting (str): How the ghosts head for their goals, GREEDY or SHORTEST_PATH.
+        stats (RunStats): Simulated and wall-clock time of the steps taken so far.
+    """
+
+    def __init__(self, headless=True, seed=None, ghost_targeting=GREEDY):
+        """
+        Initializes the simulation. startGame() has to be called before step().
+
+        The same seed and the same actions and dt give the same game.
+
+        Args:
+            headless (bool): Create entities without sprites. Defaults to True.
+            seed (int or None): Seed of the game's random stream, drawn at random if None.
+            ghost_targeting (str): GREEDY, the original ghosts, or SHORTEST_PATH.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.headless = headless
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.ghost_targeting = ghost_targeting
+        self.fruit = None
+        self.timers = Scheduler()
+        self.play_timers = Scheduler()
+        self.pause = Pause(True, self.timers)
+        self.pelletGroup = None
+        self.level = 0
+        self.lives = START_LIVES
+        self.score = 0
+        self.finishBG = False
+        self.mazedata = MazeData()
+        self.difficulty = 1
+        self.stats = RunStats()
+
+    def set_difficulty(self, difficulty_level):
+        """
+        Sets the game difficulty and adjusts lives accordingly.
+
+        Args:
+            difficulty_level (int): Difficulty index (0 = Easy, 1 = Medium, 2 = Hard).
+        """
+        self.difficulty = difficulty_level
+
+        if self.difficulty == 0:
+            self.lives = 6
+        elif self.difficulty == 1:
+            self.lives = 4
+        elif self.difficulty == 2:
+            self.lives = 3
+
+    def get_maze_file(self):
+        """
+        Returns the path to the layout file of the current maze.
+        """
+        return 'mazes/' + self.mazedata.obj.name + ".txt"
+
+    def startGame(self):
+        """
+        Initializes and starts a new game level.
+
+        This method loads the maze, creates Pac-Man, ghosts, pellets and nodes,
+        and applies various constraints to regulate ghost behavior.
+        """
+        self.mazedata.load_maze(self.level)
+        self.play_timers.clear(self.play_timers.now)
+        if self.fruit is not None:
+            self.fruit.schedule(self.fruit.deadline)
+        self.nodes = NodeGroup(self.get_maze_file())
+        self.mazedata.obj.set_portal_pairs(self.nodes)
+        self.mazedata.obj.connect_home_nodes(self.nodes)
+
+        self.pacman = Pacman(self.nodes.getNodeFromTiles(*self.mazedata.obj.pacman_start), headless=self.headless)
+        if self.pelletGroup is not None:
+            self.pelletGroup.stop_flashing()
+        self.pelletGroup = PelletGroup(self.get_maze_file(), self.timers)
+        self.ghosts = GhostsGroup(self.nodes.getStartTempNode(), self.pacman, headless=self.headless, rng=self.rng,
+                                  targeting=self.ghost_targeting, scheduler=self.play_timers)
+        self.ghosts.pinky.set_spawn_node(self.nodes.getNodeFromTiles(*self.mazedata.obj.add_offset(2, 3)))
+        self.ghosts.inky.set_spawn_node(self.nodes.getNodeFromTiles(*self.mazedata.obj.add_offset(0, 3)))
+        self.ghosts.clyde.set_spawn_node(self.nodes.getNodeFromTiles(*self.mazedata.obj.add_offset(4, 3)))
+        self.ghosts.blinky.set_spawn_node(self.nodes.getNodeFromTiles(*self.mazedata.obj.add_offset(2, 0)))
+
+        self.nodes.denyHomeAccess(self.pacman)
+        self.nodes.denyHomeAccessList(self.ghosts)
+        self.ghosts.inky.spawn_node.denyAccess(RIGHT, self.ghosts.inky)
+        self.ghosts.clyde.spawn_node.denyAccess(LEFT, self.ghosts.clyde)
+        self.mazedata.obj.deny_ghosts_access(self.ghosts, self.nodes)
+
+    def restart_game(self):
+        """
+        Restarts the game, resetting all attributes to initial values.
+        """
+        self.lives = START_LIVES
+        self.level = 0
+        self.score = 0
+        self.pause.paused = True
+        self.remove_fruit()
+        self.startGame()
+
+    def reset_level(self):
+        """
+        Resets the current level without restarting the game.
+        """
+        self.pause.paused = True
+        self.pacman.reset()
+        self.ghosts.reset()
+        self.remove_fruit()
+
+    def next_level(self):
+        """
+        Advances to the next level.
+        """
+        self.show_entities()
+        self.level += 1
+        self.pause.paused = True
+        self.startGame()
+
+    def step(self, dt, action=STOP):
+        """
+        Advances the game by one tick.
+
+        Args:
+            dt (float): Simulated time of the tick in seconds.
+            action (int): Direction Pac-Man is steered in (UP, DOWN, LEFT, RIGHT or STOP).
+        """
+        if not self.pause.paused:
+            self.play_timers.advance(dt)
+            self.ghosts.update(dt)
+            self.checkPelletEvents()
+            self.checkFruitEvents()
+            self.checkGhostEvents()
+        if self.pacman.alive:
+            if not self.pause.paused:
+                self.pacman.update(dt, action)
+        else:
+            self.pacman.update(dt, action)
+        self.timers.advance(dt)
+        self.stats.steps += 1
+        self.stats.simulated_time += dt
+
+    def run(self, steps, action=STOP, dt=FIXED_DT, auto_resume=True):
+        """
+        Steps the game with a fixed dt as fast as possible.
+
+        Args:
+            steps (int): Number of steps to take.
+            action (int or callable): Direction for every step, or a function that
+                gets the simulation and returns the direction for the next step.
+            dt (float): Simulated time of every step in seconds.
+            auto_resume (bool): Resume the game whenever it waits for the player,
+                as if space was pressed, so long runs continue after a lost life.
+
+        Returns:
+            RunStats: The stats of the simulation, including this run.
+        """
+        start = time.perf_counter()
+        for _ in range(steps):
+            if auto_resume and self.pause.paused and self.pause.pause_time is None:
+                self.toggle_pause()
+            if callable(action):
+                self.step(dt, action(self))
+            else:
+                self.step(dt, action)
+        self.stats.wall_time += time.perf_counter() - start
+        return self.stats
+
+    def toggle_pause(self):
+        """
+        Pauses or resumes the game on the player's request.
+
+        Returns:
+            bool: True if the pause state changed, False if Pac-Man is dead.
+        """
+        if not self.pacman.alive:
+            return False
+        self.pause.set_pause(player_paused=True)
+        if not self.pause.paused:
+            self.show_entities()
+        else:
+            self.hide_entities()
+        return True
+
+    def state_hash(self):
+        """
+        Returns a digest of the score, lives, level, pause, Pac-Man, ghosts, fruit
+        and pellets, to check that two games ended in the same state.
+        """
+        pacman = self.pacman
+        state = (self.score, self.lives, self.level, self.pause.paused, pacman.alive,
+                 float(pacman.position.x), float(pacman.position.y), pacman.direction,
+                 tuple((float(g.position.x), float(g.position.y), g.direction, g.mode.current_mode) for g in self.ghosts),
+                 self.fruit is not None, self.pelletGroup.remaining)
+        digest = hashlib.sha1(repr(state).encode())
+        digest.update((self.pelletGroup.grid >= 0).tobytes())
+        return digest.hexdigest()
+
+    def update_score(self, points):
+        """
+        Updates the player's score.
+
+        Args:
+            points (int): Points to add to the score.
+        """
+        self.score += points
+
+    def checkFruitEvents(self):
+        """
+        Handles fruit spawning and collection events.
+        """
+        if self.pelletGroup.num_eaten in FRUIT_PELLETS:
+            if self.fruit is None:
+                self.fruit = Fruit(self.nodes.getNodeFromTiles(9, 20), headless=self.headless,
+                                   scheduler=self.play_timers)
+        if self.fruit is not None:
+            if self.pacman.collideCheck(self.fruit):
+                self.update_score(self.fruit.points)
+                self.on_fruit_eaten(self.fruit)
+                self.remove_fruit()
+            elif self.fruit.destroy:
+                self.fruit = None
+
+    def remove_fruit(self):
+        """
+        Takes the fruit out of the game and cancels its deadline.
+        """
+        if self.fruit is not None:
+            self.fruit.schedule(None)
+            self.fruit = None
+
+    def checkPelletEvents(self):
+        """
+        Handles pellet consumption and power-up activation.
+        """
+        pellet = self.pacman.eatPellets(self.pelletGroup.pellets_near(self.pacman.position))
+        if pellet:
+            self.eat_pellet(pellet)
+
+    def eat_pellet(self, pellet):
+        """
+        Lets Pac-Man eat a pellet, releasing ghosts, starting FREIGHT mode or ending the level.
+
+        Args:
+            pellet (Pellet): Pellet Pac-Man touches.
+        """
+        self.pelletGroup.num_eaten += 1
+        self.on_pellet_eaten(pellet)
+        self.update_score(pellet.points)
+
+        if self.pelletGroup.num_eaten == INKY_PELLETS:
+            self.ghosts.inky.spawn_node.allowAccess(RIGHT, self.ghosts.inky)
+        if self.pelletGroup.num_eaten == CLYDE_PELLETS:
+            self.ghosts.clyde.spawn_node.allowAccess(LEFT, self.ghosts.clyde)
+
+        self.pelletGroup.remove(pellet)
+
+        if pellet.name == POWERPELLET:
+            self.ghosts.start_freight()
+
+        if self.pelletGroup.is_empty():
+            self.finishBG = True
+            self.hide_entities()
+            self.pause.set_pause(pause_time=LEVEL_PAUSE, func=self.next_level)
+
+    def checkGhostEvents(self):
+        """
+        Handles interactions between Pac-Man and ghosts.
+        """
+        for ghost in self.ghosts:
+            if self.pacman.collide_ghost(ghost):
+                if ghost.mode.current_mode is FREIGHT:
+                    self.pacman.visible = False
+                    ghost.visible = False
+                    self.update_score(ghost.points)
+                    self.on_ghost_eaten(ghost)
+                    self.ghosts.updatePoints()
+                    self.pause.set_pause(pause_time=GHOST_EATEN_PAUSE, func=self.show_entities)
+                    ghost.start_spawn()
+                    self.nodes.allowHomeAccess(ghost)
+                elif ghost.mode.current_mode is not SPAWN:
+                    if self.pacman.alive:
+                        self.lives -= 1
+                        self.on_pacman_death()
+                        self.pacman.die()
+                        self.ghosts.hide()
+                        if self.lives <= 0:
+                            self.on_game_over()
+                            self.pause.set_pause(pause_time=DEATH_PAUSE, func=self.restart_game)
+                        else:
+                            self.pause.set_pause(pause_time=DEATH_PAUSE, func=self.reset_level)
+
+    def on_pellet_eaten(self, pellet):
+        """
+        Called when Pac-Man eats a pellet, before the points are added.
+        """
+
+    def on_fruit_eaten(self, fruit):
+        """
+        Called when Pac-Man eats a fruit, after the points are added.
+        """
+
+    def on_ghost_eaten(self, ghost):
+        """
+        Called when Pac-Man eats a ghost, after the points are added.
+        """
+
+    def on_pacman_death(self):
+        """
+        Called when a ghost catches Pac-Man, after a life is taken.
+        """
+
+    def on_game_over(self):
+        """
+        Called when Pac-Man loses the last life.
+        """
+
+    def show_entities(self):
+        """
+        Makes Pac-Man and ghosts visible.
+        """
+        self.pacman.visible = True
+        self.ghosts.show()
+
+    def hide_entities(self):
+        """
+        Hides Pac-Man and ghosts from the screen.
+        """
+        self.pacman.visible = False
+        self.ghosts.hide()
@@ -0,0 +1,227 @@
+import numpy as np
+from vector import Vector
+from fruit import Fruit
+from nodes import ACCESS_DIRECTIONS
+from constants import MODES, MODE_INDEX, AFTER_NONE, AFTER_SHOW, AFTER_RESET, AFTER_RESTART, AFTER_NEXT
+
+# Fields of the "game" vector.
+(G_SCORE, G_LIVES, G_LEVEL, G_DIFFICULTY, G_FINISH_BG, G_PAUSED, G_PAUSE_DEADLINE, G_PAUSE_TIME, G_PAUSE_AFTER,
+ G_NUM_EATEN, G_FRUIT, G_FRUIT_DEADLINE, G_FRUIT_DESTROY, G_GAUSS, G_TIMERS_NOW, G_PLAY_TIMERS_NOW) = range(16)
+GAME_FIELDS = 16
+
+# Fields of the "pacman" vector and of every row of the "ghosts" table.
+E_NODE, E_TARGET, E_X, E_Y, E_DIRECTION, E_SPEED, E_VISIBLE = range(7)
+P_ALIVE = 7
+PACMAN_FIELDS = 8
+(H_POINTS, H_GOAL_X, H_GOAL_Y, H_MOVE, H_CTRL_TIME, H_CTRL_DEADLINE, H_CURRENT,
+ H_MAIN_MODE, H_MAIN_TIME, H_MAIN_DEADLINE) = range(7, 17)
+GHOST_FIELDS = 17
+
+# Functions run when a timed pause ends, by name.
+PAUSE_AFTER = {None: AFTER_NONE, "show_entities": AFTER_SHOW, "reset_level": AFTER_RESET,
+               "restart_game": AFTER_RESTART, "next_level": AFTER_NEXT}
+PAUSE_AFTER_NAMES = {code: name for name, code in PAUSE_AFTER.items()}
+
+MOVE_METHOD_NAMES = ("goal_movement", "scatter_movement", "spawn_movement",
+                     "random_movement", "freight_movement", "wait_movement")
+MOVE_METHOD_INDEX = {name: index for index, name in enumerate(MOVE_METHOD_NAMES)}
+
+# Size of the state of random.Random: 624 words and the position in them.
+RNG_WORDS = 625
+
+
+def nan_if_none(value):
+    """
+    Stores None as NaN in a float field.
+    """
+    return np.nan if value is None else value
+
+
+def none_if_nan(value):
+    """
+    Reads back a field written by nan_if_none().
+    """
+    return None if value != value else value
+
+
+class Snapshotter(object):
+    """
+    Captures and restores the whole state of a GameSimulation as one flat NumPy record.
+
+    A snapshot holds no references to game objects: nodes are stored as their
+    index in the NodeGroup, ghost modes, move methods and the function run after
+    a timed pause as small codes, the access of the nodes as a copy of the
+    group's access table and the pellets as a copy of PelletGroup.grid.
+    Timed events are stored as their deadline, next to the time of the two
+    schedulers of the game, and registered again on restore.
+    Snapshots are plain numbers and can be copied, stored or compared with NumPy.
+
+    Only the game rules are covered. Sprites, text, music and the clock of
+    GameController are left as they are.
+
+    Attributes:
+        sim (GameSimulation): The game.
+        nodes (NodeGroup): Node group the record type was built for.
+        dtype (numpy.dtype): Record type of the snapshots of this level.
+    """
+
+    def __init__(self, sim):
+        """
+        Args:
+            sim (GameSimulation): A started game.
+        """
+        self.sim = sim
+        self.nodes = None
+        self.build_layout()
+
+    def build_layout(self):
+        """
+        Builds the record type for the current level.
+        """
+        sim = self.sim
+        self.nodes = sim.nodes
+        self.dtype = np.dtype([("game", np.float64, (GAME_FIELDS,)),
+                               ("pacman", np.float64, (PACMAN_FIELDS,)),
+                               ("ghosts", np.float64, (4, GHOST_FIELDS)),
+                               ("access", np.uint16, sim.nodes.access.shape),
+                               ("pellets", np.int32, sim.pelletGroup.grid.shape),
+                               ("power", np.float64, (len(sim.pelletGroup.power_pellets), 2)),
+                               ("rng", np.uint32, (RNG_WORDS,))])
+
+    def entity_fields(self, entity):
+        """
+        Returns the fields shared by Pac-Man and the ghosts.
+        """
+        return [entity.node.index, entity.target.index, entity.position.x, entity.position.y,
+                entity.direction, entity.speed, entity.visible]
+
+    def capture(self, out=None):
+        """
+        Takes a snapshot of the game.
+
+        Args:
+            out (ndarray or None): 0-d record of this level's dtype to write into.
+
+        Returns:
+            ndarray: 0-d record holding the snapshot.
+        """
+        sim = self.sim
+        if sim.nodes is not self.nodes:
+            self.build_layout()
+        state = np.empty((), self.dtype) if out is None else out
+        pause = sim.pause
+        fruit = sim.fruit
+        after = None if pause.func is None else pause.func.__name__
+        _, words, gauss = sim.rng.getstate()
+        state["game"] = (sim.score, sim.lives, sim.level, sim.difficulty, sim.finishBG,
+                         pause.paused, nan_if_none(pause.deadline), nan_if_none(pause.pause_time),
+                         PAUSE_AFTER[after], sim.pelletGroup.num_eaten, fruit is not None,
+                         np.nan if fruit is None else nan_if_none(fruit.deadline), fruit is not None and fruit.destroy,
+                         nan_if_none(gauss), sim.timers.now, sim.play_timers.now)
+
+        pacman = sim.pacman
+        state["pacman"] = self.entity_fields(pacman) + [pacman.alive]
+
+        ghosts = []
+        for ghost in sim.ghosts:
+            mode = ghost.mode
+            ghosts.append(self.entity_fields(ghost) + [
+                ghost.points, ghost.goal.x, ghost.goal.y, MOVE_METHOD_INDEX[ghost.move_method.__name__],
+                nan_if_none(mode.time), nan_if_none(mode.deadline), MODE_INDEX[mode.current_mode],
+                MODE_INDEX[mode.main_mode.mode], mode.main_mode.time, nan_if_none(mode.main_mode.deadline)])
+        state["ghosts"] = ghosts
+
+        state["access"] = sim.nodes.access
+        state["pellets"] = sim.pelletGroup.grid
+        state["power"] = [(nan_if_none(pellet.deadline), pellet.visible) for pellet in sim.pelletGroup.power_pellets]
+        state["rng"] = words
+        return state
+
+    def restore_entity(self, entity, fields):
+        """
+        Restores the fields written by entity_fields().
+        """
+        nodes = self.nodes.nodeList
+        entity.node = nodes[int(fields[E_NODE])]
+        entity.target = nodes[int(fields[E_TARGET])]
+        entity.position = Vector(fields[E_X], fields[E_Y])
+        entity.direction = int(fields[E_DIRECTION])
+        entity.speed = fields[E_SPEED]
+        entity.visible = bool(fields[E_VISIBLE])
+
+    def restore(self, state):
+        """
+        Puts the game back in the state of a snapshot.
+
+        A snapshot taken on another level starts that level first.
+
+        Args:
+            state (ndarray): Record returned by capture().
+
+        Raises:
+            ValueError: If the snapshot does not fit the maze of its level.
+        """
+        sim = self.sim
+        game = state["game"].tolist()
+        level = int(game[G_LEVEL])
+        if sim.level != level:
+            sim.level = level
+            sim.startGame()
+        if sim.nodes is not self.nodes:
+            self.build_layout()
+        if state.dtype != self.dtype:
+            raise ValueError("snapshot does not match the maze of its level")
+
+        sim.score = int(game[G_SCORE])
+        sim.lives = int(game[G_LIVES])
+        sim.difficulty = int(game[G_DIFFICULTY])
+        sim.finishBG = bool(game[G_FINISH_BG])
+        sim.timers.clear(game[G_TIMERS_NOW])
+        sim.play_timers.clear(game[G_PLAY_TIMERS_NOW])
+        pause = sim.pause
+        pause.paused = bool(game[G_PAUSED])
+        pause.pause_time = none_if_nan(game[G_PAUSE_TIME])
+        after = PAUSE_AFTER_NAMES[int(game[G_PAUSE_AFTER])]
+        pause.func = None if after is None else getattr(sim, after)
+        pause.schedule(none_if_nan(game[G_PAUSE_DEADLINE]))
+        sim.rng.setstate((3, tuple(state["rng"].tolist()), none_if_nan(game[G_GAUSS])))
+
+        pacman = sim.pacman
+        fields = state["pacman"].tolist()
+        self.restore_entity(pacman, fields)
+        pacman.alive = bool(fields[P_ALIVE])
+
+        for ghost, fields in zip(sim.ghosts, state["ghosts"].tolist()):
+            self.restore_entity(ghost, fields)
+            ghost.points = int(fields[H_POINTS])
+            ghost.goal = Vector(fields[H_GOAL_X], fields[H_GOAL_Y])
+            ghost.move_method = getattr(ghost, MOVE_METHOD_NAMES[int(fields[H_MOVE])])
+            mode = ghost.mode
+            mode.time = none_if_nan(fields[H_CTRL_TIME])
+            mode.current_mode = MODES[int(fields[H_CURRENT])]
+            mode.main_mode.mode = MODES[int(fields[H_MAIN_MODE])]
+            mode.main_mode.time = fields[H_MAIN_TIME]
+            mode.main_mode.schedule(none_if_nan(fields[H_MAIN_DEADLINE]))
+            mode.schedule(none_if_nan(fields[H_CTRL_DEADLINE]))
+
+        access = state["access"]
+        for index in np.flatnonzero((sim.nodes.access != access).any(axis=1)).tolist():
+            node = self.nodes.nodeList[index]
+            for direction, mask in zip(ACCESS_DIRECTIONS, access[index].tolist()):
+                node.access[direction] = mask
+            sim.nodes.updateAccess(node)
+
+        pellets = sim.pelletGroup
+        pellets.restore(state["pellets"])
+        pellets.num_eaten = int(game[G_NUM_EATEN])
+        for pellet, (deadline, visible) in zip(pellets.power_pellets, state["power"].tolist()):
+            pellets.schedule_flash(pellet, deadline)
+            pellet.visible = bool(visible)
+
+        if game[G_FRUIT]:
+            if sim.fruit is None:
+                sim.fruit = Fruit(sim.nodes.getNodeFromTiles(9, 20), headless=sim.headless, scheduler=sim.play_timers)
+            sim.fruit.schedule(none_if_nan(game[G_FRUIT_DEADLINE]))
+            sim.fruit.destroy = bool(game[G_FRUIT_DESTROY])
+        else:
+            sim.fruit = None
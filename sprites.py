@@ -1,7 +1,112 @@
+import time
 import pygame
 from constants import *
-import numpy as np
 from animation import Animation
+from maze_compiler import compile_maze
+
+
+SHEET_PATH = "images/spritesheet.png"
+
+# Process-wide cache of loaded sheets, keyed by (path, TILEWIDTH, TILEHEIGHT).
+# Every sprite class shares the same scaled surface instead of decoding
+# and rescaling the png on each construction.
+_sheet_cache = {}
+_sheet_stats = {"loads": 0, "hits": 0}
+
+# Frame tables sliced out of a cached sheet, keyed by (name, path, TILEWIDTH, TILEHEIGHT).
+_atlas_cache = {}
+_atlas_build_time = {}
+
+
+def load_sheet(path=SHEET_PATH):
+    """
+    Returns the scaled and converted sprite sheet for the given path,
+    loading it from disk only the first time it is requested.
+
+    Args:
+        path (str): Path to the sprite sheet image.
+
+    Returns:
+        pygame.Surface: The shared sprite sheet surface.
+    """
+    key = (path, TILEWIDTH, TILEHEIGHT)
+    sheet = _sheet_cache.get(key)
+    if sheet is not None:
+        _sheet_stats["hits"] += 1
+        return sheet
+
+    sheet = pygame.image.load(path).convert()
+    transcolor = sheet.get_at((0, 0))
+    sheet.set_colorkey(transcolor)  # take color that made that transparent
+    width = int(sheet.get_width() / BASETILEWIDTH * TILEWIDTH)
+    height = int(sheet.get_height() / BASETILEHEIGHT * TILEHEIGHT)
+    sheet = pygame.transform.scale(sheet, (width, height))
+    # according to the constants
+    # the size of the sprite sheet changes
+    # AND! regardless of the value of TILEWIDTH and TILEHEIGHT,
+    # sprites will be displayed correctly
+
+    _sheet_cache[key] = sheet
+    _sheet_stats["loads"] += 1
+    return sheet
+
+
+def load_atlas(name, builder, path=SHEET_PATH):
+    """
+    Returns a lookup table of pre-sliced frames built from the shared sheet.
+    The builder runs once per sheet; later calls reuse its result.
+
+    Args:
+        name (str): Name of the atlas.
+        builder (callable): Function taking the sheet and returning the table.
+        path (str): Path to the sprite sheet image.
+
+    Returns:
+        object: The table returned by the builder.
+    """
+    key = (name, path, TILEWIDTH, TILEHEIGHT)
+    atlas = _atlas_cache.get(key)
+    if atlas is None:
+        sheet = load_sheet(path)
+        start = time.perf_counter()
+        atlas = builder(sheet)
+        _atlas_build_time[key] = time.perf_counter() - start
+        _atlas_cache[key] = atlas
+    return atlas
+
+
+def sheet_cache_stats():
+    """
+    Returns statistics about the shared sprite sheet cache.
+
+    Returns:
+        dict: Number of disk loads, cache hits, cached sheets and the
+        total memory held by the cached surfaces in bytes.
+    """
+    memory = 0
+    for sheet in _sheet_cache.values():
+        memory += sheet.get_height() * sheet.get_pitch()
+    return {
+        "loads": _sheet_stats["loads"],
+        "hits": _sheet_stats["hits"],
+        "sheets": len(_sheet_cache),
+        "atlases": len(_atlas_cache),
+        "atlas_build_time": sum(_atlas_build_time.values()),
+        "bytes": memory,
+    }
+
+
+def clear_sheet_cache():
+    """
+    Drops all cached sheets and resets the statistics.
+    Needed when the display is re-created, because converted surfaces
+    are bound to the pixel format of the old display.
+    """
+    _sheet_cache.clear()
+    _atlas_cache.clear()
+    _atlas_build_time.clear()
+    _sheet_stats["loads"] = 0
+    _sheet_stats["hits"] = 0
 
 
 class SpritesSheet(object):
@@ -9,23 +114,14 @@ class SpritesSheet(object):
     Represents a sprite sheet containing multiple game sprites.
 
     Attributes:
-        sheet (pygame.Surface): The loaded and processed sprite sheet.
+        sheet (pygame.Surface): The shared, scaled sprite sheet.
     """
 
     def __init__(self):
         """
-        Loads and processes the sprite sheet, adjusting its size according to the game's tile dimensions.
+        Takes the sprite sheet from the process-wide cache, loading it on first use.
         """
-        self.sheet = pygame.image.load("images/spritesheet.png").convert()
-        transcolor = self.sheet.get_at((0, 0))
-        self.sheet.set_colorkey(transcolor)  # take color that made that transparent
-        width = int(self.sheet.get_width() / BASETILEWIDTH * TILEWIDTH)
-        height = int(self.sheet.get_height() / BASETILEHEIGHT * TILEHEIGHT)
-        self.sheet = pygame.transform.scale(self.sheet, (width, height))
-        # according to the constants
-        # the size of the sprite sheet changes
-        # AND! regardless of the value of TILEWIDTH and TILEHEIGHT,
-        # sprites will be displayed correctly
+        self.sheet = load_sheet()
 
     def get_image(self, x, y, width, height):
         """
@@ -33,22 +129,51 @@ class SpritesSheet(object):
         """
         x *= TILEWIDTH
         y *= TILEHEIGHT
-        self.sheet.set_clip(pygame.Rect(x, y, width, height))
-        return self.sheet.subsurface(self.sheet.get_clip())
+        # the sheet is shared, so no set_clip state is left behind on it
+        return self.sheet.subsurface(pygame.Rect(x, y, width, height))
 
 # Creating separate classes to store
 # all character part sprites to separate them
 # from the class class and avoid a sprite table file.
 
 
+PACMAN_ANIMATIONS = {
+    LEFT: ((8, 0), (0, 0), (0, 2), (0, 0)),
+    RIGHT: ((10, 0), (2, 0), (2, 2), (2, 0)),
+    UP: ((10, 2), (6, 0), (6, 2), (6, 0)),
+    DOWN: ((8, 2), (4, 0), (4, 2), (4, 0)),
+    DEATH: ((0, 12), (2, 12), (4, 12), (6, 12), (8, 12), (10, 12), (12, 12), (14, 12), (16, 12), (18, 12), (20, 12)),
+}
+# Image shown when Pacman stops, by the direction he moved in last.
+PACMAN_STOP_FRAMES = {LEFT: (8, 0), RIGHT: (10, 0), DOWN: (8, 2), UP: (10, 2)}
+
+
+def build_pacman_frames(sheet):
+    """
+    Slices every Pacman frame out of the sheet once.
+
+    Returns:
+        dict: Maps each direction and DEATH to a tuple of surfaces, and STOP to a
+        dict of the stop surface of each direction.
+    """
+    def frame(x, y):
+        rect = pygame.Rect(x * TILEWIDTH, y * TILEHEIGHT, 2 * TILEWIDTH, 2 * TILEHEIGHT)
+        return sheet.subsurface(rect)
+
+    frames = {key: tuple(frame(x, y) for x, y in cells) for key, cells in PACMAN_ANIMATIONS.items()}
+    frames[STOP] = {direction: frame(x, y) for direction, (x, y) in PACMAN_STOP_FRAMES.items()}
+    return frames
+
+
 class PacmanSprites(SpritesSheet):
     """
     Manages Pacman's sprite animations.
 
     Attributes:
         entity: The Pacman entity.
+        frames (dict): Pre-sliced frames shared by every Pacman, see build_pacman_frames().
         animations (dict): A dictionary mapping directions to animations.
-        stop_image (tuple): Coordinates of the stop image.
+        stop_image (pygame.Surface): Image shown while Pacman stands still.
     """
 
     def __init__(self, entity):
@@ -57,16 +182,17 @@ class PacmanSprites(SpritesSheet):
         """
         SpritesSheet.__init__(self)
         self.entity = entity
+        self.frames = load_atlas("pacman", build_pacman_frames)
         self.entity.image = self.get_start_Image()
         self.animations = {}
         self.define_ani_for_pacman()
-        self.stop_image = (8, 0)
+        self.stop_image = self.frames[STOP][LEFT]
 
     def get_start_Image(self):
         """
         Returns the initial Pacman image for the starting position.
         """
-        return self.get_image(8, 0)
+        return self.frames[STOP][LEFT]
 
     def get_image(self, x, y):
         """
@@ -78,32 +204,23 @@ class PacmanSprites(SpritesSheet):
         """
         Defines animations for Pacman's movement in different directions.
         """
-        self.animations[LEFT] = Animation(((8, 0), (0, 0), (0, 2), (0, 0)))
-        self.animations[RIGHT] = Animation(((10, 0), (2, 0), (2, 2), (2, 0)))
-        self.animations[UP] = Animation(((10, 2), (6, 0), (6, 2), (6, 0)))
-        self.animations[DOWN] = Animation(((8, 2), (4, 0), (4, 2), (4, 0)))
-        self.animations[DEATH] = Animation(((0, 12), (2, 12), (4, 12), (6, 12), (8, 12), (10, 12), (12, 12), (14, 12), (16, 12), (18, 12), (20, 12)), speed=6, loop=False)
+        for direction in (LEFT, RIGHT, UP, DOWN):
+            self.animations[direction] = Animation(self.frames[direction])
+        self.animations[DEATH] = Animation(self.frames[DEATH], speed=6, loop=False)
 
     def update(self, d_time):
         """
         Updates Pacman's animation based on its movement direction.
         """
         if self.entity.alive:
-            direction_map = {
-                LEFT: (self.animations[LEFT], (8, 0)),
-                RIGHT: (self.animations[RIGHT], (10, 0)),
-                DOWN: (self.animations[DOWN], (8, 2)),
-                UP: (self.animations[UP], (10, 2))
-            }
-
-            if self.entity.direction in direction_map:
-                animation, stop_image = direction_map[self.entity.direction]
-                self.entity.image = self.get_image(*animation.update(d_time))
-                self.stop_image = stop_image
-            elif self.entity.direction == STOP:
-                self.entity.image = self.get_image(*self.stop_image)
+            direction = self.entity.direction
+            if direction in PACMAN_STOP_FRAMES:
+                self.entity.image = self.animations[direction].update(d_time)
+                self.stop_image = self.frames[STOP][direction]
+            elif direction == STOP:
+                self.entity.image = self.stop_image
         else:
-            self.entity.image = self.get_image(*self.animations[DEATH].update(d_time))
+            self.entity.image = self.animations[DEATH].update(d_time)
 
     def reset(self):
         """
@@ -113,6 +230,32 @@ class PacmanSprites(SpritesSheet):
             self.animations[key].reset()
 
 
+GHOST_COLUMNS = {BLINKY: 0, PINKY: 2, INKY: 4, CLYDE: 6}
+GHOST_ROWS = {LEFT: 8, RIGHT: 10, DOWN: 6, UP: 4}
+GHOST_EYES_COLUMN = 8
+GHOST_FREIGHT_FRAME = (10, 4)
+
+
+def build_ghost_frames(sheet):
+    """
+    Slices every ghost frame out of the sheet once.
+
+    Returns:
+        dict: Maps a ghost name, SPAWN (the eyes) or FREIGHT to its frames.
+        Ghosts and eyes map each direction to a surface, FREIGHT maps to a single surface.
+    """
+    def frame(x, y):
+        rect = pygame.Rect(x * TILEWIDTH, y * TILEHEIGHT, 2 * TILEWIDTH, 2 * TILEHEIGHT)
+        return sheet.subsurface(rect)
+
+    frames = {}
+    for name, x in GHOST_COLUMNS.items():
+        frames[name] = {direction: frame(x, y) for direction, y in GHOST_ROWS.items()}
+    frames[SPAWN] = {direction: frame(GHOST_EYES_COLUMN, y) for direction, y in GHOST_ROWS.items()}
+    frames[FREIGHT] = frame(*GHOST_FREIGHT_FRAME)
+    return frames
+
+
 class GhostSprites(SpritesSheet):
     """
     Manages the sprites and animations for ghosts.
@@ -120,42 +263,41 @@ class GhostSprites(SpritesSheet):
     Attributes:
         entity: The ghost entity.
         x (dict): Mapping of ghost types to sprite sheet positions.
+        frames (dict): Pre-sliced frames shared by all ghosts.
+        frame_key (tuple or None): Mode and direction of the image currently shown.
     """
 
     def __init__(self, entity):
         """
-        Loads and processes the sprite sheet, adjusting its size according to the game's tile dimensions.
+        Takes the shared sprite sheet and the pre-sliced ghost frames.
         """
         SpritesSheet.__init__(self)
-        self.x = {BLINKY: 0, PINKY: 2, INKY: 4, CLYDE: 6}
+        self.x = GHOST_COLUMNS
         self.entity = entity
+        self.frames = load_atlas("ghosts", build_ghost_frames)
+        self.frame_key = None
         self.entity.image = self.get_start_Image()
 
     def get_start_Image(self):
-        return self.get_image(self.x[self.entity.name], 4)
+        return self.frames[self.entity.name][UP]
 
     def get_image(self, x, y):
         return SpritesSheet.get_image(self, x, y, 2 * TILEWIDTH, 2 * TILEHEIGHT)
 
     # add ani (ani picture) for ghost
     def update(self):
-        x = self.x[self.entity.name]
-
-        if self.entity.mode.current_mode == FREIGHT:
-            self.entity.image = self.get_image(10, 4)
+        mode = self.entity.mode.current_mode
+        direction = self.entity.direction
+        if (mode, direction) == self.frame_key:
             return
+        self.frame_key = (mode, direction)
 
-        if self.entity.mode.current_mode == SPAWN:
-            x = 8
-
-        direction_map = {
-            LEFT: (x, 8),
-            RIGHT: (x, 10),
-            DOWN: (x, 6),
-            UP: (x, 4),
-        }
+        if mode == FREIGHT:
+            self.entity.image = self.frames[FREIGHT]
+            return
 
-        self.entity.image = self.get_image(*direction_map.get(self.entity.direction, (x, 8)))
+        frames = self.frames[SPAWN] if mode == SPAWN else self.frames[self.entity.name]
+        self.entity.image = frames.get(direction, frames[LEFT])
 
 
 class FruitSprites(SpritesSheet):
@@ -206,41 +348,84 @@ class LifeSprites(SpritesSheet):
         return SpritesSheet.get_image(self, x, y, 2 * TILEWIDTH, 2 * TILEHEIGHT)
 
 
+MAZE_COLOR_ROWS = 6
+MAZE_WALL_GLYPHS = 10
+MAZE_WALL_COLUMN = 12
+MAZE_DOOR = '='
+MAZE_DOOR_TILE = (10, 8)
+
+
+def build_maze_tiles(sheet):
+    """
+    Slices every wall glyph of every color row out of the sheet and
+    pre-rotates it by 0, 90, 180 and 270 degrees.
+
+    Returns:
+        dict: Maps (color row, glyph, rotation) to a tile surface. The ghost
+        house door is stored under (color row, MAZE_DOOR, 0).
+    """
+    def tile(x, y):
+        return sheet.subsurface(pygame.Rect(x * TILEWIDTH, y * TILEHEIGHT, TILEWIDTH, TILEHEIGHT))
+
+    door = tile(*MAZE_DOOR_TILE)
+    tiles = {}
+    for y in range(MAZE_COLOR_ROWS):
+        for glyph in range(MAZE_WALL_GLYPHS):
+            sprite = tile(glyph + MAZE_WALL_COLUMN, y)
+            for rot_val in range(4):
+                tiles[(y, glyph, rot_val)] = pygame.transform.rotate(sprite, rot_val * 90)
+        tiles[(y, MAZE_DOOR, 0)] = door
+    return tiles
+
+
 class MazeSprites(SpritesSheet):
     """
     Manages the maze sprite rendering.
 
     Attributes:
+        mazefile (str): Path to the maze layout file.
+        rot_file (str): Path to the maze rotation file.
+        maze (CompiledMaze): Compiled maze holding the layout and rotation grids.
         data (ndarray): The structure of the maze.
         rot_data (ndarray): Rotation values for each tile.
+        tiles (dict): Pre-rotated wall tiles shared by all mazes.
+        layout (list): (glyph, rotation) and destination pairs for every drawn cell.
+        build_time (float): Seconds spent in the last construct_background call.
     """
 
     def __init__(self, mazefile, rot_file):
         SpritesSheet.__init__(self)
-        self.data = self.read_mazeFile(mazefile)
-        self.rot_data = self.read_mazeFile(rot_file)
+        self.mazefile = mazefile
+        self.rot_file = rot_file
+        self.maze = compile_maze(mazefile, rot_file)
+        self.data = self.maze.chars()
+        self.rot_data = self.maze.rotation_chars()
+        self.tiles = load_atlas("maze", build_maze_tiles)
+        self.layout = self.build_layout()
+        self.build_time = 0.0
 
     def get_image(self, x, y):
         return SpritesSheet.get_image(self, x, y, TILEWIDTH, TILEHEIGHT)
 
-    def read_mazeFile(self, mazefile):
-        """Reads the maze layout from a file."""
-        return np.loadtxt(mazefile, dtype='<U1')
-
-    def construct_background(self, background, y):
-        """Constructs the maze background by placing tiles at the correct positions."""
+    def build_layout(self):
+        """Collects the glyph, rotation and screen position of every wall and door cell."""
+        layout = []
         for row in list(range(self.data.shape[0])):
             for col in list(range(self.data.shape[1])):
+                dest = (col * TILEWIDTH, row * TILEHEIGHT)
                 if self.data[row][col].isdigit():
-                    x = int(self.data[row][col]) + 12
-                    sprite = self.get_image(x, y)
                     rot_val = int(self.rot_data[row][col])  # get val for rotate
-                    sprite = self.rotate(sprite, rot_val)  # give it val for out sprite object
-                    background.blit(sprite, (col * TILEWIDTH, row * TILEHEIGHT))
-                elif self.data[row][col] == '=':
-                    sprite = self.get_image(10, 8)
-                    background.blit(sprite, (col * TILEWIDTH, row * TILEHEIGHT))
+                    layout.append(((int(self.data[row][col]), rot_val), dest))
+                elif self.data[row][col] == MAZE_DOOR:
+                    layout.append(((MAZE_DOOR, 0), dest))
+        return layout
 
+    def construct_background(self, background, y):
+        """Constructs the maze background by blitting the pre-rotated tiles in one batch."""
+        start = time.perf_counter()
+        tiles = self.tiles
+        background.blits([(tiles[(y, glyph, rot_val)], dest) for (glyph, rot_val), dest in self.layout], doreturn=False)
+        self.build_time = time.perf_counter() - start
         return background
 
     def rotate(self, sprite, value):
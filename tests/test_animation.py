@@ -44,3 +44,19 @@ def test_reset(animation):
     animation.reset()
     assert animation.current_frame == 0
     assert animation.is_finished is False
+
+
+def test_frame_does_not_depend_on_frame_rate(frames):
+    slow = Animation(frames=frames, speed=16)
+    fast = Animation(frames=frames, speed=16)
+    for _ in range(40):
+        slow.update(1 / 32)
+        for _ in range(4):
+            fast.update(1 / 128)
+        assert slow.current_frame == fast.current_frame
+
+
+def test_long_update_skips_frames(frames):
+    animation = Animation(frames=frames, speed=2, loop=True)
+    assert animation.update(1.2) == "frame3"
+    assert animation.update(2.0) == "frame1"
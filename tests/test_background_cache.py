@@ -0,0 +1,58 @@
+import pytest
+import pygame
+from constants import *
+from background_cache import BackgroundCache
+
+pygame.init()
+pygame.display.set_mode((1, 1))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return BackgroundCache(str(tmp_path / "backgrounds"))
+
+
+@pytest.fixture
+def maze_files(tmp_path):
+    mazefile = tmp_path / "maze.txt"
+    rot_file = tmp_path / "maze_rotation.txt"
+    mazefile.write_text("X 1 X\n+ . +")
+    rot_file.write_text(". 0 .\n. . .")
+    return str(mazefile), str(rot_file)
+
+
+class TestBackgroundCache:
+    def test_key_is_stable(self, cache, maze_files):
+        assert cache.make_key(*maze_files, BLACK, 0) == cache.make_key(*maze_files, BLACK, 0)
+
+    def test_key_covers_color_and_row(self, cache, maze_files):
+        key = cache.make_key(*maze_files, BLACK, 0)
+        assert key != cache.make_key(*maze_files, NAVY, 0)
+        assert key != cache.make_key(*maze_files, BLACK, 5)
+
+    def test_key_changes_with_maze_file(self, cache, maze_files):
+        key = cache.make_key(*maze_files, BLACK, 0)
+        with open(maze_files[1], "w") as file:
+            file.write(". 1 .\n. . .")
+        assert key != cache.make_key(*maze_files, BLACK, 0)
+
+    def test_load_missing(self, cache):
+        assert cache.load("missing") is None
+        assert cache.misses == 1
+
+    def test_save_and_load_from_disk(self, cache, maze_files):
+        key = cache.make_key(*maze_files, BLACK, 0)
+        surface = pygame.Surface((20, 10))
+        surface.fill(RED)
+        cache.save(key, surface)
+
+        fresh = BackgroundCache(cache.directory)
+        loaded = fresh.load(key)
+        assert loaded.get_size() == (20, 10)
+        assert loaded.get_at((5, 5))[:3] == RED
+        assert fresh.hits == 1
+
+    def test_load_from_memory(self, cache):
+        surface = pygame.Surface((4, 4))
+        cache.save("key", surface)
+        assert cache.load("key") is surface
@@ -0,0 +1,113 @@
+import random
+import numpy as np
+import pytest
+from constants import *
+from simulation import GameSimulation
+from batchsim import BatchSimulation
+
+
+class ScalarRandomBatch(BatchSimulation):
+    """
+    Draws the random ghost moves of every game from its own random.Random, in the
+    same order as GameSimulation(seed=seed).
+    """
+
+    def __init__(self, seeds):
+        self.rngs = [random.Random(seed) for seed in seeds]
+        super().__init__(len(seeds))
+
+    def random_choice(self, games, counts):
+        return [self.rngs[g].randint(0, count - 1) for g, count in zip(games, counts)]
+
+
+def scalar_state(sim):
+    ghosts = tuple((g.position.x, g.position.y, g.direction, g.mode.current_mode) for g in sim.ghosts)
+    return (sim.score, sim.lives, sim.level, sim.pause.paused, sim.pacman.position.x, sim.pacman.position.y,
+            sim.pacman.direction, sim.pelletGroup.remaining, sim.fruit is not None, ghosts)
+
+
+def batch_state(batch, i):
+    ghosts = tuple((float(batch.ghost_x[i, j]), float(batch.ghost_y[i, j]), int(batch.ghost_direction[i, j]),
+                    MODES[batch.current_mode[i, j]]) for j in range(4))
+    return (int(batch.score[i]), int(batch.lives[i]), int(batch.level[i]), bool(batch.paused[i]),
+            float(batch.pacman_x[i]), float(batch.pacman_y[i]), int(batch.pacman_direction[i]),
+            int(batch.remaining[i]), bool(batch.fruit[i]), ghosts)
+
+
+def script(seed, steps):
+    rng = random.Random(seed)
+    actions = []
+    for step in range(steps):
+        if step % 20 == 0:
+            action = rng.choice([UP, DOWN, LEFT, RIGHT])
+        actions.append(action)
+    return actions
+
+
+def scalar_trace(seed, actions, keep=None):
+    sim = GameSimulation(seed=seed)
+    sim.startGame()
+    if keep is not None:
+        for pellet in list(sim.pelletGroup.slots):
+            if not keep(pellet.position.x, pellet.position.y, sim):
+                sim.pelletGroup.remove(pellet)
+    trace = []
+    for action in actions:
+        if sim.pause.paused and sim.pause.pause_time is None:
+            sim.toggle_pause()
+        sim.step(1 / 60, action)
+        trace.append(scalar_state(sim))
+    return trace
+
+
+def assert_batch_matches(batch, scripts, traces):
+    for step in range(len(scripts[0])):
+        batch.toggle_pause(batch.paused & np.isnan(batch.pause_time))
+        batch.step(1 / 60, np.array([actions[step] for actions in scripts]))
+        for i, trace in enumerate(traces):
+            assert batch_state(batch, i) == trace[step], f"game {i} differs at step {step}"
+
+
+def test_start_state():
+    batch = BatchSimulation(3)
+    sim = GameSimulation()
+    sim.startGame()
+    assert batch.paused.all()
+    assert (batch.remaining == 244).all()
+    for i in range(3):
+        assert batch_state(batch, i)[4:] == scalar_state(sim)[4:]
+
+
+def test_matches_scalar_games():
+    seeds = [0, 1, 2]
+    scripts = [script(seed, 3000) for seed in seeds]
+    traces = [scalar_trace(seed, actions) for seed, actions in zip(seeds, scripts)]
+    assert any(state[1] < 5 for trace in traces for state in trace)
+    assert_batch_matches(ScalarRandomBatch(seeds), scripts, traces)
+
+
+def test_level_change_matches_scalar():
+    def keep(x, y, sim):
+        return y == sim.pacman.position.y and 200 < x < 300
+
+    seeds = [3, 4]
+    scripts = [script(seed, 2000) for seed in seeds]
+    traces = [scalar_trace(seed, actions, keep) for seed, actions in zip(seeds, scripts)]
+    assert all(trace[-1][2] == 1 for trace in traces)
+
+    batch = ScalarRandomBatch(seeds)
+    for i in range(len(seeds)):
+        batch.pellet_alive[i] &= (batch.pellet_y[0] == batch.pacman_y[i]) & (batch.pellet_x[0] > 200) & (batch.pellet_x[0] < 300)
+        batch.remaining[i] = batch.pellet_alive[i].sum()
+    assert_batch_matches(batch, scripts, traces)
+
+
+def test_run_with_numpy_random():
+    batch = BatchSimulation(16, seed=0)
+    actions = np.random.default_rng(0).choice(np.array([UP, DOWN, LEFT, RIGHT], dtype=np.int8), size=(600, 16))
+    steps = iter(actions)
+    stats = batch.run(600, lambda b: next(steps))
+    assert stats.steps == 600
+    assert stats.simulated_time == pytest.approx(10.0)
+    assert (batch.score > 0).any()
+    assert (batch.remaining == batch.pellet_alive.sum(axis=1)).all()
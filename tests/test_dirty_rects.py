@@ -0,0 +1,47 @@
+import pygame
+from constants import *
+from dirty_rects import DirtyRects, merge_rects
+
+
+def test_merge_overlapping():
+    merged = merge_rects([pygame.Rect(0, 0, 10, 10), pygame.Rect(5, 5, 10, 10)])
+    assert merged == [pygame.Rect(0, 0, 15, 15)]
+
+
+def test_merge_chain():
+    rects = [pygame.Rect(0, 0, 10, 10), pygame.Rect(20, 0, 10, 10), pygame.Rect(8, 0, 14, 5)]
+    assert merge_rects(rects) == [pygame.Rect(0, 0, 30, 10)]
+
+
+def test_merge_keeps_separate_rects():
+    rects = [pygame.Rect(0, 0, 10, 10), pygame.Rect(50, 50, 10, 10)]
+    assert merge_rects(rects) == rects
+
+
+def test_merge_clips_and_drops_empty():
+    bounds = pygame.Rect(0, 0, 100, 100)
+    merged = merge_rects([(-5, -5, 10, 10), (200, 200, 5, 5), (10, 10, 0, 5)], bounds)
+    assert merged == [pygame.Rect(0, 0, 5, 5)]
+
+
+def test_full_redraw_on_new_background():
+    tracker = DirtyRects()
+    background, pellets = object(), object()
+    assert tracker.needs_full_redraw(background, pellets)
+    tracker.finish_frame([], [tracker.bounds], background, pellets)
+    assert not tracker.needs_full_redraw(background, pellets)
+    assert tracker.needs_full_redraw(object(), pellets)
+    tracker.invalidate()
+    assert tracker.needs_full_redraw(background, pellets)
+
+
+def test_pixels_pushed():
+    tracker = DirtyRects()
+    drawn = [pygame.Rect(0, 0, 10, 10), None]
+    tracker.finish_frame(drawn, [pygame.Rect(0, 0, 10, 10), pygame.Rect(20, 20, 5, 4)], None, None)
+    assert tracker.previous == [pygame.Rect(0, 0, 10, 10)]
+    assert tracker.pixels_pushed == 120
+    tracker.finish_frame([], [tracker.bounds], None, None)
+    assert tracker.pixels_pushed == SCREENWIDTH * SCREENHEIGHT
+    assert tracker.total_pixels_pushed == 120 + SCREENWIDTH * SCREENHEIGHT
+    assert tracker.frames == 2
@@ -11,7 +11,7 @@ def mock_node():
     node = Mock()
     node.position = Vector(0, 0)
     node.neighbors = {UP: None, DOWN: None, LEFT: None, RIGHT: None}
-    node.access = {UP: [], DOWN: [], LEFT: [], RIGHT: []}
+    node.access = {UP: 0, DOWN: 0, LEFT: 0, RIGHT: 0}
     return node
 
 
@@ -46,12 +46,22 @@ def test_set_spawn_node(entity, mock_node):
 
 
 def test_valid_direction(entity, mock_node):
+    entity.name = PACMAN
     mock_node.neighbors[UP] = Mock()
-    mock_node.access[UP] = [entity.name]
+    mock_node.access[UP] = ACCESS_BITS[PACMAN]
     assert entity.valid_direction(UP) is True
     assert entity.valid_direction(DOWN) is False
 
 
+def test_access_bit_follows_name(entity, mock_node):
+    assert entity.access_bit == 0
+    entity.name = BLINKY
+    assert entity.access_bit == ACCESS_BITS[BLINKY]
+    mock_node.neighbors[UP] = Mock()
+    mock_node.access[UP] = ACCESS_BITS[PACMAN]
+    assert entity.valid_direction(UP) is False
+
+
 def test_reverse_direction():
     node_mock = Mock()
     target_mock = Mock()
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from constants import *
+from env import PacmanEnv, SubprocVecEnv, ACTIONS, OBSERVATION_SIZE
+
+
+def play(env, actions):
+    rewards = []
+    for action in actions:
+        observation, reward, terminated, truncated, info = env.step(action)
+        rewards.append(reward)
+    return observation, rewards
+
+
+def test_reset_observation():
+    env = PacmanEnv()
+    observation, info = env.reset(seed=0)
+    assert observation.shape == (OBSERVATION_SIZE,)
+    assert observation.dtype == np.float32
+    assert observation[2] == 1
+    assert observation[3 + ACTIONS.index(LEFT)] == 1
+    pellets = observation[-NROWS * NCOLS:]
+    assert (pellets == 1).sum() + (pellets == 2).sum() == env.sim.pelletGroup.remaining
+    assert (pellets == 2).sum() == 4
+    assert info == {"score": 0, "lives": 5, "level": 0}
+
+
+def test_reward_is_score_delta():
+    env = PacmanEnv()
+    env.reset(seed=0)
+    total = 0
+    for _ in range(120):
+        before = env.sim.score
+        observation, reward, terminated, truncated, info = env.step(ACTIONS.index(LEFT))
+        assert reward == env.sim.score - before
+        total += reward
+    assert total > 0
+    assert info["score"] == total
+
+
+def test_episode_ends_on_game_over():
+    env = PacmanEnv(frame_skip=4)
+    env.reset(seed=0)
+    env.sim.lives = 1
+    for _ in range(20000):
+        observation, reward, terminated, truncated, info = env.step(ACTIONS.index(STOP))
+        if terminated:
+            break
+    assert terminated and not truncated
+    assert info["lives"] == 0
+
+
+def test_truncated_after_max_steps():
+    env = PacmanEnv(max_steps=5)
+    env.reset(seed=0)
+    results = [env.step(0) for _ in range(5)]
+    assert [r[3] for r in results] == [False] * 4 + [True]
+
+
+def test_subproc_vec_env_matches_single_envs():
+    actions = np.random.default_rng(0).integers(len(ACTIONS), size=(300, 2))
+    expected = []
+    for index in range(2):
+        env = PacmanEnv()
+        env.reset(seed=10 + index)
+        expected.append(play(env, actions[:, index]))
+
+    vec = SubprocVecEnv(2)
+    try:
+        observations = vec.reset(seed=10)
+        assert observations.shape == (2, OBSERVATION_SIZE)
+        rewards = []
+        for step_actions in actions:
+            observations, step_rewards, dones, infos = vec.step(step_actions)
+            rewards.append(step_rewards)
+        rewards = np.array(rewards)
+    finally:
+        vec.close()
+
+    for index in range(2):
+        assert np.array_equal(observations[index], expected[index][0])
+        assert rewards[:, index].tolist() == expected[index][1]
+        assert infos[index]["score"] == sum(expected[index][1])
@@ -0,0 +1,164 @@
+import random
+import pytest
+from constants import *
+from eventsim import EventSimulation, contact_time, NEVER
+from simulation import GameSimulation
+
+
+@pytest.fixture
+def sim():
+    sim = EventSimulation(seed=1)
+    sim.startGame()
+    return sim
+
+
+def test_contact_time():
+    assert contact_time(3, 0, 0, 0, 5) == 0
+    assert contact_time(20, 0, -10, 0, 5) == pytest.approx(1.5)
+    assert contact_time(20, 0, 10, 0, 5) == NEVER
+    assert contact_time(20, 10, -10, 0, 5) == NEVER
+    assert contact_time(20, 0, 0, 0, 5) == NEVER
+
+
+def test_run_takes_one_step_per_event(sim):
+    stats = sim.run_for(60, LEFT)
+    assert stats.simulated_time == pytest.approx(60)
+    assert stats.steps < 60 * 60 / 2
+    assert sim.score > 0
+
+
+def test_drift_reaches_the_next_node(sim):
+    sim.toggle_pause()
+    pacman = sim.pacman
+    target = pacman.target
+    wait = sim.arrival_time(pacman)
+    assert 0 < wait < NEVER
+    sim.run_for(wait / 2, LEFT)
+    assert pacman.target is target
+    sim.run_for(wait / 2, LEFT)
+    assert pacman.node is target
+
+
+def test_pellets_are_eaten_on_contact(sim):
+    sim.toggle_pause()
+    wait = sim.pellet_time()
+    assert 0 < wait < 1
+    sim.run_for(wait / 2, LEFT)
+    assert sim.pelletGroup.num_eaten == 0
+    sim.run_for(wait, LEFT)
+    assert sim.pelletGroup.num_eaten == 1
+
+
+def test_timed_pause_ends_at_its_deadline(sim):
+    sim.toggle_pause()
+    sim.pause.set_pause(pause_time=2, func=sim.reset_level)
+    # It ends in the first frame at FIXED_DT not before the deadline, as with run().
+    assert 2 <= sim.next_event_time() <= 2 + FIXED_DT
+    sim.run_for(1.9, auto_resume=False)
+    assert sim.pause.paused
+    sim.run_for(0.2, auto_resume=False)
+    assert sim.pause.pause_time is None
+
+
+def test_same_seed_same_game():
+    hashes = []
+    for _ in range(2):
+        sim = EventSimulation(seed=5)
+        sim.startGame()
+        sim.run_for(30, LEFT)
+        hashes.append(sim.state_hash())
+    assert hashes[0] == hashes[1]
+
+
+class CountingEventSimulation(EventSimulation):
+    def __init__(self, seed):
+        super().__init__(seed=seed)
+        self.deaths = 0
+
+    def on_pacman_death(self):
+        self.deaths += 1
+
+
+class CountingSimulation(GameSimulation):
+    def __init__(self, seed):
+        super().__init__(seed=seed)
+        self.deaths = 0
+
+    def on_pacman_death(self):
+        self.deaths += 1
+
+
+def mover(seed):
+    """
+    Policy that picks a random way on at every node, never turning back.
+    """
+    rng = random.Random(seed)
+    state = {"node": None, "direction": LEFT}
+
+    def policy(game):
+        pacman = game.pacman
+        if pacman.node is not state["node"]:
+            state["node"] = pacman.node
+            options = [d for d in (UP, DOWN, LEFT, RIGHT) if pacman.valid_direction(d) and d != -pacman.direction]
+            state["direction"] = rng.choice(options) if options else -pacman.direction
+        return state["direction"]
+    return policy
+
+
+def game_state(game):
+    if isinstance(game, EventSimulation):
+        for entity in [game.pacman] + game.ghosts.ghosts_list:
+            game.sync(entity)
+    positions = [(entity.position.x, entity.position.y) for entity in [game.pacman] + game.ghosts.ghosts_list]
+    return (game.score, game.pelletGroup.num_eaten, game.lives, game.level, positions,
+            [ghost.mode.current_mode for ghost in game.ghosts])
+
+
+def test_ghosts_catch_pacman_as_often_as_with_fixed_steps():
+    sim = CountingEventSimulation(seed=1)
+    sim.startGame()
+    sim.run_for(120, STOP)
+    ref = CountingSimulation(seed=1)
+    ref.startGame()
+    ref.run(120 * 60, STOP)
+    assert ref.deaths > 0
+    assert sim.deaths == ref.deaths
+    assert sim.handled < 120 * 60 / 4
+
+
+@pytest.mark.parametrize("seed", [0, 3, 4, 7])
+def test_plays_the_same_game_as_fixed_steps(seed):
+    sim = EventSimulation(seed=seed)
+    sim.startGame()
+    sim.run_for(60, mover(seed))
+    ref = GameSimulation(seed=seed)
+    ref.startGame()
+    ref.run(3600, mover(seed))
+    assert ref.pelletGroup.num_eaten > 0
+    assert game_state(sim) == game_state(ref)
+
+
+def test_plays_the_same_game_frame_by_frame():
+    sim = EventSimulation(seed=2)
+    sim.startGame()
+    ref = GameSimulation(seed=2)
+    ref.startGame()
+    policy, ref_policy = mover(2), mover(2)
+    for _ in range(600):
+        sim.run_for(1 / 60, policy)
+        ref.run(1, ref_policy)
+        assert game_state(sim) == game_state(ref)
+
+
+@pytest.mark.parametrize("seed", [0, 2, 3])
+def test_entities_are_on_their_node_when_they_get_there(seed):
+    sim = EventSimulation(seed=seed)
+    sim.startGame()
+    policy = mover(seed)
+    sim.run_for(5, policy)
+    for entity in [sim.pacman, sim.ghosts.blinky] * 5:
+        wait = sim.arrival_time(entity)
+        assert wait < NEVER
+        sim.run_for(wait, policy)
+        assert not sim.pause.paused
+        assert (entity.position.x, entity.position.y) == (entity.node.position.x, entity.node.position.y)
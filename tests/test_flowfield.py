@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import Mock
+from constants import *
+from nodes import NodeGroup
+from flowfield import FlowField, UNREACHED
+from ghosts import GhostsGroup, Clyde
+from simulation import GameSimulation
+
+
+@pytest.fixture
+def nodes(tmp_path):
+    maze = tmp_path / "maze.txt"
+    maze.write_text("X X X X X X\nn - + . + n\nX X . X . X\nX X + . + X\nX X X X X X")
+    nodes = NodeGroup(str(maze))
+    nodes.setPortalPair((0, 1), (5, 1))
+    return nodes
+
+
+@pytest.fixture
+def pacman(nodes):
+    pacman = Mock()
+    pacman.node = nodes.getNodeFromTiles(2, 3)
+    pacman.position = pacman.node.position.copy()
+    return pacman
+
+
+def test_distances_in_tiles(nodes, pacman):
+    field = FlowField(pacman)
+    assert field.update()
+    assert field.distances.tolist() == [[-1, -1, -1, -1, -1, -1],
+                                        [4, 3, 2, 3, 4, 4],
+                                        [-1, -1, 1, -1, 3, -1],
+                                        [-1, -1, 0, 1, 2, -1],
+                                        [-1, -1, -1, -1, -1, -1]]
+    assert field.distance(*nodes.constructKey(4, 1)) == 4
+    assert field.distance(*nodes.constructKey(0, 0)) == UNREACHED
+
+
+def test_portals_are_free(nodes, pacman):
+    pacman.node = nodes.getNodeFromTiles(5, 1)
+    field = FlowField(pacman)
+    assert field.distance(*nodes.constructKey(0, 1)) == 0
+    assert field.distance(*nodes.constructKey(2, 1)) == 2
+
+
+def test_searched_only_when_pacman_changes_node(nodes, pacman):
+    field = FlowField(pacman)
+    for _ in range(5):
+        field.distance(0, 0)
+    assert field.searches == 1
+    pacman.node = nodes.getNodeFromTiles(4, 1)
+    assert field.distance(*nodes.constructKey(2, 3)) == 4
+    assert field.searches == 2
+
+
+def test_shared_by_the_ghosts(nodes, pacman):
+    ghosts = GhostsGroup(nodes.getNodeFromTiles(4, 1), pacman, headless=True, targeting=SHORTEST_PATH)
+    for ghost in ghosts:
+        assert ghost.flow_field is ghosts.flow_field
+        assert ghost.pacman_distance() == 4
+    assert ghosts.flow_field.searches == 1
+
+
+def test_clyde_counts_tiles_through_the_maze(nodes, pacman):
+    clyde = Clyde(nodes.getNodeFromTiles(4, 1), pacman, headless=True, targeting=SHORTEST_PATH)
+    clyde.flow_field = FlowField(pacman)
+    clyde.mode.current_mode = CHASE
+    clyde.update_goal()
+    assert clyde.mode.current_mode is SCATTER
+
+
+def test_game_chases_through_the_field():
+    sim = GameSimulation(seed=4, ghost_targeting=SHORTEST_PATH)
+    sim.startGame()
+    sim.run(1200, action=LEFT)
+    field = sim.ghosts.flow_field
+    assert field.nodes is sim.nodes
+    assert 0 < field.searches < 1200
+    assert field.distances.max() > 0
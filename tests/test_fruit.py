@@ -2,6 +2,7 @@ import pytest
 import pygame
 from unittest.mock import Mock, patch
 from fruit import Fruit
+from scheduler import Scheduler
 from constants import *
 
 
@@ -50,3 +51,13 @@ class TestFruit:
 
         fruit.update(6)  # Більше ніж 5 секунд
         assert fruit.destroy is True
+
+    def test_scheduled_destroy(self, node):
+        scheduler = Scheduler()
+        fruit = Fruit(node, headless=True, scheduler=scheduler)
+        assert fruit.deadline == 5
+
+        fruit.update(6)
+        assert fruit.destroy is False
+        scheduler.advance(5)
+        assert fruit.destroy is True
@@ -1,5 +1,6 @@
 import unittest
 from unittest.mock import MagicMock, patch
+from pygame.locals import KEYDOWN, K_SPACE
 from constants import *
 from pacman import Pacman
 from ghosts import GhostsGroup
@@ -10,6 +11,8 @@ from text import TextGroup
 from music import MusicController
 from sprites import LifeSprites, MazeSprites
 from mazedata import MazeData
+from background_cache import BackgroundCache
+from replay import Replay, PAUSE_EVENT
 from main import GameController
 
 
@@ -31,6 +34,8 @@ class TestGameController(unittest.TestCase):
         self.mock_music_controller = MagicMock(spec=MusicController)
         self.mock_nodes = MagicMock(spec=NodeGroup)
         self.mock_maze_sprites = MagicMock(spec=MazeSprites)
+        self.mock_maze_sprites.mazefile = "mazes/maze1.txt"
+        self.mock_maze_sprites.rot_file = "mazes/maze1_rotation.txt"
         self.mock_maze_data = MagicMock(spec=MazeData)
 
         self.game.pacman = self.mock_pacman
@@ -46,6 +51,7 @@ class TestGameController(unittest.TestCase):
 
         self.mock_pacman.alive = True
         self.mock_pacman.visible = True
+        self.mock_pacman.position = MagicMock()
 
     def tearDown(self):
         pass
@@ -144,14 +150,94 @@ class TestGameController(unittest.TestCase):
             self.game.background_norm = MagicMock()
             self.game.background_finish = MagicMock()
             self.mock_maze_sprites.construct_background.side_effect = lambda bg, level: bg
+            self.game.background_cache = MagicMock(spec=BackgroundCache)
+            self.game.background_cache.load.return_value = None
 
             self.game.level = 3
             self.game.setBackground()
 
             self.assertEqual(self.mock_maze_sprites.construct_background.call_count, 2)
+            self.assertEqual(self.game.background_cache.save.call_count, 2)
             self.assertFalse(self.game.finishBG)
             self.assertEqual(self.game.background, self.game.background_norm)
 
+    def test_set_background_from_cache(self):
+        cached = MagicMock()
+        self.game.background_cache = MagicMock(spec=BackgroundCache)
+        self.game.background_cache.load.return_value = cached
+
+        self.game.setBackground()
+
+        self.mock_maze_sprites.construct_background.assert_not_called()
+        self.assertIs(self.game.background, cached)
+
+    def test_render_dirty_pushes_changed_rects(self):
+        import pygame
+        self.game.screen = pygame.Surface(SCREENSIZE)
+        self.game.background = pygame.Surface(SCREENSIZE)
+        self.game.lifesprites = MagicMock(images=[])
+        self.mock_pacman.render.return_value = pygame.Rect(100, 100, 40, 40)
+        self.mock_ghosts.render.return_value = []
+        self.mock_text_group.render.return_value = []
+        self.mock_pellet_group.pop_dirty_rects.return_value = [pygame.Rect(300, 300, 5, 5)]
+        self.game.dirty_rendering = True
+
+        with patch('pygame.display.update') as mock_update:
+            self.game.render()
+            mock_update.assert_called_once_with()
+
+            self.mock_pacman.render.return_value = pygame.Rect(110, 100, 40, 40)
+            self.game.render()
+            pushed = sorted(tuple(rect) for rect in mock_update.call_args[0][0])
+            self.assertEqual(pushed, [(100, 100, 50, 40), (300, 300, 5, 5)])
+        self.assertEqual(self.game.dirty_rects.pixels_pushed, 50 * 40 + 5 * 5)
+
+    def test_fast_forward_skips_clock_and_renders_every_nth_frame(self):
+        self.game.step = MagicMock()
+        self.game.checkEvents = MagicMock()
+        self.game.render = MagicMock()
+        self.game.set_fast_forward(True, dt=0.05, render_every=3)
+
+        for _ in range(6):
+            self.game.update()
+
+        self.game.clock.tick.assert_not_called()
+        self.game.step.assert_called_with(0.05, self.mock_pacman.getValidKey.return_value)
+        self.assertEqual(self.game.render.call_count, 2)
+        self.assertGreater(self.game.stats.wall_time, 0)
+
+    def test_fast_forward_without_rendering(self):
+        self.game.step = MagicMock()
+        self.game.checkEvents = MagicMock()
+        self.game.render = MagicMock()
+        self.game.set_fast_forward(True)
+
+        for _ in range(5):
+            self.game.update()
+
+        self.game.render.assert_not_called()
+        self.game.step.assert_called_with(FIXED_DT, self.mock_pacman.getValidKey.return_value)
+
+    def test_update_records_replay(self):
+        self.game.step = MagicMock()
+        self.game.render = MagicMock()
+        self.game.replay = Replay(42)
+        self.game.clock.tick.return_value = 16
+        self.mock_pacman.getValidKey.return_value = LEFT
+        space = MagicMock(type=KEYDOWN, key=K_SPACE)
+
+        with patch('pygame.event.get', side_effect=[[], [space]]):
+            self.game.update()
+            self.game.update()
+
+        self.assertEqual(self.game.replay.ticks, 2)
+        self.assertEqual(self.game.replay.directions, [LEFT, 2])
+        self.assertEqual(self.game.replay.dts, [0.016])
+        self.assertEqual(self.game.replay.events, [1, PAUSE_EVENT])
+
+    def test_save_replay_without_path(self):
+        self.assertFalse(self.game.save_replay())
+
     def test_show_and_hide_entities(self):
         self.game.hide_entities()
         self.assertFalse(self.mock_pacman.visible)
@@ -1,3 +1,4 @@
+import random
 import pygame
 import pytest
 from unittest.mock import Mock
@@ -6,6 +7,7 @@ from constants import *
 from sprites import GhostSprites
 from vector import Vector
 from modes import ModeController
+from nodes import NodeGroup
 
 pygame.init()
 
@@ -35,7 +37,7 @@ def mock_node():
     node = Mock()
     node.position = Vector(50, 50)
     node.neighbors = {UP: Mock(), DOWN: Mock(), LEFT: Mock(), RIGHT: Mock(), PORTAL: None}
-    node.access = {UP: [GHOST], DOWN: [GHOST], LEFT: [GHOST], RIGHT: [GHOST]}
+    node.access = {UP: ACCESS_BITS[GHOST], DOWN: ACCESS_BITS[GHOST], LEFT: ACCESS_BITS[GHOST], RIGHT: ACCESS_BITS[GHOST]}
     return node
 
 
@@ -72,6 +74,16 @@ class TestGhost:
         ghost.update_goal()
         assert ghost.goal == mock_pacman.node.position
 
+    def test_update_goal_scatter_keeps_goal_vector(self, ghost, mock_pacman):
+        goal = ghost.goal
+        ghost.mode.current_mode = SCATTER
+        ghost.update_goal()
+        assert ghost.goal == Vector(*SCATTER_GOALS[GHOST])
+        ghost.mode.current_mode = CHASE
+        ghost.update_goal()
+        assert ghost.goal is goal
+        assert ghost.goal == mock_pacman.node.position
+
     def test_valid_directions_list(self, ghost):
         ghost.direction = LEFT
         directions = ghost.valid_directions_list()
@@ -86,12 +98,31 @@ class TestGhost:
         direction = ghost.random_movement(directions)
         assert direction in directions
 
+    def test_random_movement_uses_own_rng(self, ghost):
+        directions = [UP, DOWN, LEFT, RIGHT]
+        ghost.rng = random.Random(3)
+        expected = random.Random(3)
+        for _ in range(10):
+            assert ghost.random_movement(directions) == directions[expected.randint(0, 3)]
+
     def test_goal_movement(self, ghost):
         ghost.goal = Vector(200, 200)
         directions = [UP, DOWN, LEFT, RIGHT]
         direction = ghost.goal_movement(directions)
         assert direction in directions
 
+    def test_path_movement_goes_around_walls(self, mock_pacman, tmp_path):
+        maze = tmp_path / "maze.txt"
+        maze.write_text("+ . + . +\n. X . X .\n. X + X .\n. X X X .\n+ . . . +")
+        nodes = NodeGroup(str(maze))
+        ghost = Blinky(nodes.getNodeFromTiles(2, 0), mock_pacman, headless=True)
+        ghost.goal.set(*nodes.constructKey(0, 4))
+        directions = [LEFT, RIGHT, DOWN]
+        assert ghost.goal_movement(directions) == DOWN
+        ghost.targeting = SHORTEST_PATH
+        assert ghost.goal_movement(directions) == LEFT
+        assert ghost.goal_movement([RIGHT, DOWN]) == RIGHT
+
     def test_wait_movement(self, ghost):
         ghost.direction = UP
         direction = ghost.wait_movement([])
@@ -117,6 +148,15 @@ class TestBlinky:
         blinky.update_goal()
         assert blinky.goal == mock_pacman.node.position
 
+    def test_goal_is_not_shared(self, mock_node, mock_pacman):
+        blinky = Blinky(mock_node, mock_pacman)
+        blinky.mode.current_mode = CHASE
+        blinky.update_goal()
+        assert blinky.goal is not mock_pacman.node.position
+        blinky.mode.current_mode = SPAWN
+        blinky.update_goal()
+        assert blinky.goal == blinky.home_goal and blinky.goal is not blinky.home_goal
+
     def test_update_goal_scatter(self, mock_node, mock_pacman):
         blinky = Blinky(mock_node, mock_pacman)
         blinky.sprites = GhostSprites(blinky)
@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+from constants import *
+import maze_compiler
+from maze_compiler import CompiledMaze, compile_maze, default_rotation_file
+
+
+@pytest.fixture
+def maze_file(tmp_path):
+    p = tmp_path / "maze.txt"
+    p.write_text("X X X X\nX + P X\nX . X X\nX + p X\nX X X X")
+    r = tmp_path / "maze_rotation.txt"
+    r.write_text(". . . .\n. 1 . .\n. . 2 .\n. . . .\n. . . 3")
+    return str(p)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    maze_compiler._compiled.clear()
+    yield str(tmp_path / "cache")
+    maze_compiler._compiled.clear()
+
+
+class TestCompileMaze:
+    def test_chars_match_loadtxt(self, maze_file, cache_dir):
+        maze = compile_maze(maze_file, cache_dir=cache_dir)
+        assert np.array_equal(maze.chars(), np.loadtxt(maze_file, dtype='<U1'))
+        assert maze.grid.dtype == np.uint8
+
+    def test_rotation_file_found(self, maze_file, cache_dir):
+        assert default_rotation_file(maze_file).endswith("maze_rotation.txt")
+        maze = compile_maze(maze_file, cache_dir=cache_dir)
+        assert maze.rotation_chars()[2][2] == '2'
+
+    def test_node_table(self, maze_file, cache_dir):
+        maze = compile_maze(maze_file, cache_dir=cache_dir)
+        assert maze.nodes.tolist() == [[1, 1], [2, 1], [1, 3]]
+        up, down, left, right = range(4)
+        assert maze.adjacency[0, right] == 1
+        assert maze.adjacency[1, left] == 0
+        assert maze.adjacency[0, down] == 2
+        assert maze.adjacency[2, up] == 0
+        assert maze.adjacency[1, down] == -1
+
+    def test_pellet_table(self, maze_file, cache_dir):
+        maze = compile_maze(maze_file, cache_dir=cache_dir)
+        assert maze.pellets.tolist() == [[1, 1, PELLET], [1, 2, POWERPELLET], [2, 1, PELLET],
+                                         [3, 1, PELLET], [3, 2, POWERPELLET]]
+
+    def test_artifact_is_memory_mapped(self, maze_file, cache_dir):
+        compile_maze(maze_file, cache_dir=cache_dir)
+        maze_compiler._compiled.clear()
+        maze = compile_maze(maze_file, cache_dir=cache_dir)
+        assert isinstance(maze.grid.base, np.memmap) or isinstance(maze.grid, np.memmap)
+
+    def test_compiled_once_per_process(self, maze_file, cache_dir):
+        assert compile_maze(maze_file, cache_dir=cache_dir) is compile_maze(maze_file, cache_dir=cache_dir)
+
+    def test_changed_source_recompiled(self, maze_file, cache_dir):
+        first = compile_maze(maze_file, cache_dir=cache_dir)
+        with open(maze_file, "w") as file:
+            file.write("X X X\nX + X\nX X X")
+        second = compile_maze(maze_file, cache_dir=cache_dir)
+        assert first.digest != second.digest
+        assert second.nodes.tolist() == [[1, 1]]
+
+    def test_save_load_roundtrip(self, maze_file, cache_dir, tmp_path):
+        maze = compile_maze(maze_file, cache_dir=cache_dir)
+        path = str(tmp_path / "copy.pmaz")
+        maze.save(path)
+        loaded = CompiledMaze.load(path)
+        for name in CompiledMaze.FIELDS:
+            assert np.array_equal(getattr(loaded, name), getattr(maze, name))
+
+    def test_load_rejects_other_files(self, maze_file):
+        with pytest.raises(ValueError):
+            CompiledMaze.load(maze_file)
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import Mock
 from constants import *
 from modes import ModeController, DefaultMode
+from scheduler import Scheduler
 from vector import Vector
 
 
@@ -51,6 +52,23 @@ class TestDefaultMode:
         mode.reset_mode()
         assert mode.mode == SCATTER
 
+    def test_scheduled_modes(self):
+        scheduler = Scheduler()
+        mode = DefaultMode(start_mode=WAIT, scheduler=scheduler)
+        assert mode.deadline == 3
+
+        mode.update(10)
+        assert mode.mode == WAIT
+        scheduler.advance(3)
+        assert mode.mode == SCATTER
+        assert mode.deadline == 10
+        scheduler.advance(7)
+        assert mode.mode == CHASE
+
+        mode.set_mode(SPAWN)
+        assert mode.deadline == 15
+        assert scheduler.next_deadline() == 15
+
 
 @pytest.fixture
 def mock_ghost():
@@ -111,3 +129,23 @@ class TestModeController:
         controller.set_mode(CHASE)
         controller.set_spawn_mode()
         assert controller.current_mode == CHASE
+
+    def test_scheduled_freight_ends_with_main_mode(self, mock_ghost):
+        scheduler = Scheduler()
+        controller = ModeController(mock_ghost, start_mode=CHASE, scheduler=scheduler)
+        controller.set_freight_mode()
+        assert controller.deadline == 7
+        assert controller.main_mode.deadline == 7
+
+        scheduler.advance(7)
+        controller.update(0)
+        assert controller.current_mode == SCATTER
+        assert controller.deadline is None
+        mock_ghost.normal_mode.assert_not_called()
+
+    def test_cancel(self, mock_ghost):
+        scheduler = Scheduler()
+        controller = ModeController(mock_ghost, start_mode=CHASE, scheduler=scheduler)
+        controller.set_freight_mode()
+        controller.cancel()
+        assert scheduler.next_deadline() is None
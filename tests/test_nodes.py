@@ -2,7 +2,10 @@ import pytest
 import pygame
 import numpy as np
 from unittest.mock import Mock, patch
-from nodes import Node, NodeGroup
+import heapq
+from collections import OrderedDict
+import nodes
+from nodes import Node, NodeGroup, NEIGHBOR_DIRECTIONS, ACCESS_DIRECTIONS, NEAREST_CACHE_SIZE, access_bit
 from vector import Vector
 from constants import *
 
@@ -42,17 +45,18 @@ class TestNode:
         assert len(node.neighbors) == 5  # LEFT, RIGHT, UP, DOWN, PORTAL
         assert all(v is None for v in node.neighbors.values())
         assert len(node.access) == 4  # UP, DOWN, LEFT, RIGHT
-        assert PACMAN in node.access[UP]
+        assert node.access[UP] & access_bit(PACMAN)
+        assert node.access[UP] == DEFAULT_ACCESS
 
     def test_deny_access(self, node, entity):
         node.denyAccess(UP, entity)
-        assert entity.name not in node.access[UP]
-        assert entity.name in node.access[DOWN]
+        assert not node.access[UP] & access_bit(entity.name)
+        assert node.access[DOWN] & access_bit(entity.name)
 
     def test_allow_access(self, node, entity):
         node.denyAccess(UP, entity)
         node.allowAccess(UP, entity)
-        assert entity.name in node.access[UP]
+        assert node.access[UP] & access_bit(entity.name)
 
     def test_render(self, node, screen):
         neighbor_node = Node(20, 20)
@@ -130,11 +134,131 @@ class TestNodeGroup:
     def test_deny_access(self, node_group, entity):
         node_group.denyAccess(1, 1, UP, entity)
         node = node_group.getNodeFromTiles(1, 1)
-        assert entity.name not in node.access[UP]
+        assert not node.access[UP] & access_bit(entity.name)
 
     def test_allow_access_list(self, node_group, entity):
         entities = [entity]
         node_group.denyAccess(1, 1, UP, entity)
         node_group.allowAccessList(1, 1, UP, entities)
         node = node_group.getNodeFromTiles(1, 1)
-        assert entity.name in node.access[UP]
+        assert node.access[UP] & access_bit(entity.name)
+
+    def test_arrays_match_nodes(self):
+        node_group = NodeGroup("mazes/maze1.txt")
+        node_group.createHomeNodes(11.5, 14)
+        node_group.connectHomeNodes(node_group.homekey, (12, 14), LEFT)
+        node_group.setPortalPair((0, 17), (27, 17))
+        assert len(node_group.nodeList) == len(node_group.nodesLUT)
+        assert node_group.positions.shape == (len(node_group.nodeList), 2)
+        for index, node in enumerate(node_group.nodeList):
+            assert node.index == index and node.group is node_group
+            assert tuple(node_group.positions[index]) == node.position.asTuple()
+            for column, direction in enumerate(NEIGHBOR_DIRECTIONS):
+                neighbor = node.neighbors[direction]
+                assert node_group.neighbors[index, column] == (-1 if neighbor is None else neighbor.index)
+
+    def test_access_changes_reach_array(self, node_group, entity):
+        node = node_group.getNodeFromTiles(1, 1)
+        column = ACCESS_DIRECTIONS.index(UP)
+        assert node_group.access[node.index, column] & access_bit(PACMAN)
+        node_group.denyAccess(1, 1, UP, entity)
+        assert not node_group.access[node.index, column] & access_bit(PACMAN)
+        node.allowAccess(UP, entity)
+        assert node_group.access[node.index, column] & access_bit(PACMAN)
+
+    def test_access_lists_are_single_mask_operations(self, node_group):
+        ghosts = []
+        for name in (BLINKY, PINKY, INKY, CLYDE):
+            ghosts.append(Mock())
+            ghosts[-1].name = name
+        node = node_group.getNodeFromTiles(1, 1)
+        node_group.denyAccessList(1, 1, LEFT, ghosts)
+        assert node.access[LEFT] == access_bit(PACMAN) | access_bit(FRUIT)
+        node_group.allowAccessList(1, 1, LEFT, ghosts[:2])
+        assert node.access[LEFT] == access_bit(PACMAN) | access_bit(FRUIT) | access_bit(BLINKY) | access_bit(PINKY)
+        assert node_group.access[node.index, ACCESS_DIRECTIONS.index(LEFT)] == node.access[LEFT]
+
+    def test_shortest_paths_match_dijkstra(self):
+        node_group = NodeGroup("mazes/maze1.txt")
+        node_group.setPortalPair((0, 17), (27, 17))
+        homekey = node_group.createHomeNodes(11.5, 14)
+        node_group.connectHomeNodes(homekey, (12, 14), LEFT)
+        node_group.connectHomeNodes(homekey, (15, 14), RIGHT)
+        ghost = Mock()
+        ghost.name = BLINKY
+        node_group.denyHomeAccess(ghost)
+        node_group.denyAccess(12, 14, UP, ghost)
+        dist, hop = node_group.shortestPaths(BLINKY)
+
+        def moves(node):
+            for direction, neighbor in node.neighbors.items():
+                if neighbor is None:
+                    continue
+                if direction == PORTAL:
+                    yield neighbor, 0
+                elif node.access[direction] & access_bit(BLINKY):
+                    offset = neighbor.position - node.position
+                    yield neighbor, abs(offset.x) + abs(offset.y)
+
+        start = node_group.getNodeFromTiles(1, 4)
+        lengths = {start.index: 0}
+        queue = [(0, start.index)]
+        while queue:
+            length, index = heapq.heappop(queue)
+            if length > lengths[index]:
+                continue
+            for neighbor, step in moves(node_group.nodeList[index]):
+                if length + step < lengths.get(neighbor.index, np.inf):
+                    lengths[neighbor.index] = length + step
+                    heapq.heappush(queue, (length + step, neighbor.index))
+        expected = np.full(len(node_group.nodeList), np.inf)
+        for index, length in lengths.items():
+            expected[index] = length
+        assert np.array_equal(dist[start.index], expected)
+        assert np.isinf(dist[start.index, node_group.getNodeFromTiles(13.5, 17).index])
+
+        for goal in np.flatnonzero(np.isfinite(expected)).tolist():
+            node, walked = start, 0
+            while node.index != goal:
+                neighbor = node.neighbors[NEIGHBOR_DIRECTIONS[hop[node.index, goal]]]
+                walked += dict((other.index, step) for other, step in moves(node))[neighbor.index]
+                node = neighbor
+            assert walked == expected[goal]
+
+    def test_shortest_paths_follow_access(self, node_group, entity):
+        start = node_group.getNodeFromTiles(1, 1)
+        goal = node_group.getNodeFromTiles(1, 2)
+        dist, hop = node_group.shortestPaths(PACMAN)
+        assert dist[start.index, goal.index] == TILEHEIGHT
+        assert NEIGHBOR_DIRECTIONS[hop[start.index, goal.index]] == DOWN
+        assert node_group.shortestPaths(PACMAN)[0] is dist
+
+        node_group.denyAccess(1, 1, DOWN, entity)
+        dist, hop = node_group.shortestPaths(PACMAN)
+        assert np.isinf(dist[start.index, goal.index])
+        assert hop[start.index, goal.index] == -1
+        assert node_group.shortestPaths(BLINKY)[0][start.index, goal.index] == TILEHEIGHT
+
+    def test_shortest_paths_cache_is_bounded(self, node_group, entity, monkeypatch):
+        monkeypatch.setattr(nodes, "SHORTEST_PATHS_CACHE_SIZE", 2)
+        monkeypatch.setattr(nodes, "_shortest_paths", OrderedDict())
+        first = node_group.shortestPaths(PACMAN)
+        node_group.denyAccess(1, 1, DOWN, entity)
+        node_group.shortestPaths(PACMAN)
+        node_group.denyAccess(1, 2, UP, entity)
+        node_group.shortestPaths(PACMAN)
+        assert len(nodes._shortest_paths) == 2
+        assert not any(paths is first for paths in nodes._shortest_paths.values())
+
+    def test_nearest_node(self, node_group):
+        node = node_group.getNodeFromTiles(1, 2)
+        assert node_group.nearestNode(node.position.x + 3, node.position.y + 9) == node.index
+        assert node_group.nearest[(node.position.x + 3, node.position.y + 9)] == node.index
+
+    def test_nearest_node_cache_is_bounded(self, node_group):
+        first = (0.5, 0.5)
+        node_group.nearestNode(*first)
+        for i in range(NEAREST_CACHE_SIZE + 10):
+            node_group.nearestNode(i + 0.25, 7.5)
+        assert len(node_group.nearest) == NEAREST_CACHE_SIZE
+        assert first not in node_group.nearest
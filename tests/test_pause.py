@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import Mock
 from pauser import Pause
+from scheduler import Scheduler
 
 
 @pytest.fixture
@@ -68,3 +69,28 @@ class TestPause:
         assert result is None
         assert pause.paused
         assert pause.timer == 0
+
+    def test_scheduled_pause(self, mock_func):
+        scheduler = Scheduler()
+        pause = Pause(scheduler=scheduler)
+        pause.set_pause(pause_time=1, func=mock_func)
+        assert pause.deadline == 1
+
+        assert pause.update(5) is None
+        assert pause.paused
+        scheduler.advance(0.5)
+        assert pause.paused
+        scheduler.advance(0.5)
+        assert not pause.paused
+        assert pause.pause_time is None
+        mock_func.assert_called_once()
+
+    def test_player_resume_cancels_scheduled_pause(self, mock_func):
+        scheduler = Scheduler()
+        pause = Pause(scheduler=scheduler)
+        pause.set_pause(pause_time=1, func=mock_func)
+        pause.set_pause(player_paused=True)
+        assert not pause.paused
+        assert pause.deadline is None
+        scheduler.advance(2)
+        mock_func.assert_not_called()
@@ -3,7 +3,9 @@ import pygame
 import numpy as np
 from unittest.mock import Mock, patch
 from pellets import Pellet, PowerPellet, PelletGroup
+from scheduler import Scheduler
 from vector import Vector
+from constants import *
 
 pygame.init()
 
@@ -88,6 +90,22 @@ class TestPelletGroup:
             pellet_group.update(0.1)
             assert mock_update.call_count == len(pellet_group.power_pellets)
 
+    def test_flashing_on_scheduler(self, pellet_group):
+        scheduler = Scheduler()
+        pellet_group.start_flashing(scheduler)
+        power_pellet = pellet_group.power_pellets[0]
+        assert power_pellet.deadline == 0.4
+
+        pellet_group.update(1)
+        assert power_pellet.visible
+        scheduler.advance(0.4)
+        assert not power_pellet.visible
+        scheduler.advance(0.4)
+        assert power_pellet.visible
+
+        pellet_group.stop_flashing()
+        assert scheduler.next_deadline() is None
+
     def test_read_pellet_file(self, pellet_group, tmp_path):
         data = ". . . .\nP . . .\n. . . ."
         p = tmp_path / "test.txt"
@@ -98,10 +116,67 @@ class TestPelletGroup:
 
     def test_is_empty(self, pellet_group):
         assert not pellet_group.is_empty()
-        pellet_group.pellets.clear()
+        for pellet in pellet_group.pellets:
+            pellet_group.remove(pellet)
         assert pellet_group.is_empty()
+        assert pellet_group.remaining == 0
+
+    def test_remove(self, pellet_group):
+        pellet = pellet_group.pellets[0]
+        pellet_group.remove(pellet)
+        assert pellet not in pellet_group.pellets
+        assert pellet_group.remaining == 29
+        with pytest.raises(ValueError):
+            pellet_group.remove(pellet)
+
+    def test_pellets_near(self, pellet_group):
+        near = pellet_group.pellets_near(Vector(2 * TILEWIDTH, 4 * TILEHEIGHT))
+        assert [(p.row, p.column) for p in near] == [(4, 1), (4, 2), (4, 3), (5, 1)]
+
+    def test_pellets_near_outside_maze(self, pellet_group):
+        near = pellet_group.pellets_near(Vector(-TILEWIDTH / 2, 4 * TILEHEIGHT))
+        assert [(p.row, p.column) for p in near] == [(4, 1), (5, 1)]
+        assert pellet_group.pellets_near(Vector(100 * TILEWIDTH, 100 * TILEHEIGHT)) == []
+
+    def test_pellets_near_matches_full_scan(self, pellet_group):
+        for pellet in pellet_group.pellets:
+            position = pellet.position + Vector(3, -2)
+            near = pellet_group.pellets_near(position)
+            hits = [p for p in pellet_group.pellets if (p.position - position).magnitudeSquared() <= 7 ** 2]
+            assert hits and all(p in near for p in hits)
 
     def test_render(self, pellet_group, screen):
         with patch.object(Pellet, 'render') as mock_render:
+            pellet_group.render(screen)
             pellet_group.render(screen)
             assert mock_render.call_count == len(pellet_group.pellets)
+
+    def test_render_single_blit(self, pellet_group):
+        pellet_group.build_layer()
+        screen = Mock()
+        pellet_group.render(screen)
+        screen.blit.assert_called_once_with(pellet_group.layer, (0, 0))
+
+    def test_remove_erases_tile(self, pellet_group):
+        pellet_group.build_layer()
+        pellet = pellet_group.pellets[0]
+        assert pellet_group.layer.get_at(pellet.get_center())[:3] == YELLOW
+        pellet_group.remove(pellet)
+        assert pellet_group.layer.get_at(pellet.get_center())[:3] == BLACK
+
+    def test_blink_redraws_power_pellet(self, pellet_group):
+        pellet_group.build_layer()
+        power_pellet = pellet_group.power_pellets[0]
+        pellet_group.update(power_pellet.flash_time)
+        assert not power_pellet.visible
+        assert pellet_group.layer.get_at(power_pellet.get_center())[:3] == BLACK
+        pellet_group.update(power_pellet.flash_time)
+        assert pellet_group.layer.get_at(power_pellet.get_center())[:3] == YELLOW
+
+    def test_blink_after_eaten_keeps_tile_empty(self, pellet_group):
+        pellet_group.build_layer()
+        power_pellet = pellet_group.power_pellets[0]
+        pellet_group.remove(power_pellet)
+        pellet_group.update(power_pellet.flash_time)
+        pellet_group.update(power_pellet.flash_time)
+        assert pellet_group.layer.get_at(power_pellet.get_center())[:3] == BLACK
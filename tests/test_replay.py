@@ -0,0 +1,72 @@
+import random
+import pytest
+from constants import *
+from simulation import GameSimulation
+from replay import Replay, PAUSE_EVENT, MUTE_EVENT
+
+
+def record(seed, ticks):
+    """
+    Plays a game the way GameController does, with jittery 16/17 ms frames and a
+    pause in the middle, and records it.
+    """
+    sim = GameSimulation(seed=seed)
+    sim.set_difficulty(0)
+    replay = Replay.start(sim)
+    sim.startGame()
+    rng = random.Random(seed)
+    for tick in range(ticks):
+        if tick % 30 == 0:
+            direction = rng.choice([UP, DOWN, LEFT, RIGHT, STOP])
+        dt = rng.choice([16, 17]) / 1000.0
+        sim.step(dt, direction)
+        replay.record_tick(direction, dt)
+        if (sim.pause.paused and sim.pause.pause_time is None) or tick in (1000, 1100):
+            if sim.toggle_pause():
+                replay.record_event(PAUSE_EVENT)
+        if tick == 1200:
+            replay.record_event(MUTE_EVENT)
+    replay.finish(sim)
+    return sim, replay
+
+
+def test_run_length_encoding():
+    replay = Replay(0)
+    for direction, dt in [(LEFT, 0.016), (LEFT, 0.016), (LEFT, 0.017), (UP, 0.016)]:
+        replay.record_tick(direction, dt)
+    assert replay.ticks == 4
+    assert replay.directions == [LEFT, 3, UP, 1]
+    assert replay.dts == [0.016, 0.017]
+    assert replay.steps == [0, 2, 1, 1, 0, 1]
+    assert list(Replay.expand(replay.directions)) == [LEFT, LEFT, LEFT, UP]
+
+
+def test_playback_matches_recording():
+    sim, replay = record(5, 6000)
+    assert sim.score > 0
+    assert sim.lives < 6
+
+    played = Replay.from_bytes(replay.to_bytes()).play()
+    assert played.score == sim.score
+    assert played.state_hash() == sim.state_hash()
+    assert played.stats.steps == 6000
+
+
+def test_replay_is_small():
+    _, replay = record(6, 6000)
+    assert len(replay.to_bytes()) < 4096
+
+
+def test_playback_detects_divergence(tmp_path):
+    _, replay = record(7, 2000)
+    replay.score += 10
+    path = str(tmp_path / "game.replay")
+    replay.save(path)
+    with pytest.raises(ValueError):
+        Replay.load(path).play()
+    assert Replay.load(path).play(verify=False).stats.steps == 2000
+
+
+def test_from_bytes_rejects_other_data():
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b"not a replay")
@@ -0,0 +1,77 @@
+import pytest
+from scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler():
+    return Scheduler()
+
+
+class TestScheduler:
+    def test_runs_callbacks_at_their_deadline(self, scheduler):
+        fired = []
+        scheduler.call_at(1.0, lambda: fired.append("a"))
+        scheduler.call_later(0.5, lambda: fired.append("b"))
+
+        scheduler.advance(0.25)
+        assert fired == []
+        scheduler.advance(0.25)
+        assert fired == ["b"]
+        scheduler.advance(1.0)
+        assert fired == ["b", "a"]
+        assert scheduler.fired == 2
+        assert len(scheduler) == 0
+
+    def test_deadline_order_then_registration_order(self, scheduler):
+        fired = []
+        scheduler.call_at(2, lambda: fired.append("late"))
+        scheduler.call_at(1, lambda: fired.append("first"))
+        scheduler.call_at(1, lambda: fired.append("second"))
+        scheduler.advance(5)
+        assert fired == ["first", "second", "late"]
+
+    def test_cancel(self, scheduler):
+        fired = []
+        timer = scheduler.call_later(1, lambda: fired.append(1))
+        timer.cancel()
+        assert timer.cancelled
+        assert scheduler.next_deadline() is None
+        scheduler.advance(2)
+        assert fired == []
+        assert scheduler.fired == 0
+
+    def test_callbacks_can_schedule(self, scheduler):
+        fired = []
+
+        def tick():
+            fired.append(scheduler.now)
+            scheduler.call_later(1, tick)
+
+        scheduler.call_later(1, tick)
+        for _ in range(3):
+            scheduler.advance(1)
+        assert fired == [1, 2, 3]
+        assert scheduler.next_deadline() == 4
+
+    def test_past_deadline_runs_in_the_same_advance(self, scheduler):
+        fired = []
+        scheduler.call_later(1, lambda: scheduler.call_at(0, lambda: fired.append(scheduler.now)))
+        scheduler.advance(1)
+        assert fired == [1]
+
+    def test_clear_inside_callback(self, scheduler):
+        fired = []
+        scheduler.call_at(1, lambda: scheduler.clear(10))
+        scheduler.call_at(1, lambda: fired.append(1))
+        scheduler.advance(1)
+        assert fired == []
+        assert scheduler.now == 10
+        assert len(scheduler) == 0
+
+    def test_only_due_timers_are_touched(self, scheduler):
+        for deadline in range(1, 1001):
+            scheduler.call_at(deadline, lambda: None)
+        scheduler.advance(1.5)
+        assert scheduler.fired == 1
+        assert len(scheduler) == 999
+        assert scheduler.next_deadline() == 2
@@ -3,15 +3,18 @@ from unittest.mock import Mock, patch
 import pygame
 from pygame.constants import K_UP, K_DOWN, K_LEFT, K_RIGHT, K_RETURN
 from settings_menu import SettingsMenu
+from text import clear_text_cache, text_cache_stats
 
 pygame.init()
 
 
 @pytest.fixture(autouse=True)
 def mock_pygame_font():
+    clear_text_cache()
     with patch('pygame.font.Font') as mock_font:
         mock_font.return_value = Mock()
         yield mock_font
+    clear_text_cache()
 
 
 @pytest.fixture(autouse=True)
@@ -49,6 +52,15 @@ class TestSettingsMenu:
         settings_menu.game_controller.screen.fill.assert_called_with((0, 0, 0))
         assert settings_menu.game_controller.screen.blit.call_count == len(settings_menu.options)
 
+    def test_render_reuses_labels(self, settings_menu, mock_pygame_font):
+        for _ in range(3):
+            settings_menu.render()
+        stats = text_cache_stats()
+        assert stats["font_loads"] == 1
+        assert stats["label_misses"] == len(settings_menu.options)
+        assert stats["label_hits"] == 2 * len(settings_menu.options)
+        assert mock_pygame_font.return_value.render.call_count == len(settings_menu.options)
+
     def test_handle_input_up(self, settings_menu):
         initial_selected_option = settings_menu.selected_option
         event = Mock(type=pygame.KEYDOWN, key=K_UP)
@@ -0,0 +1,135 @@
+import random
+import pytest
+from constants import *
+from simulation import GameSimulation
+
+
+class CountingSimulation(GameSimulation):
+    def __init__(self):
+        super().__init__()
+        self.pellets_eaten = 0
+        self.deaths = 0
+
+    def on_pellet_eaten(self, pellet):
+        self.pellets_eaten += 1
+
+    def on_pacman_death(self):
+        self.deaths += 1
+
+
+@pytest.fixture
+def sim():
+    sim = CountingSimulation()
+    sim.startGame()
+    return sim
+
+
+def run(sim, steps, action=LEFT):
+    for _ in range(steps):
+        if sim.pause.paused and sim.pause.pause_time is None:
+            sim.toggle_pause()
+        sim.step(1 / 60, action)
+
+
+def test_headless_entities_have_no_sprites(sim):
+    assert sim.pacman.sprites is None
+    assert all(ghost.sprites is None for ghost in sim.ghosts)
+
+
+def test_step_while_paused_does_nothing(sim):
+    position = sim.pacman.position.copy()
+    for _ in range(60):
+        sim.step(1 / 60, LEFT)
+    assert sim.pacman.position == position
+    assert sim.score == 0
+
+
+def test_step_moves_pacman_and_eats_pellets(sim):
+    assert sim.toggle_pause()
+    start_x = sim.pacman.position.x
+    for _ in range(30):
+        sim.step(1 / 60, LEFT)
+    assert sim.pacman.position.x < start_x
+    assert sim.score > 0
+    assert sim.score == sim.pelletGroup.num_eaten * 10
+    assert sim.pellets_eaten == sim.pelletGroup.num_eaten
+
+
+def test_toggle_pause_hides_entities(sim):
+    sim.toggle_pause()
+    assert not sim.pause.paused and sim.pacman.visible
+    sim.toggle_pause()
+    assert sim.pause.paused and not sim.pacman.visible
+
+
+def test_ghost_modes_wait_while_paused(sim):
+    for _ in range(240):
+        sim.step(1 / 60, LEFT)
+    assert sim.play_timers.now == 0
+    assert sim.timers.now == pytest.approx(4)
+    assert sim.ghosts.pinky.mode.current_mode == WAIT
+
+    run(sim, 181)
+    assert sim.ghosts.pinky.mode.current_mode == SCATTER
+
+
+def test_timed_pause_ends_on_timers(sim):
+    sim.toggle_pause()
+    sim.hide_entities()
+    sim.pause.set_pause(pause_time=1, func=sim.show_entities)
+    for _ in range(59):
+        sim.step(1 / 60)
+    assert sim.pause.paused and not sim.pacman.visible
+    sim.step(1 / 60)
+    sim.step(1 / 60)
+    assert not sim.pause.paused and sim.pacman.visible
+
+
+def test_long_run_loses_lives(sim):
+    run(sim, 5000)
+    assert sim.deaths > 0
+    assert 0 < sim.lives <= 5
+    assert sim.pellets_eaten > 0
+
+
+def test_run_reports_simulated_time(sim):
+    stats = sim.run(600, LEFT, dt=0.02)
+    assert stats.steps == 600
+    assert stats.simulated_time == pytest.approx(12.0)
+    assert stats.wall_time > 0
+    assert stats.speed == pytest.approx(stats.simulated_time / stats.wall_time)
+    assert sim.score > 0
+
+
+def test_run_with_policy(sim):
+    seen = []
+
+    def policy(game):
+        seen.append(game)
+        return UP
+
+    sim.run(10, policy)
+    assert seen == [sim] * 10
+
+
+def ghost_trace(seed, steps):
+    sim = GameSimulation(seed=seed)
+    sim.startGame()
+    actions = random.Random(0)
+    trace = []
+    for step in range(steps):
+        if step % 20 == 0:
+            action = actions.choice([UP, DOWN, LEFT, RIGHT])
+        if sim.pause.paused and sim.pause.pause_time is None:
+            sim.toggle_pause()
+        sim.step(1 / 60, action)
+        trace.append(tuple((g.position.x, g.position.y, g.direction) for g in sim.ghosts))
+    return trace
+
+
+def test_same_seed_gives_same_game():
+    assert ghost_trace(7, 2000) == ghost_trace(7, 2000)
+
+
+def test_different_seeds_give_different_games():
+    assert ghost_trace(7, 2000) != ghost_trace(8, 2000)
@@ -0,0 +1,84 @@
+import random
+import numpy as np
+import pytest
+from constants import *
+from simulation import GameSimulation
+from snapshot import Snapshotter
+
+
+def script(seed, steps):
+    rng = random.Random(seed)
+    actions = []
+    for step in range(steps):
+        if step % 20 == 0:
+            action = rng.choice([UP, DOWN, LEFT, RIGHT])
+        actions.append(action)
+    return actions
+
+
+def play(sim, actions):
+    hashes = []
+    for action in actions:
+        if sim.pause.paused and sim.pause.pause_time is None:
+            sim.toggle_pause()
+        sim.step(1 / 60, action)
+        hashes.append(sim.state_hash())
+    return hashes
+
+
+@pytest.fixture
+def sim():
+    sim = GameSimulation(seed=1)
+    sim.startGame()
+    return sim
+
+
+def test_restore_replays_the_same_game(sim):
+    snapshotter = Snapshotter(sim)
+    actions = script(1, 10000)
+    for start in range(0, 10000, 1000):
+        play(sim, actions[start:start + 500])
+        state = snapshotter.capture()
+        expected = play(sim, actions[start + 500:start + 1000])
+        snapshotter.restore(state)
+        assert play(sim, actions[start + 500:start + 1000]) == expected
+    assert sim.lives < 5
+
+
+def test_restore_brings_back_eaten_pellets_and_fruit(sim):
+    snapshotter = Snapshotter(sim)
+    state = snapshotter.capture()
+    play(sim, script(2, 3000))
+    assert sim.pelletGroup.remaining < 244
+
+    snapshotter.restore(state)
+    assert sim.pelletGroup.remaining == 244
+    assert len(sim.pelletGroup.pellets) == 244
+    assert sim.score == 0 and sim.fruit is None
+    assert sim.pause.paused and sim.pause.pause_time is None
+
+
+def test_snapshot_is_plain_numbers(sim):
+    snapshotter = Snapshotter(sim)
+    state = snapshotter.capture()
+    assert state.dtype.hasobject is False
+    copy = state.copy()
+    play(sim, script(3, 100))
+    snapshotter.capture(state)
+    assert not np.array_equal(state["pacman"], copy["pacman"])
+    snapshotter.restore(copy)
+    assert np.array_equal(snapshotter.capture()["pacman"], copy["pacman"])
+
+
+def test_restore_other_level(sim):
+    snapshotter = Snapshotter(sim)
+    state = snapshotter.capture()
+    sim.next_level()
+    assert sim.level == 1
+
+    snapshotter.restore(state)
+    fresh = GameSimulation(seed=1)
+    fresh.startGame()
+    assert sim.level == 0
+    assert sim.state_hash() == fresh.state_hash()
+    assert play(sim, script(4, 600)) == play(fresh, script(4, 600))
@@ -0,0 +1,182 @@
+import pytest
+import pygame
+from unittest.mock import Mock
+from constants import *
+import sprites
+from sprites import SpritesSheet, PacmanSprites, LifeSprites, GhostSprites, MazeSprites, load_sheet, sheet_cache_stats, clear_sheet_cache
+
+pygame.init()
+pygame.display.set_mode((1, 1))
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_sheet_cache()
+    yield
+    clear_sheet_cache()
+
+
+class TestSheetCache:
+    def test_sheet_loaded_once(self):
+        first = SpritesSheet()
+        second = LifeSprites(3)
+        stats = sheet_cache_stats()
+        assert first.sheet is second.sheet
+        assert stats["loads"] == 1
+        assert stats["hits"] == 1
+        assert stats["sheets"] == 1
+
+    def test_sheet_scaled_to_tiles(self):
+        raw = pygame.image.load(sprites.SHEET_PATH)
+        sheet = load_sheet()
+        assert sheet.get_width() == int(raw.get_width() / BASETILEWIDTH * TILEWIDTH)
+        assert sheet.get_height() == int(raw.get_height() / BASETILEHEIGHT * TILEHEIGHT)
+
+    def test_memory_stats(self):
+        sheet = load_sheet()
+        assert sheet_cache_stats()["bytes"] == sheet.get_height() * sheet.get_pitch()
+
+    def test_clear(self):
+        load_sheet()
+        clear_sheet_cache()
+        stats = sheet_cache_stats()
+        assert stats["loads"] == 0
+        assert stats["sheets"] == 0
+
+    def test_get_image_leaves_no_clip(self):
+        sheet = SpritesSheet()
+        full = sheet.sheet.get_clip()
+        image = sheet.get_image(2, 2, TILEWIDTH, TILEHEIGHT)
+        assert image.get_size() == (TILEWIDTH, TILEHEIGHT)
+        assert image.get_offset() == (2 * TILEWIDTH, 2 * TILEHEIGHT)
+        assert sheet.sheet.get_clip() == full
+
+    def test_sprite_classes_share_sheet(self):
+        entity = Mock()
+        pacman_sprites = PacmanSprites(entity)
+        life_sprites = LifeSprites(1)
+        assert pacman_sprites.sheet is life_sprites.sheet
+        assert sheet_cache_stats()["loads"] == 1
+
+
+class TestPacmanSprites:
+    def make_pacman(self, direction=LEFT):
+        pacman = Mock()
+        pacman.alive = True
+        pacman.direction = direction
+        return pacman
+
+    def test_frames_match_sheet(self):
+        pacman = self.make_pacman(UP)
+        pacman_sprites = PacmanSprites(pacman)
+        assert pacman.image.get_offset() == (8 * TILEWIDTH, 0)
+        pacman_sprites.update(0.05)
+        assert pacman.image.get_offset() == (6 * TILEWIDTH, 0)
+
+    def test_no_new_surfaces_per_frame(self):
+        pacman = self.make_pacman(RIGHT)
+        pacman_sprites = PacmanSprites(pacman)
+        images = set()
+        for _ in range(60):
+            pacman_sprites.update(1 / 60)
+            images.add(id(pacman.image))
+        assert images == {id(frame) for frame in pacman_sprites.frames[RIGHT]}
+
+    def test_stop_and_death_frames(self):
+        pacman = self.make_pacman(DOWN)
+        pacman_sprites = PacmanSprites(pacman)
+        pacman_sprites.update(1 / 60)
+        pacman.direction = STOP
+        pacman_sprites.update(1 / 60)
+        assert pacman.image is pacman_sprites.frames[STOP][DOWN]
+        pacman.alive = False
+        pacman_sprites.update(10)
+        assert pacman.image is pacman_sprites.frames[DEATH][-1]
+
+    def test_frames_sliced_once(self):
+        first = PacmanSprites(self.make_pacman())
+        second = PacmanSprites(self.make_pacman())
+        assert first.frames is second.frames
+        assert first.animations[LEFT] is not second.animations[LEFT]
+
+
+def make_ghost(name=BLINKY, mode=SCATTER, direction=UP):
+    ghost = Mock()
+    ghost.name = name
+    ghost.mode.current_mode = mode
+    ghost.direction = direction
+    return ghost
+
+
+class TestGhostSprites:
+    def test_frames_match_sheet(self):
+        ghost = make_ghost(PINKY, direction=RIGHT)
+        ghost_sprites = GhostSprites(ghost)
+        ghost_sprites.update()
+        assert ghost.image.get_offset() == (2 * TILEWIDTH, 10 * TILEHEIGHT)
+
+    def test_freight_and_spawn_frames(self):
+        ghost = make_ghost(INKY, mode=FREIGHT, direction=DOWN)
+        ghost_sprites = GhostSprites(ghost)
+        ghost_sprites.update()
+        assert ghost.image.get_offset() == (10 * TILEWIDTH, 4 * TILEHEIGHT)
+
+        ghost.mode.current_mode = SPAWN
+        ghost_sprites.update()
+        assert ghost.image.get_offset() == (8 * TILEWIDTH, 6 * TILEHEIGHT)
+
+    def test_stop_uses_left_frame(self):
+        ghost = make_ghost(CLYDE, direction=STOP)
+        GhostSprites(ghost).update()
+        assert ghost.image.get_offset() == (6 * TILEWIDTH, 8 * TILEHEIGHT)
+
+    def test_frames_sliced_once(self):
+        first = GhostSprites(make_ghost(BLINKY))
+        second = GhostSprites(make_ghost(CLYDE))
+        assert first.frames is second.frames
+        assert sheet_cache_stats()["atlases"] == 1
+
+    def test_image_swapped_only_on_change(self):
+        ghost = make_ghost(BLINKY, direction=LEFT)
+        ghost_sprites = GhostSprites(ghost)
+        ghost_sprites.update()
+        ghost.image = None
+        ghost_sprites.update()
+        assert ghost.image is None
+
+        ghost.direction = RIGHT
+        ghost_sprites.update()
+        assert ghost.image is ghost_sprites.frames[BLINKY][RIGHT]
+
+
+@pytest.fixture
+def maze_sprites():
+    return MazeSprites("mazes/maze1.txt", "mazes/maze1_rotation.txt")
+
+
+def draw_cell_by_cell(maze_sprites, background, y):
+    for row in range(maze_sprites.data.shape[0]):
+        for col in range(maze_sprites.data.shape[1]):
+            if maze_sprites.data[row][col].isdigit():
+                sprite = maze_sprites.get_image(int(maze_sprites.data[row][col]) + 12, y)
+                sprite = maze_sprites.rotate(sprite, int(maze_sprites.rot_data[row][col]))
+                background.blit(sprite, (col * TILEWIDTH, row * TILEHEIGHT))
+            elif maze_sprites.data[row][col] == '=':
+                background.blit(maze_sprites.get_image(10, 8), (col * TILEWIDTH, row * TILEHEIGHT))
+    return background
+
+
+class TestMazeSprites:
+    def test_atlas_has_every_rotation(self, maze_sprites):
+        assert len(maze_sprites.tiles) == 6 * (10 * 4 + 1)
+
+    @pytest.mark.parametrize("y", [0, 3, 5])
+    def test_background_matches_cell_by_cell(self, maze_sprites, y):
+        expected = draw_cell_by_cell(maze_sprites, pygame.Surface(SCREENSIZE), y)
+        result = maze_sprites.construct_background(pygame.Surface(SCREENSIZE), y)
+        assert pygame.image.tobytes(result, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    def test_build_time_reported(self, maze_sprites):
+        maze_sprites.construct_background(pygame.Surface(SCREENSIZE), 0)
+        assert maze_sprites.build_time > 0
+        assert sheet_cache_stats()["atlas_build_time"] > 0
@@ -2,12 +2,20 @@ import pytest
 import pygame
 from constants import *
 from unittest.mock import Mock
-from text import Text, TextGroup
+from text import Text, DigitText, TextGroup, load_font, render_label, text_cache_stats, clear_text_cache
 from vector import Vector
+from scheduler import Scheduler
 
 pygame.init()
 
 
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_text_cache()
+    yield
+    clear_text_cache()
+
+
 @pytest.fixture
 def screen():
     return pygame.Surface((800, 600))
@@ -94,3 +102,102 @@ class TestTextGroup:
         mock_screen = Mock(wraps=screen)
         text_group_instance.render(mock_screen)
         assert all(mock_screen.blit.called for text in text_group_instance.alltext.values())
+
+    def test_timed_text_removed_at_deadline(self, text_group_instance):
+        first = text_group_instance.add_text("200", WHITE, 0, 0, 8, time=1)
+        second = text_group_instance.add_text("400", WHITE, 0, 0, 8, time=2)
+        text_group_instance.update(0.5)
+        assert first in text_group_instance.alltext
+        text_group_instance.update(0.5)
+        assert first not in text_group_instance.alltext
+        assert second in text_group_instance.alltext
+        text_group_instance.update(1)
+        assert second not in text_group_instance.alltext
+        assert SCORETXT in text_group_instance.alltext
+
+    def test_replaced_text_is_kept(self, text_group_instance):
+        text_group_instance.add_text("200", WHITE, 0, 0, 8, time=1, id=10)
+        text_group_instance.add_text("400", WHITE, 0, 0, 8, id=10)
+        text_group_instance.update(2)
+        assert text_group_instance.alltext[10].text == "400"
+
+    def test_timed_text_on_game_scheduler(self):
+        scheduler = Scheduler()
+        group = TextGroup(scheduler)
+        popup = group.add_text("200", WHITE, 0, 0, 8, time=1)
+        group.update(5)
+        assert popup in group.alltext
+        scheduler.advance(1)
+        assert popup not in group.alltext
+
+
+class TestTextCache:
+    def test_font_opened_once_per_size(self):
+        first = Text("200", WHITE, 0, 0, 8)
+        second = Text("400", WHITE, 0, 0, 8)
+        Text("SCORE", WHITE, 0, 0, TILEHEIGHT)
+        assert first.font is second.font
+        stats = text_cache_stats()
+        assert stats["font_loads"] == 2
+        assert stats["fonts"] == 2
+
+    def test_labels_rendered_once(self):
+        group = TextGroup()
+        misses = text_cache_stats()["label_misses"]
+        for _ in range(5):
+            group.add_text("200", WHITE, 10, 10, 8, time=1)
+            group.update_score(10)
+        stats = text_cache_stats()
+        assert stats["label_misses"] == misses + 1
+        assert stats["label_hits"] >= 4
+        assert group.alltext[7].label is group.alltext[8].label
+
+    def test_clear(self):
+        label = render_label("A", WHITE, 8)
+        assert load_font(8) is load_font(8)
+        clear_text_cache()
+        assert text_cache_stats() == {"font_loads": 0, "font_hits": 0, "fonts": 0,
+                                      "label_hits": 0, "label_misses": 0, "labels": 0}
+        assert render_label("A", WHITE, 8) is not label
+
+
+def pixels(surface):
+    return pygame.image.tobytes(surface, "RGBA")
+
+
+class TestDigitText:
+    def test_matches_full_render(self):
+        digits = DigitText("00000000", WHITE, 0, 0, TILEHEIGHT)
+        digits.change_text("00001230")
+        assert pixels(digits.label) == pixels(render_label("00001230", WHITE, TILEHEIGHT))
+
+    def test_redraws_only_changed_digits(self):
+        digits = DigitText("00000000", WHITE, 0, 0, TILEHEIGHT)
+        label = digits.label
+        assert digits.glyph_blits == 8
+        digits.change_text("00000010")
+        assert digits.glyph_blits == 9
+        digits.change_text("00000020")
+        digits.change_text("00000020")
+        assert digits.glyph_blits == 10
+        assert digits.label is label
+
+    def test_no_rendering_after_start(self):
+        digits = DigitText("000", WHITE, 0, 0, TILEHEIGHT)
+        misses = text_cache_stats()["label_misses"]
+        for value in range(1000):
+            digits.change_text(str(value).zfill(3))
+        assert text_cache_stats()["label_misses"] == misses
+
+    def test_longer_text_grows_label(self):
+        digits = DigitText("00", WHITE, 0, 0, TILEHEIGHT)
+        digits.change_text("100")
+        assert digits.label.get_width() == 3 * digits.cell_width
+        assert pixels(digits.label) == pixels(render_label("100", WHITE, TILEHEIGHT))
+
+    def test_score_and_level_counters(self, text_group_instance):
+        text_group_instance.update_score(1230)
+        text_group_instance.update_level(1)
+        assert isinstance(text_group_instance.alltext[SCORETXT], DigitText)
+        assert text_group_instance.alltext[SCORETXT].text == "00001230"
+        assert text_group_instance.alltext[LEVELTXT].text == "002"
@@ -147,3 +147,35 @@ class TestVector:
     )
     def test_vector_str(self, v, expected):
         assert str(v) == expected
+
+    def test_vector_has_slots_and_shared_thresh(self):
+        v = Vector(1, 2)
+        assert not hasattr(v, "__dict__")
+        assert v.thresh == Vector.thresh
+
+    def test_vector_in_place_operators(self):
+        v = Vector(3, 4)
+        original = v
+        v += Vector(1, 2)
+        assert v is original and v.asTuple() == (4, 6)
+        v -= Vector(2, 1)
+        assert v is original and v.asTuple() == (2, 5)
+        v *= 3
+        assert v is original and v.asTuple() == (6, 15)
+
+    def test_vector_add_scaled_and_set(self):
+        v = Vector(1, 1)
+        v.add_scaled(Vector(-1, 2), 4)
+        assert v.asTuple() == (-3, 9)
+        v.set(7, 8)
+        assert v.asTuple() == (7, 8)
+
+    @pytest.mark.parametrize(
+        "v1, v2",
+        [
+            (Vector(3, 4), Vector(1, 2)),
+            (Vector(0.1, 7.3), Vector(-2.5, 1 / 3)),
+        ]
+    )
+    def test_vector_distance_squared(self, v1, v2):
+        assert v1.distanceSquared(v2) == (v1 - v2).magnitudeSquared()
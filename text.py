@@ -1,6 +1,85 @@
+import functools
 import pygame
 from vector import Vector
 from constants import *
+from scheduler import Scheduler
+
+FONT_PATH = "fonts/PressStart2P-Regular.ttf"
+LABEL_CACHE_SIZE = 256
+
+# Process-wide cache of opened fonts, keyed by (path, size).
+_font_cache = {}
+_font_stats = {"loads": 0, "hits": 0}
+
+
+def load_font(size, path=FONT_PATH):
+    """
+    Returns the font of the given file and size, opening it only the first time.
+
+    Args:
+        size (int): Font size.
+        path (str): Path to the font file.
+
+    Returns:
+        pygame.font.Font: The shared font.
+    """
+    key = (path, size)
+    font = _font_cache.get(key)
+    if font is not None:
+        _font_stats["hits"] += 1
+        return font
+
+    font = _font_cache[key] = pygame.font.Font(path, size)
+    _font_stats["loads"] += 1
+    return font
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def render_label(text, color, size, path=FONT_PATH):
+    """
+    Returns the text rendered with the shared font, keeping the last
+    LABEL_CACHE_SIZE labels. The surfaces are shared and must not be drawn on.
+
+    Args:
+        text (str): Text to render.
+        color (tuple): RGB color of the text.
+        size (int): Font size.
+        path (str): Path to the font file.
+
+    Returns:
+        pygame.Surface: The rendered label.
+    """
+    return load_font(size, path).render(text, 1, color)
+
+
+def text_cache_stats():
+    """
+    Returns statistics about the font and label caches.
+
+    Returns:
+        dict: Number of fonts opened and reused, and the hits, misses and size
+        of the label cache.
+    """
+    labels = render_label.cache_info()
+    return {
+        "font_loads": _font_stats["loads"],
+        "font_hits": _font_stats["hits"],
+        "fonts": len(_font_cache),
+        "label_hits": labels.hits,
+        "label_misses": labels.misses,
+        "labels": labels.currsize,
+    }
+
+
+def clear_text_cache():
+    """
+    Drops all cached fonts and labels and resets the statistics.
+    Needed after pygame.font.quit(), which invalidates the opened fonts.
+    """
+    _font_cache.clear()
+    _font_stats["loads"] = 0
+    _font_stats["hits"] = 0
+    render_label.cache_clear()
 
 
 class Text():
@@ -43,23 +122,24 @@ class Text():
         self.position = Vector(x, y)
         self.timer = 0
         self.label = None
-        self.setup_font("fonts/PressStart2P-Regular.ttf")
+        self.setup_font(FONT_PATH)
         self.create_label()
 
     def setup_font(self, font_name):
         """
-        Sets up the font for rendering text.
+        Sets up the font for rendering text, shared with every text of the same size.
 
         Args:
             font_name: The font file path.
         """
-        self.font = pygame.font.Font(font_name, self.size)
+        self.font_name = font_name
+        self.font = load_font(self.size, font_name)
 
     def create_label(self):
         """
-        Renders the text into a surface.
+        Renders the text into a surface, or takes it from the label cache.
         """
-        self.label = self.font.render(self.text, 1, self.color)
+        self.label = render_label(self.text, tuple(self.color), self.size, self.font_name)
 
     def change_text(self, new_text):
         """
@@ -92,27 +172,114 @@ class Text():
 
         Args:
             screen: The game screen surface.
+
+        Returns:
+            pygame.Rect or None: The area drawn, or None if the text is hidden.
         """
         if self.visible:
             coords = self.position.asTuple()
-            screen.blit(self.label, coords)
+            return screen.blit(self.label, coords)
+        return None
+
+
+class DigitText(Text):
+    """
+    Text for numbers that change often, like the score and level counters.
+
+    The glyphs of the digits are rendered once, and the label is a surface the
+    glyphs are copied into. Changing the text only redraws the characters that
+    differ, with no FreeType rendering and no new surfaces, as long as the
+    number of characters stays the same. The font is fixed-width, so every
+    character has a cell of the same size.
+
+    Attributes:
+        glyphs (dict): Rendered glyph of every character used so far.
+        glyph_blits (int): Number of glyphs drawn into the label so far.
+    """
+
+    DIGITS = "0123456789"
+
+    def __init__(self, text, color, x, y, size, time=None, visible=True, id=None):
+        """
+        Initializes a DigitText object, see Text.
+        """
+        self.glyph_blits = 0
+        Text.__init__(self, text, color, x, y, size, time=time, visible=visible, id=id)
+
+    def create_label(self):
+        """
+        Renders the glyphs of the digits and composes the label from them.
+        """
+        self.glyphs = {char: render_label(char, tuple(self.color), self.size, self.font_name) for char in self.DIGITS}
+        self.cell_width, self.cell_height = self.glyphs["0"].get_size()
+        self.label = pygame.Surface((self.cell_width * len(self.text), self.cell_height), pygame.SRCALPHA)
+        self.shown = " " * len(self.text)
+        self.draw_changes()
+
+    def glyph(self, char):
+        """
+        Returns the rendered glyph of a character, rendering characters other than digits on first use.
+        """
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = render_label(char, tuple(self.color), self.size, self.font_name)
+        return glyph
+
+    def draw_changes(self):
+        """
+        Redraws the cells of the characters that differ from the ones shown.
+        """
+        for index, (char, shown) in enumerate(zip(self.text, self.shown)):
+            if char != shown:
+                cell = pygame.Rect(index * self.cell_width, 0, self.cell_width, self.cell_height)
+                self.label.fill((0, 0, 0, 0), cell)
+                # adding onto the cleared cell copies the glyph's pixels and alpha as they are
+                self.label.blit(self.glyph(char), cell, special_flags=pygame.BLEND_RGBA_ADD)
+                self.glyph_blits += 1
+        self.shown = self.text
+
+    def change_text(self, new_text):
+        """
+        Updates the text content, redrawing only the characters that changed.
+
+        Args:
+            new_text (str): The new text to display.
+        """
+        self.text = str(new_text)
+        if len(self.text) != len(self.shown):
+            self.create_label()
+        else:
+            self.draw_changes()
 
 
 class TextGroup():
     """
     Manages multiple Text objects for display.
 
+    Texts added with a display time are removed by a scheduler at their
+    deadline, so update() does not visit every text. Given the scheduler of
+    the game, the texts expire on the game's clock; without one the group
+    keeps its own, advanced by update().
+
     Attributes:
         nextid (int): Next available unique identifier for text objects.
         alltext (dict): Dictionary storing all active Text objects.
+        scheduler (Scheduler or None): Scheduler of the game the texts expire on.
+        timers (Scheduler): Scheduler of the text deadlines.
     """
 
-    def __init__(self):
+    def __init__(self, scheduler=None):
         """
         Initializes the TextGroup and sets up default text elements.
+
+        Args:
+            scheduler (Scheduler or None): Scheduler of the game, advanced by its owner.
+                Defaults to None, for a scheduler advanced by update().
         """
         self.nextid = 5
         self.alltext = {}
+        self.scheduler = scheduler
+        self.timers = scheduler if scheduler is not None else Scheduler()
         self.setup_text()
         self.show_text(READYTXT)
 
@@ -133,14 +300,28 @@ class TextGroup():
             int: The unique identifier of the added text.
         """
         if id is not None:
-            self.alltext[id] = Text(text, color, x, y, size, time=time, id=id)
             added_id = id
         else:
-            self.alltext[self.nextid] = Text(text, color, x, y, size, time=time, id=id)
             added_id = self.nextid
             self.nextid += 1
+        added = self.alltext[added_id] = Text(text, color, x, y, size, time=time, id=id)
+        if time is not None:
+            self.timers.call_later(time, lambda: self.expire_text(added_id, added))
         return added_id
 
+    def expire_text(self, id, text):
+        """
+        Removes a text whose display time is over. Called by the scheduler.
+
+        Args:
+            id (int): The identifier the text was added with.
+            text (Text): The text, which may since have been replaced under the same id.
+        """
+        text.showtime = None
+        text.destroy = True
+        if self.alltext.get(id) is text:
+            self.remove_text(id)
+
     def remove_text(self, id):
         """
         Removes a text object from the group by its ID.
@@ -154,8 +335,8 @@ class TextGroup():
         """
         Initializes the default text elements for the game.
         """
-        self.alltext[SCORETXT] = Text("0".zfill(8), WHITE, 0, TILEHEIGHT, TILEHEIGHT)
-        self.alltext[LEVELTXT] = Text(str(1).zfill(3), WHITE, 23 * TILEWIDTH, TILEHEIGHT, TILEHEIGHT)
+        self.alltext[SCORETXT] = DigitText("0".zfill(8), WHITE, 0, TILEHEIGHT, TILEHEIGHT)
+        self.alltext[LEVELTXT] = DigitText(str(1).zfill(3), WHITE, 23 * TILEWIDTH, TILEHEIGHT, TILEHEIGHT)
         self.alltext[READYTXT] = Text("READY!", YELLOW, 11.25 * TILEWIDTH, 20 * TILEHEIGHT, TILEHEIGHT, visible=False)
         self.alltext[PAUSETXT] = Text("PAUSED!", YELLOW, 10.625 * TILEWIDTH, 20 * TILEHEIGHT, TILEHEIGHT, visible=False)
         self.alltext[GAMEOVERTXT] = Text("GAMEOVER!", YELLOW, 10 * TILEWIDTH, 20 * TILEHEIGHT, TILEHEIGHT, visible=False)
@@ -164,15 +345,15 @@ class TextGroup():
 
     def update(self, dt):
         """
-        Updates all text objects, removing expired ones.
+        Advances the text timers, removing expired texts.
+        Does nothing when the texts expire on the scheduler of the game.
 
         Args:
             dt (float): Time since the last update.
         """
-        for tkey in list(self.alltext.keys()):
-            self.alltext[tkey].update(dt)
-            if self.alltext[tkey].destroy:
-                self.remove_text(tkey)
+        if self.scheduler is not None:
+            return
+        self.timers.advance(dt)
 
     def show_text(self, id):
         """
@@ -220,6 +401,13 @@ class TextGroup():
     def render(self, screen):
         """
         Renders all visible text objects on the screen.
+
+        Returns:
+            list: The areas drawn.
         """
+        rects = []
         for tkey in list(self.alltext.keys()):
-            self.alltext[tkey].render(screen)
+            rect = self.alltext[tkey].render(screen)
+            if rect is not None:
+                rects.append(rect)
+        return rects
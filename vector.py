@@ -5,12 +5,20 @@ class Vector(object):
     """
     Represents a 2D vector with basic vector operations.
 
+    The binary operators return a new vector. The in-place operators +=, -=
+    and *= change the vector itself, so they must not be used on a vector that
+    is shared, such as the position of a node.
+
     Attributes:
         x (float): X-coordinate of the vector.
         y (float): Y-coordinate of the vector.
-        thresh (float): Threshold for equality comparison.
+        thresh (float): Threshold for equality comparison, shared by all vectors.
     """
 
+    __slots__ = ("x", "y")
+
+    thresh = 0.000001
+
     def __init__(self, x=0, y=0):
         """
         Initializes a Vector instance.
@@ -21,7 +29,6 @@ class Vector(object):
         """
         self.x = x
         self.y = y
-        self.thresh = 0.000001
 
     def __add__(self, other):
         """
@@ -47,6 +54,71 @@ class Vector(object):
         """
         return Vector(self.x - other.x, self.y - other.y)
 
+    def __iadd__(self, other):
+        """
+        Adds another vector to this one in place.
+
+        Args:
+            other (Vector): The vector to add.
+
+        Returns:
+            Vector: This vector.
+        """
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other):
+        """
+        Subtracts another vector from this one in place.
+
+        Args:
+            other (Vector): The vector to subtract.
+
+        Returns:
+            Vector: This vector.
+        """
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, scalar):
+        """
+        Multiplies this vector by a scalar in place.
+
+        Args:
+            scalar (float): The scalar value.
+
+        Returns:
+            Vector: This vector.
+        """
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def add_scaled(self, other, scalar):
+        """
+        Adds another vector times a scalar to this one in place, without creating
+        the scaled vector.
+
+        Args:
+            other (Vector): The vector to add.
+            scalar (float): The factor applied to other.
+        """
+        self.x += other.x * scalar
+        self.y += other.y * scalar
+
+    def set(self, x, y):
+        """
+        Sets both components in place.
+
+        Args:
+            x (float): New x-coordinate.
+            y (float): New y-coordinate.
+        """
+        self.x = x
+        self.y = y
+
     def __neg__(self):
         """
         Negates the vector.
@@ -117,6 +189,20 @@ class Vector(object):
         """
         return self.x**2 + self.y**2
 
+    def distanceSquared(self, other):
+        """
+        Computes the squared distance to another vector, without creating their difference.
+
+        Args:
+            other (Vector): The other vector.
+
+        Returns:
+            float: The squared distance, equal to (self - other).magnitudeSquared().
+        """
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return dx**2 + dy**2
+
     def magnitude(self):
         """
         Computes the magnitude (length) of the vector.